@@ -1,14 +1,257 @@
 from processor_core.Dataset import DataSet
 from processor_core.CDF_Func import CDFfunc
-from os import path, listdir
+from processor_core.InputCache import InputCache
+from processor_core.BatchManifest import BatchManifest
+from os import path, listdir, environ
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import get_context
+import logging
+import sys
 import pandas as pd
+import numpy as np
 
+# processor script name and version (recorded in the script log and, with the Dataset and CDF functions versions, in the
+# batch manifest configuration hashes)
+script_name = "CommandPE_processor"
+script_version = "1.4.6"
+
+
+class DeferredLog:
+    """ Command specific - deferred log for a source file read.
+
+    Collects the log messages from a source file read run in a worker thread so that they can be written to the
+    script log in a set order once the read is complete. Supports the logger methods used by the read functions.
+    """
+
+    def __init__(self) -> None:
+        self.message_ls = []
+
+    def debug(self, msg: str) -> None:
+        self.message_ls.append((logging.DEBUG, msg))
+
+    def info(self, msg: str) -> None:
+        self.message_ls.append((logging.INFO, msg))
+
+    def warning(self, msg: str) -> None:
+        self.message_ls.append((logging.WARNING, msg))
+
+    def error(self, msg: str) -> None:
+        self.message_ls.append((logging.ERROR, msg))
+
+    def write_to(self, logger: logging.Logger) -> None:
+        """
+        Write the collected messages to logger in the order they were logged
+        """
+        for level, msg in self.message_ls:
+            logger.log(level, msg)
+        self.message_ls = []
 
-def command_processor(process_config: dict) -> str:
-    # phase 0 - setup Dataset instance, parameters and options using the configuration dict, check configuration ======
-    script_name = "CommandPE_processor"
-    script_version = "1.4.5"
 
+def read_source_df(df_dict: dict, input_cache_location: str, logger) -> pd.DataFrame:
+    """ Command specific - read the source dataframe for a df_dict.
+
+    Reads the source file (only the rows matching the row_filter if the df_dict has one) and maps the columns, or
+    loads the dataframe from the input cache if it is in use and has a valid entry for the source file.
+
+    Args:
+        df_dict: the df_dict for the source dataframe (see command_processor phase 2)
+        input_cache_location: input cache folder (None if the input cache is not in use)
+        logger: the script logger or a DeferredLog (if run in a worker thread)
+
+    Returns:
+        Dataframe. The column mapped source dataframe (without time values).
+    """
+    df_name = df_dict['df_name']
+    source_file = df_dict['source_file']
+    col_maps = df_dict['col_maps']
+    col_types = df_dict['col_types']
+
+    logger.info(f"Extracting data from {source_file} for {df_name}")
+    for mapping in col_maps.items():
+        logger.debug(f"{mapping[0]} column mapped to {mapping[1]}")
+
+    input_cache = None
+    read_spec = {key: df_dict[key] for key in ['col_maps', 'col_types', 'row_filter'] if key in df_dict}
+    if input_cache_location is not None:
+        input_cache = InputCache(cache_location=input_cache_location, logger=logger)
+        source_df = input_cache.load(df_name, source_file, read_spec)
+        if source_df is not None:
+            return source_df
+
+    if 'row_filter' in df_dict:
+        # read the file in chunks, only keeping rows with the row filter value (i.e. successful spots)
+        filter_col, filter_val = df_dict['row_filter']
+        logger.info(f"Reading rows with {filter_col} of {filter_val} only")
+        source_df = CDFfunc.read_csv_filtered(source_file, filter_col=filter_col, filter_val=filter_val,
+                                              skiprows=[1], usecols=list(col_maps.keys()), dtype=col_types)
+    else:
+        source_df = pd.read_csv(source_file, skiprows=[1], usecols=list(col_maps.keys()), dtype=col_types)
+    source_df = source_df[list(col_maps.keys())]
+    source_df.columns = col_maps.values()
+
+    if input_cache is not None:
+        input_cache.save(df_name, source_file, read_spec, source_df)
+
+    return source_df
+
+
+def thin_move_df(move_df: pd.DataFrame, ignore_same_location_updates: bool, min_loc_update_interval: int,
+                 thin_state: dict = None) -> pd.DataFrame:
+    """ Command specific - thin the location updates in move_df.
+
+    Drops any rows with the same time and id, and, as configured, rows where the location of a unit has not changed
+    and rows within the minimum interval between location updates for a unit.
+    When move_df is read in chunks thin_state holds the per unit state carried between chunks, this requires the times
+    for each unit to be in order through the file (checked by read_move_df_chunks).
+
+    Args:
+        move_df: Dataframe with (at least) id, time, x and y columns
+        ignore_same_location_updates: drop rows where the location of a unit has not changed
+        min_loc_update_interval: minimum interval between location updates (0 for no minimum interval)
+        thin_state: state carried between chunks (optional, default None - move_df is the whole file)
+            last_time: Series of the last time for each unit id
+            unit_code_dict: dict of unit id to the unit code used in the seen_loc keys
+            seen_loc: set of location keys (see get_unit_loc_keys) for the locations already seen for each unit
+            last_rounded_time: Series of the last rounded time for each unit id
+
+    Returns:
+        Dataframe. The thinned move_df (with a rounded_time column if min_loc_update_interval is set).
+    """
+    # drop any rows with same time and id (from rounding event times to the nearest second)
+    move_df = move_df.drop_duplicates(subset=['id', 'time'], keep='first')
+    if thin_state is not None:
+        move_df = move_df.loc[move_df['time'] != move_df['id'].map(thin_state['last_time'])]
+        thin_state['last_time'] = update_unit_state(thin_state['last_time'], move_df, 'time')
+
+    # if ignoring same location updates - drop any rows where the location for a particular id has not changed
+    if ignore_same_location_updates:
+        move_df = move_df.drop_duplicates(subset=['id', 'x', 'y'], keep='first')
+        if thin_state is not None:
+            loc_key_ls = get_unit_loc_keys(move_df, thin_state['unit_code_dict'])
+            seen_loc = thin_state['seen_loc']
+            move_df = move_df.loc[[loc_key not in seen_loc for loc_key in loc_key_ls]]
+            seen_loc.update(loc_key_ls)
+
+    # if a minimum interval between location updates has been specified then reduce move_df accordingly:
+    if min_loc_update_interval > 0:
+        # get times for all lines that are rounded to the nearest specified interval
+        move_df = move_df.assign(rounded_time=round(move_df['time'] / min_loc_update_interval, 0) *
+                                 min_loc_update_interval)
+        # drop duplicates of id and rounded time
+        move_df = move_df.drop_duplicates(subset=['id', 'rounded_time'], keep='first')
+        if thin_state is not None:
+            move_df = move_df.loc[move_df['rounded_time'] != move_df['id'].map(thin_state['last_rounded_time'])]
+            thin_state['last_rounded_time'] = update_unit_state(thin_state['last_rounded_time'], move_df,
+                                                                'rounded_time')
+
+    return move_df
+
+
+def get_unit_loc_keys(move_df: pd.DataFrame, unit_code_dict: dict) -> list:
+    """
+    Return a 24 byte key for the id, x and y of each row of move_df (numeric x and y columns and no null ids). Each key
+    holds the unit code of the id (from unit_code_dict, codes are added for new ids) and the x and y values, with -0.0
+    and null values normalised so that keys match where drop_duplicates matches rows.
+    """
+    for uid in move_df['id'].unique():
+        unit_code_dict.setdefault(uid, len(unit_code_dict))
+
+    key_arr = np.empty((len(move_df), 3), dtype=np.uint64)
+    key_arr[:, 0] = move_df['id'].map(unit_code_dict).to_numpy(dtype=np.uint64)
+    for key_col, loc_col in [(1, 'x'), (2, 'y')]:
+        loc_arr = move_df[loc_col].to_numpy(dtype=np.float64) + 0.0
+        loc_arr[np.isnan(loc_arr)] = np.nan
+        key_arr[:, key_col] = loc_arr.view(np.uint64)
+
+    return key_arr.view('V24').ravel().tolist()
+
+
+def update_unit_state(state_series: pd.Series, chunk_df: pd.DataFrame, col: str) -> pd.Series:
+    """
+    Return state_series (values by unit id) updated with the last value of col for each unit id in chunk_df
+    """
+    chunk_last_series = chunk_df.groupby('id', sort=False)[col].last()
+    if len(state_series) == 0:
+        return chunk_last_series
+
+    return pd.concat([state_series, chunk_last_series]).groupby(level=0, sort=False).last()
+
+
+def read_move_df_chunks(move_df_dict: dict, unit_col_maps: dict, chunk_size: int, zero_hour: float,
+                        ignore_same_location_updates: bool, min_loc_update_interval: int, logger):
+    """ Command specific - read the unit position file in chunks, thinning the location updates as each chunk is read.
+
+    Each chunk is column mapped and given time values as for the other source files, the unit data columns are reduced
+    to their unique rows and the location updates are thinned with thin_move_df, carrying the per unit state between
+    chunks. The result is identical to reading the whole file then thinning, provided the times for each unit are in
+    order through the file. If they are not (or there are null ids or times) then the read is abandoned.
+
+    Args:
+        move_df_dict: the df_dict for move_df
+        unit_col_maps: {col name in input file : col name in df} for the unit data columns
+        chunk_size: number of rows in each chunk
+        zero_hour: zero hour parameter for the time values
+        ignore_same_location_updates: drop rows where the location of a unit has not changed
+        min_loc_update_interval: minimum interval between location updates (0 for no minimum interval)
+        logger: the script logger
+
+    Returns:
+        Tuple of (move_df, unit_data_df) Dataframes, or None if the file could not be read in chunks.
+    """
+    col_maps = move_df_dict['col_maps']
+    unit_data_cols = list(unit_col_maps.values())
+    unit_id_col = unit_col_maps['UnitID']
+    thin_state = {'last_time': pd.Series(dtype='float64'),
+                  'unit_code_dict': {},
+                  'seen_loc': set(),
+                  'last_rounded_time': pd.Series(dtype='float64')}
+    move_chunk_ls = []
+    unit_data_chunk_ls = []
+    num_rows = 0
+
+    with pd.read_csv(move_df_dict['source_file'], skiprows=[1], usecols=list(col_maps.keys()),
+                     dtype=move_df_dict['col_types'], chunksize=chunk_size) as chunk_reader:
+        for move_chunk_df in chunk_reader:
+            num_rows += len(move_chunk_df)
+            move_chunk_df = move_chunk_df[list(col_maps.keys())]
+            move_chunk_df.columns = col_maps.values()
+            move_chunk_df['time'] = CDFfunc.get_time_val_series(input_time_series=move_chunk_df['time_str'],
+                                                                unit='secs', zero_hr=zero_hour, drop_tenths=True)
+
+            # carrying the per unit state between chunks requires ids and times for every row and times in order
+            prev_time_series = move_chunk_df.groupby('id', sort=False)['time'].shift()
+            prev_time_series = prev_time_series.fillna(move_chunk_df['id'].map(thin_state['last_time']))
+            if (move_chunk_df['id'].isna().any() or move_chunk_df['time'].isna().any() or
+                    (move_chunk_df['time'] < prev_time_series).any()):
+                logger.warning(f"Unit times out of order or missing ids / times in "
+                               f"{move_df_dict['source_file']} after row {num_rows - len(move_chunk_df)} - "
+                               f"unable to read in chunks")
+                return None
+            # the locations already seen for each unit are held as keys built from numeric x and y values
+            if ignore_same_location_updates and not (pd.api.types.is_numeric_dtype(move_chunk_df['x']) and
+                                                     pd.api.types.is_numeric_dtype(move_chunk_df['y'])):
+                logger.warning(f"Non numeric unit locations in {move_df_dict['source_file']} after row "
+                               f"{num_rows - len(move_chunk_df)} - unable to read in chunks")
+                return None
+
+            unit_data_chunk_ls.append(move_chunk_df[unit_data_cols].drop_duplicates())
+            move_chunk_df = move_chunk_df.drop(columns=[col for col in unit_data_cols if col != unit_id_col])
+            move_chunk_ls.append(thin_move_df(move_chunk_df, ignore_same_location_updates, min_loc_update_interval,
+                                              thin_state=thin_state))
+
+    if len(move_chunk_ls) == 0:
+        logger.warning(f"No rows read from {move_df_dict['source_file']} - unable to read in chunks")
+        return None
+
+    move_df = pd.concat(move_chunk_ls)
+    unit_data_df = pd.concat(unit_data_chunk_ls).drop_duplicates(ignore_index=True)
+    logger.info(f"{num_rows} rows read in chunks of {chunk_size}, {len(move_df)} location updates retained")
+
+    return move_df, unit_data_df
+
+
+def command_processor(process_config: dict, output_file_ls: list = None) -> str:
+    # phase 0 - setup Dataset instance, parameters and options using the configuration dict, check configuration ======
     command_data = DataSet(dataset_config=process_config)
 
     # read in the variables from the process_config dictionary
@@ -51,6 +294,22 @@ def command_processor(process_config: dict) -> str:
         min_loc_update_interval = 0
     command_data.add_metadata('min_location_update_interval', min_loc_update_interval)
 
+    # command specific - number of rows per chunk when reading the unit position file (0 to read the whole file)
+    # optional configuration field - not present in configuration files from earlier versions
+    try:
+        unit_pos_chunk_size = int(process_config.get('unit_pos_chunk_size', 0))
+    except ValueError:
+        unit_pos_chunk_size = 0
+
+    if unit_pos_chunk_size < 0:
+        unit_pos_chunk_size = 0
+    command_data.add_metadata('unit_pos_chunk_size', unit_pos_chunk_size)
+
+    # command specific - cache the source dataframes read from the input files as parquet files in the input location
+    # optional configuration field - not present in configuration files from earlier versions
+    use_input_cache = CDFfunc.parse_config_bool(process_config.get('input_cache', 0))
+    command_data.add_metadata('input_cache', use_input_cache)
+
     # check that the specified configuration can be processed
     issues_list = []
 
@@ -100,19 +359,10 @@ def command_processor(process_config: dict) -> str:
     # phase 1 - (no longer used - Dataset initialised in phase 0) =====================================================
 
     # phase 2 - read input files and generate source data frames ======================================================
-    logger.info("Generating source dataframes for unit data")
-
-    source_file = path.join(input_location, unit_pos_file)
-
-    col_maps = {'UnitID': 'id', 'UnitName': 'name', 'UnitClass': 'type', 'UnitType': 'commander', 'UnitSide': 'side'}
-
-    logger.debug(f"Extracting data from {source_file} for unit data dataframe")
-    for mapping in col_maps.items():
-        logger.debug(f"{mapping[0]} column mapped to {mapping[1]}")
-
-    unit_data_df = pd.read_csv(source_file, skiprows=[1], usecols=list(col_maps.keys()))
-    unit_data_df = unit_data_df[list(col_maps.keys())]
-    unit_data_df.columns = col_maps.values()
+    # unit data columns - read from the unit position file along with the move_df columns and used to generate
+    # unit_data_df (see below)
+    unit_col_maps = {'UnitID': 'id', 'UnitName': 'name', 'UnitClass': 'type', 'UnitType': 'commander',
+                     'UnitSide': 'side'}
 
     logger.info("Generating source dataframes for event data")
 
@@ -124,6 +374,7 @@ def command_processor(process_config: dict) -> str:
         source_file_avail: read if True, if not make an empty df (True for mandatory files)
         col_maps: {col name in input file : col name in df}
         col_types: {col name in input file: data type to read column as} - explicitly define data type where needed
+        row_filter: (col name in input file, value) - only rows with this value are read (optional)
         
     add all df_dicts to the df_dict_ls variable
     '''
@@ -141,7 +392,11 @@ def command_processor(process_config: dict) -> str:
                                  'Status': 'status_detail',
                                  'DamagePercent': 'dmg_detail',
                                  'Fire': 'fire_detail',
-                                 'Flood': 'flood_detail'},
+                                 'Flood': 'flood_detail',
+                                 'UnitName': unit_col_maps['UnitName'],
+                                 'UnitClass': unit_col_maps['UnitClass'],
+                                 'UnitType': unit_col_maps['UnitType'],
+                                 'UnitSide': unit_col_maps['UnitSide']},
                     'col_types': {'Fire': str,
                                   'Flood': str}}
 
@@ -154,7 +409,8 @@ def command_processor(process_config: dict) -> str:
                                  'DetectionResult': 'result',
                                  'SensorName': 'sensor_name_detail',
                                  'TargetRangeHoriz_nm': 'range_detail'},
-                    'col_types': {}}
+                    'col_types': {'TargetRangeHoriz_nm': float},
+                    'row_filter': ('DetectionResult', "SUCCESS")}
 
     shot_df_dict = {'df_name': 'shots_df',
                     'source_file': path.join(input_location, weapon_fired_file),
@@ -177,7 +433,8 @@ def command_processor(process_config: dict) -> str:
                                        'WeaponName': 'wpn_instance_detail',
                                        'DistanceFromFiringUnit_Horiz': 'range_detail',
                                        'Result': 'result'},
-                          'col_types': {}}
+                          'col_types': {'DistanceFromFiringUnit_Horiz': float},
+                          'row_filter': ('Result', "KILL")}
 
     unit_destroyed_df_dict = {'df_name': 'unit_destroyed_df',
                               'source_file': path.join(input_location, unit_destroyed_file),
@@ -190,68 +447,96 @@ def command_processor(process_config: dict) -> str:
 
     df_dict_ls = [move_df_dict, spot_df_dict, shot_df_dict, unit_kills_df_dict, unit_destroyed_df_dict]
 
+    # command specific - if set, source dataframes are loaded from the input cache where the input file is unchanged
+    # (the unit position file is not cached when read in chunks)
+    input_cache_location = None
+    if use_input_cache:
+        input_cache_location = path.join(input_location, "CDF_input_cache")
+
+    # the available source files are read concurrently in worker threads, each read logs to its own DeferredLog and
+    # these are written to the script log in df_dict_ls order as the reads are collected
+    # command specific - if set the unit position file is read in chunks, thinning location updates as each chunk is
+    # read (move_df and unit_data_df are left as None and generated from the whole file below if this is not possible)
+    move_df = None
+    unit_data_df = None
     event_df_ls = []
-    for df_dict in df_dict_ls:
-        df_name = df_dict['df_name']
-        source_file = df_dict['source_file']
-        source_file_avail = df_dict['source_file_avail']
-        col_maps = df_dict['col_maps']
-        col_types = df_dict['col_types']
-        if source_file_avail:
-            logger.info(f"Extracting data from {source_file} for {df_name}")
-            for mapping in col_maps.items():
-                logger.debug(f"{mapping[0]} column mapped to {mapping[1]}")
-            event_df_ls.append(pd.read_csv(source_file, skiprows=[1], usecols=list(col_maps.keys()), dtype=col_types))
-            event_df_ls[-1] = event_df_ls[-1][list(col_maps.keys())]
-            event_df_ls[-1].columns = col_maps.values()
-        else:
-            logger.warning(f"{source_file} not available - generating empty dataframe for {df_name}")
-            event_df_ls.append(pd.DataFrame(columns=col_maps.values()))
-        # command specific - remove trailing tenths from all event time strings and add time values column
-        time_val_ls = []
-        for time_str in event_df_ls[-1]['time_str'].to_list():
-            time_str_split = time_str.split(":")
-            if "." in time_str_split[-1]:
-                time_str_split[-1] = time_str_split[-1].split(".")[0]
-            time_val = CDFfunc.get_time_val(unit='secs', input_time_str=":".join(time_str_split), zero_hr=zero_hour)
-            time_val_ls.append(time_val)
-        event_df_ls[-1]['time'] = time_val_ls
-
-    move_df = event_df_ls.pop(0)
+    with ThreadPoolExecutor(max_workers=len(df_dict_ls)) as read_executor:
+        read_future_dict = {}
+        for df_dict in df_dict_ls:
+            if df_dict['source_file_avail']:
+                read_log = DeferredLog()
+                if df_dict is move_df_dict and unit_pos_chunk_size > 0:
+                    read_log.info(f"Extracting data from {df_dict['source_file']} for {df_dict['df_name']} "
+                                  f"and unit data in chunks of {unit_pos_chunk_size} rows")
+                    read_future = read_executor.submit(read_move_df_chunks, move_df_dict=move_df_dict,
+                                                       unit_col_maps=unit_col_maps, chunk_size=unit_pos_chunk_size,
+                                                       zero_hour=zero_hour,
+                                                       ignore_same_location_updates=ignore_same_location_updates,
+                                                       min_loc_update_interval=min_loc_update_interval,
+                                                       logger=read_log)
+                else:
+                    read_future = read_executor.submit(read_source_df, df_dict=df_dict,
+                                                       input_cache_location=input_cache_location, logger=read_log)
+                read_future_dict[df_dict['df_name']] = (read_future, read_log)
+
+        for df_dict in df_dict_ls:
+            df_name = df_dict['df_name']
+            source_file = df_dict['source_file']
+            col_maps = df_dict['col_maps']
+            if df_name in read_future_dict:
+                read_future, read_log = read_future_dict[df_name]
+                try:
+                    source_result = read_future.result()
+                finally:
+                    read_log.write_to(logger)
+
+                if df_dict is move_df_dict and unit_pos_chunk_size > 0:
+                    if source_result is not None:
+                        move_df, unit_data_df = source_result
+                        continue
+                    logger.warning(f"Reading whole of {source_file} for {df_name}")
+                    source_result = read_source_df(df_dict=df_dict, input_cache_location=input_cache_location,
+                                                   logger=logger)
+                event_df_ls.append(source_result)
+            else:
+                logger.warning(f"{source_file} not available - generating empty dataframe for {df_name}")
+                event_df_ls.append(pd.DataFrame(columns=col_maps.values()))
+            # command specific - remove trailing tenths from all event time strings and add time values column
+            event_df_ls[-1]['time'] = CDFfunc.get_time_val_series(input_time_series=event_df_ls[-1]['time_str'],
+                                                                  unit='secs', zero_hr=zero_hour, drop_tenths=True)
+
+    if move_df is None:
+        move_df = event_df_ls.pop(0)
     spots_df = event_df_ls.pop(0)
     shots_df = event_df_ls.pop(0)
     unit_kills_df = event_df_ls.pop(0)
     unit_destroyed_df = event_df_ls.pop(0)
 
-    # process move_df
-    # drop any rows with same time and id (from rounding event times to the nearest second)
-    move_df.drop_duplicates(subset=['id', 'time'], inplace=True, keep='first')
-    # if ignoring same location updates - drop any rows where the location for a particular id has not changed
-    if ignore_same_location_updates:
-        move_df.drop_duplicates(subset=['id', 'x', 'y'], inplace=True, keep='first')
-    # if a minimum interval between location updates has been specified then reduce move_df accordingly:
-    if min_loc_update_interval > 0:
-        # get times for all lines that are rounded to the nearest specified interval
-        move_df['rounded_time'] = round(move_df['time'] / min_loc_update_interval, 0) * min_loc_update_interval
-        # drop duplicates of id and rounded time
-        move_df.drop_duplicates(subset=['id', 'rounded_time'], inplace=True, keep='first')
+    if unit_data_df is None:
+        # generate unit_data_df from the unit data columns of move_df (one row for each unique set of unit data values)
+        logger.info("Generating source dataframe for unit data from move_df")
+        for mapping in unit_col_maps.items():
+            logger.debug(f"{mapping[0]} column mapped to {mapping[1]}")
+        unit_data_df = move_df[list(unit_col_maps.values())].drop_duplicates(ignore_index=True)
+        move_df.drop(columns=[col for col in unit_col_maps.values() if col != unit_col_maps['UnitID']], inplace=True)
+
+        # process move_df - thin the location updates (already done as each chunk was read if read in chunks)
+        move_df = thin_move_df(move_df, ignore_same_location_updates, min_loc_update_interval)
+
     # fill null values in Fire and Flood columns in move_df with 'None' for consistent detail values for those keys
     fire_col = move_df_dict['col_maps']['Fire']
     flood_col = move_df_dict['col_maps']['Flood']
     move_df[fire_col].fillna('None', inplace=True)
     move_df[flood_col].fillna('None', inplace=True)
 
-    # filter spots_df to only include successful spots
-    spots_df = spots_df.loc[spots_df['result'] == "SUCCESS"]
-
-    # filter unit_kills_df to only include KILL results
-    unit_kills_df = unit_kills_df.loc[unit_kills_df['result'] == "KILL"]
+    # spots_df only includes successful spots and unit_kills_df only includes KILL results (row filters applied as
+    # the source files were read)
     unit_kills_df['loss_cause_detail'] = 'engaged by weapon'
     unit_kills_df['loss_reason_detail'] = unit_kills_df['wpn_instance_detail']
 
     # reduce unit_destroyed_df to only include units not in unit_kills_df
     units_killed_ls = unit_kills_df['victim_id'].to_list()
-    id_mask = [victim_id not in units_killed_ls for victim_id in unit_destroyed_df['victim_id'].to_list()]
+    id_mask = CDFfunc.get_member_mask(unit_destroyed_df['victim_id'].to_list(), units_killed_ls, invert=True)
     unit_destroyed_df = unit_destroyed_df.loc[id_mask]
     unit_destroyed_df.drop_duplicates(subset='victim_id', keep='last', inplace=True)
     unit_destroyed_df['killer_id'] = "no secondary entity"
@@ -301,12 +586,9 @@ def command_processor(process_config: dict) -> str:
         logger.warning("Weapon fired file not present - identification of weapon entities may not be complete")
     wpn_uid_ls = CDFfunc.get_unique_list(wpn_uid_ls)
 
-    known_uid_ls = []
-    for entity in command_data.entities:
-        known_uid_ls.append(entity.uid)
-
+    remove_wpn_uid_ls = []
     for wpn_uid in wpn_uid_ls:
-        if weapon_entities and wpn_uid in known_uid_ls:
+        if weapon_entities and command_data.has_entity(wpn_uid):
             wpn_add_str = "-WPN"
             unit_type_str = command_data.entities[command_data.get_entity_index(wpn_uid)].unit_type
             if wpn_add_str not in unit_type_str[-len(wpn_add_str):]:
@@ -314,12 +596,14 @@ def command_processor(process_config: dict) -> str:
             command_data.set_entity_data(uid=wpn_uid, init_comps=0, cbt_per_comp=0, unit_type=unit_type_str)
             logger.debug(f"Entity with uid {wpn_uid} identified as weapon - "
                          f"init_comps and cbt_per_comp set to 0, -WPN appended to unit_type")
-        elif wpn_uid in known_uid_ls:
-            command_data.remove_entity(wpn_uid)
+        elif command_data.has_entity(wpn_uid):
+            remove_wpn_uid_ls.append(wpn_uid)
             logger.debug(f"Entity with uid {wpn_uid} identified as weapon and removed")
         else:
             logger.debug(f"uid {wpn_uid} identified as weapon "
                          f"but does not correspond to an entity in Dataset entity array ")
+    # remove the weapon entities in one call so the entities array is only rebuilt once
+    command_data.remove_entities(remove_wpn_uid_ls)
 
     # phase 4 - read the event data into the entities =================================================================
 
@@ -395,77 +679,123 @@ def command_processor(process_config: dict) -> str:
 
     event_map_ls = [location_event_map, spot_event_map, seen_event_map, shot_event_map, kill_event_map, loss_event_map]
 
-    for event_map in event_map_ls:
-        event_df = event_map['df']
-        df_name = event_map['df_name']
-        mask_col = event_map['mask_col']
-        data_maps = event_map['data_maps']
-        detail_keys = event_map['detail_keys']
-        detail_cols = event_map['detail_cols']
-        detail_list = event_map['detail_list']
-
-        logger.info(f'loading event data from {df_name} into entities, masking on {mask_col}, data maps: {data_maps},'
-                    f' detail keys: {detail_keys}, detail columns: {detail_cols}')
-
-        for entity in command_data.entities:
-            uid = entity.uid
-
-            logger.debug(f'reading event data from {df_name} for entity {uid}')
-            for mapping in event_map['data_maps']:
-                data_col = mapping[0]
-                tgt_list = mapping[1]
-
-                data_ls = CDFfunc.get_col_slice(df=event_df, uid=uid, mask_col=mask_col, tgt_col=data_col)
-                if len(data_ls) > 0:
-                    command_data.append_to_list(uid=uid, target_list=tgt_list, data_list=data_ls)
-                else:
-                    logger.debug(f"no data for {tgt_list} from {df_name} for entity {uid}")
-
-            logger.debug(f'adding encoded event detail for entity {uid}')
-            detail_val_ls = []
-            for detail_col in detail_cols:
-                detail_val_ls.append(CDFfunc.get_col_slice(df=event_df, uid=uid, mask_col=mask_col, tgt_col=detail_col))
-
-            detail_data_encoded = CDFfunc.encode_event_detail_list(*detail_val_ls, detail_keys=detail_keys)
-            if len(detail_data_encoded) > 0:
-                command_data.append_to_list(uid=uid, target_list=detail_list, data_list=detail_data_encoded)
-            else:
-                logger.debug(f"no data for {detail_list} from {df_name} for entity {uid}")
+    logger.info("Loading event data into entities (see dataset instance log for details)")
+    command_data.load_event_maps(event_map_ls)
 
     # phase 5 - finalise the data in the dataset instance and export the files ========================================
     logger.info("Finalising data and saving output files (see dataset instance log for details)")
     command_data.finalise_data()
     command_data.export_data()
+    # if a list is provided add the paths of the CDF files generated to it (used to record them in the batch manifest)
+    if output_file_ls is not None:
+        output_file_ls.extend(command_data.exported_file_ls)
     return_val = "complete"
     return return_val
 
 
+def run_configuration(configuration: dict) -> tuple:
+    """
+    Run command_processor for a configuration file row, return the result string for the batch log and a list of the
+    CDF files generated
+    """
+    output_file_ls = []
+    result_str = f"Serial {configuration['serial']} - case {configuration['case']}, " \
+                 f"replication {configuration['replication']} - "
+    if CDFfunc.parse_config_bool(configuration['process']):
+        result_str = result_str + command_processor(process_config=configuration, output_file_ls=output_file_ls)
+    else:
+        result_str = result_str + "not set to process"
+
+    return result_str, output_file_ls
+
+
+def get_batch_workers(argv: list, environ: dict, logger) -> int:
+    """
+    Return the number of worker processes to run configurations in, from the first command line argument
+    (i.e. python CommandPE_Processor.py 4) or else the CDF_BATCH_WORKERS environment variable, 1 if neither is set or
+    the value is not a positive integer
+    """
+    if len(argv) > 1:
+        batch_workers_str, source_str = argv[1], "command line argument"
+    elif environ.get('CDF_BATCH_WORKERS', '') != '':
+        batch_workers_str, source_str = environ['CDF_BATCH_WORKERS'], "CDF_BATCH_WORKERS environment variable"
+    else:
+        logger.info("Batch workers set as 1 (default)")
+        return 1
+
+    try:
+        batch_workers = int(batch_workers_str)
+    except ValueError:
+        batch_workers = 0
+    if batch_workers < 1:
+        logger.warning(f"Invalid batch workers value {batch_workers_str} from {source_str} - batch workers set as 1")
+        return 1
+
+    logger.info(f"Batch workers set as {batch_workers} ({source_str})")
+    return batch_workers
+
+
 # Script to call the model processor function and run each configuration in the config file ===========================
 
-batch_logger = CDFfunc.setup_logger(f"Batch_log")
-batch_logger.info(f"Batch run started")
-configuration_file = "CommandPE_config.csv"
-batch_logger.info(f"Loading configuration file - {configuration_file}")
-
-try:
-    configuration_dict = pd.read_csv(configuration_file, skiprows=1).to_dict(orient='records')
-except FileNotFoundError:
-    batch_logger.error(f"Batch run aborted - configuration file not found")
-else:
-    num_configs = len(configuration_dict)
-    batch_logger.info(f"{num_configs} configurations in file")
-    run_count = 0
-    for configuration in configuration_dict:
-        run_count += 1
-        serial = configuration['serial']
-        case = configuration['case']
-        rep = configuration['replication']
-        batch_logger.info(f"Configuration {run_count} of {num_configs}, Serial {serial}")
-        result_str = f"Serial {serial} - case {case}, replication {rep} - "
-        if CDFfunc.parse_config_bool(configuration['process']):
-            result_str = result_str + command_processor(process_config=configuration)
-        else:
-            result_str = result_str + "not set to process"
-        batch_logger.info(result_str)
+if __name__ == "__main__":
+    batch_logger = CDFfunc.setup_logger(f"Batch_log")
+    batch_logger.info(f"Batch run started")
+    configuration_file = "CommandPE_config.csv"
+    # number of worker processes to run configurations in (1 runs configurations one after another), set by the first
+    # command line argument or the CDF_BATCH_WORKERS environment variable
+    batch_workers = get_batch_workers(sys.argv, environ, batch_logger)
+    # skip configurations that are up to date in the batch manifest of their output location
+    skip_up_to_date = True
+    batch_logger.info(f"Loading configuration file - {configuration_file}")
 
-    batch_logger.info("Batch run complete")
+    try:
+        configuration_dict = pd.read_csv(configuration_file, skiprows=1).to_dict(orient='records')
+    except FileNotFoundError:
+        batch_logger.error(f"Batch run aborted - configuration file not found")
+    else:
+        num_configs = len(configuration_dict)
+        batch_logger.info(f"{num_configs} configurations in file")
+
+        # configurations that are unchanged since they were last processed (same configuration, input files and
+        # processor versions, with the CDF files generated still present) are not run again
+        batch_manifest = BatchManifest(input_file_fields=['unit_pos_file', 'weapon_fired_file', 'weapon_endgame_file',
+                                                          'unit_destroyed_file', 'sensor_detection_file',
+                                                          'entity_table_file'],
+                                       version_str=f"{script_name} {script_version}, Dataset {DataSet.version}, "
+                                                   f"CDF functions {CDFfunc.version}")
+        up_to_date_ls = [skip_up_to_date and CDFfunc.parse_config_bool(configuration['process']) and
+                         batch_manifest.is_up_to_date(configuration) for configuration in configuration_dict]
+        run_configuration_ls = [configuration for configuration, up_to_date in zip(configuration_dict, up_to_date_ls)
+                                if not up_to_date]
+
+        batch_executor = None
+        if batch_workers > 1:
+            # each configuration is run in a new worker process (spawned, one configuration per process on Python 3.11
+            # or later, where max_tasks_per_child is available) so that each has its own isolated loggers, results are
+            # logged in configuration file order as they are collected. On earlier versions worker processes are
+            # reused, as when configurations are run one after another each configuration gets its own new loggers
+            batch_logger.info(f"Running configurations in {batch_workers} worker processes")
+            executor_kwargs = {'max_tasks_per_child': 1} if sys.version_info >= (3, 11) else {}
+            batch_executor = ProcessPoolExecutor(max_workers=batch_workers, mp_context=get_context("spawn"),
+                                                 **executor_kwargs)
+            run_result_iter = batch_executor.map(run_configuration, run_configuration_ls)
+        else:
+            # configurations are run one after another as the results are collected
+            run_result_iter = map(run_configuration, run_configuration_ls)
+
+        try:
+            for run_count, (configuration, up_to_date) in enumerate(zip(configuration_dict, up_to_date_ls), start=1):
+                batch_logger.info(f"Configuration {run_count} of {num_configs}, Serial {configuration['serial']}")
+                if up_to_date:
+                    result_str = f"Serial {configuration['serial']} - case {configuration['case']}, " \
+                                 f"replication {configuration['replication']} - up to date"
+                else:
+                    result_str, output_file_ls = next(run_result_iter)
+                    if len(output_file_ls) > 0:
+                        batch_manifest.record(configuration, output_file_ls)
+                batch_logger.info(result_str)
+        finally:
+            if batch_executor is not None:
+                batch_executor.shutdown()
+
+        batch_logger.info("Batch run complete")
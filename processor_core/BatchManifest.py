@@ -0,0 +1,166 @@
+import hashlib
+import yaml
+from .CDF_Func import CDFfunc
+from .InputCache import InputCache
+from os import path, makedirs, stat
+
+
+class BatchManifest:
+    """ Batch manifest class.
+
+    Record of the configurations processed by the batch code of a processor script, used to skip configurations that
+    are up to date when a batch is run again. A manifest file is kept in each output location, recording for each
+    serial a hash of the configuration (including the processor versions), a hash of the input files (path and content
+    hash of each file), the path, size, modification time and content hash of each input file and the paths of the CDF
+    files generated. A configuration is up to date if both hashes match those recorded and all the CDF files recorded
+    still exist. As in InputCache the content of an input file is only hashed when its path, size or modification time
+    differ from those recorded, an input file with a new modification time but the same contents is still up to date.
+    """
+
+    manifest_file_name = "CDF_batch_manifest.yaml"
+
+    def __init__(self, input_file_fields: list, version_str: str = "") -> None:
+        """ BatchManifest class init method.
+
+        Args:
+            input_file_fields: configuration fields for the input files read from the input location by the processor
+            version_str: versions of the processor script, Dataset and CDF functions (included in the configuration
+                hash so that configurations are processed again when any of these change)
+        """
+        self.input_file_fields = input_file_fields
+        self.version_str = version_str
+        # manifests loaded, by manifest file path, each a dict of serial to manifest entry
+        self.manifest_dict = {}
+        # configuration hash, input hash and input file details by (manifest file path, serial) (generated on check and
+        # used on record, so that input files that change while a configuration is processed do not match the entry
+        # recorded)
+        self.hash_dict = {}
+
+    def get_manifest_path(self, configuration: dict) -> str:
+        """
+        Return the path of the manifest file in the output location of a configuration
+        """
+        output_location = CDFfunc.parse_config_location(str(configuration['output_location']))
+
+        return path.join(output_location, self.manifest_file_name)
+
+    def get_manifest(self, manifest_path: str) -> dict:
+        """
+        Return the manifest for manifest_path (loaded from file on first use, empty if there is no valid file)
+        """
+        if manifest_path not in self.manifest_dict:
+            manifest = {}
+            if path.isfile(manifest_path):
+                try:
+                    with open(manifest_path, "r") as manifest_file:
+                        manifest = yaml.safe_load(manifest_file)
+                except (OSError, yaml.YAMLError):
+                    manifest = {}
+                if not isinstance(manifest, dict):
+                    manifest = {}
+            self.manifest_dict[manifest_path] = manifest
+
+        return self.manifest_dict[manifest_path]
+
+    def get_config_hash(self, configuration: dict) -> str:
+        """
+        Return the sha256 hash of the fields and values of a configuration and the processor versions
+        """
+        config_str = repr((self.version_str,
+                           sorted((str(field), str(value)) for field, value in configuration.items())))
+
+        return hashlib.sha256(config_str.encode()).hexdigest()
+
+    def get_input_hash(self, configuration: dict, manifest_entry: dict = None) -> tuple:
+        """
+        Return the sha256 hash of the path and content hash of each input file of a configuration and a list of the
+        field, path, size, modification time and content hash of each input file. The content hash of an input file is
+        taken from manifest_entry (the entry recorded for the configuration) if its path, size and modification time
+        match those recorded
+        """
+        entry_input_file_dict = {}
+        if isinstance(manifest_entry, dict) and isinstance(manifest_entry.get('input_files'), list):
+            entry_input_file_dict = {input_file.get('field'): input_file for input_file in manifest_entry['input_files']
+                                     if isinstance(input_file, dict)}
+
+        input_location = CDFfunc.parse_config_location(str(configuration['input_location']))
+        input_hash = hashlib.sha256()
+        input_file_ls = []
+        for field in self.input_file_fields:
+            input_file = {'field': field,
+                          'path': path.abspath(path.join(input_location, str(configuration[field]))),
+                          'size': None,
+                          'mtime': None,
+                          'content_hash': None}
+            if path.isfile(input_file['path']):
+                input_stat = stat(input_file['path'])
+                input_file['size'] = input_stat.st_size
+                input_file['mtime'] = input_stat.st_mtime_ns
+                entry_input_file = entry_input_file_dict.get(field, {})
+                if entry_input_file.get('content_hash') is not None and \
+                        all(entry_input_file.get(key) == input_file[key] for key in ['path', 'size', 'mtime']):
+                    input_file['content_hash'] = entry_input_file['content_hash']
+                else:
+                    input_file['content_hash'] = InputCache.get_content_hash(input_file['path'])
+            input_hash.update(repr((field, input_file['path'], input_file['content_hash'])).encode())
+            input_file_ls.append(input_file)
+
+        return input_hash.hexdigest(), input_file_ls
+
+    def is_up_to_date(self, configuration: dict) -> bool:
+        """
+        Return True if a configuration is unchanged since it was last recorded and its CDF files still exist
+        """
+        serial = str(configuration['serial'])
+        manifest_path = self.get_manifest_path(configuration)
+        manifest = self.get_manifest(manifest_path)
+        manifest_entry = manifest.get(serial)
+        config_hash = self.get_config_hash(configuration)
+        input_hash, input_file_ls = self.get_input_hash(configuration, manifest_entry=manifest_entry)
+        self.hash_dict[(manifest_path, serial)] = (config_hash, input_hash, input_file_ls)
+
+        if not isinstance(manifest_entry, dict):
+            return False
+        if (manifest_entry.get('config_hash'), manifest_entry.get('input_hash')) != (config_hash, input_hash):
+            return False
+        output_file_ls = manifest_entry.get('output_files')
+        if not output_file_ls:
+            return False
+        if not all(path.isfile(output_file) for output_file in output_file_ls):
+            return False
+
+        # input files with a new modification time but the same contents - update the entry so that their contents
+        # are not hashed again on the next check
+        if manifest_entry.get('input_files') != input_file_ls:
+            manifest_entry['input_files'] = input_file_ls
+            self.save_manifest(manifest_path)
+
+        return True
+
+    def record(self, configuration: dict, output_file_ls: list) -> None:
+        """
+        Record a processed configuration and the paths of the CDF files generated in the manifest for its output
+        location and save the manifest file
+        """
+        serial = str(configuration['serial'])
+        manifest_path = self.get_manifest_path(configuration)
+        manifest = self.get_manifest(manifest_path)
+        config_hash, input_hash, input_file_ls = self.hash_dict.pop((manifest_path, serial), (None, None, None))
+        if config_hash is None:
+            config_hash = self.get_config_hash(configuration)
+            input_hash, input_file_ls = self.get_input_hash(configuration, manifest_entry=manifest.get(serial))
+
+        manifest[serial] = {'config_hash': config_hash,
+                            'input_hash': input_hash,
+                            'input_files': input_file_ls,
+                            'output_files': list(output_file_ls)}
+        self.save_manifest(manifest_path)
+
+    def save_manifest(self, manifest_path: str) -> None:
+        """
+        Save the manifest for manifest_path to file
+        """
+        if not path.isdir(path.dirname(manifest_path)):
+            makedirs(path.dirname(manifest_path))
+        with open(manifest_path, "w") as manifest_file:
+            yaml.safe_dump(self.manifest_dict[manifest_path], manifest_file)
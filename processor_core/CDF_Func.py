@@ -1,4 +1,5 @@
 import logging
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from os import path, makedirs
@@ -6,7 +7,7 @@ from os import path, makedirs
 
 class CDFfunc:
 
-    version: str = "1.1.4"
+    version: str = "1.1.5"
 
     @staticmethod
     def get_unique_list(*input_lists: list) -> list:
@@ -16,16 +17,70 @@ class CDFfunc:
             *input_lists: Input list objects.
 
         Returns:
-            List object. List of unique items from all the input lists.
+            List object. List of unique items from all the input lists (in order of first appearance).
         """
         # pass in lists and return a list of the unique items across all of them
-        output_list = []
-        for input_list in input_lists:
-            for item in input_list:
-                if item not in output_list:
-                    output_list.append(item)
+        # items are held as dict keys for hashed lookups, lists with unhashable items are checked item by item
+        try:
+            return list(dict.fromkeys(item for input_list in input_lists for item in input_list))
+        except TypeError:
+            output_list = []
+            for input_list in input_lists:
+                for item in input_list:
+                    if item not in output_list:
+                        output_list.append(item)
+
+            return output_list
 
-        return output_list
+    @staticmethod
+    def has_duplicates(input_list: list) -> bool:
+        """ Check a list for duplicate items.
+
+        Args:
+            input_list: Input list object.
+
+        Returns:
+            Bool. True if any item appears more than once in the list, Otherwise False.
+        """
+        try:
+            return len(set(input_list)) != len(input_list)
+        except TypeError:
+            return len(CDFfunc.get_unique_list(input_list)) != len(input_list)
+
+    @staticmethod
+    def get_item_counts(input_list: list) -> dict:
+        """ Count the instances of each item in a list.
+
+        Args:
+            input_list: Input list object (items must be hashable).
+
+        Returns:
+            Dict object. Number of instances of each item in the list, keyed by item (in order of first appearance).
+        """
+        count_dict = {}
+        for item in input_list:
+            count_dict[item] = count_dict.get(item, 0) + 1
+
+        return count_dict
+
+    @staticmethod
+    def get_member_mask(input_list: list, member_list: list, invert: bool = False) -> list:
+        """ Get a mask of the items in a list that are members of another list.
+
+        Args:
+            input_list: Input list object.
+            member_list: List of items to check membership of.
+            invert: Return True for the items that are not members of member_list (default False)
+
+        Returns:
+            List object. Bool for each item in input_list, True if the item is in member_list (or not if invert set).
+        """
+        # member items are held in a set for hashed lookups, lists with unhashable items are checked item by item
+        try:
+            member_set = set(member_list)
+            return [(item in member_set) != invert for item in input_list]
+        except TypeError:
+            return [(item in member_list) != invert for item in input_list]
 
     @staticmethod
     def compare_list_lengths(*input_lists: list) -> bool:
@@ -98,6 +153,38 @@ class CDFfunc:
 
         return output_df
 
+    @staticmethod
+    def read_csv_filtered(source_file: str, filter_col: str, filter_val, chunk_size: int = 100000,
+                          **read_csv_kwargs) -> pd.DataFrame:
+        """ Read a csv file keeping only the rows with a specified value in a column.
+
+        The file is read in chunks and each chunk is filtered as it is read, so rows that are not required are never
+        held in memory together. Rows and index values are identical to reading the whole file then filtering it,
+        provided the data types of the columns do not depend on the rows read (define them via dtype where needed).
+
+        Args:
+            source_file: The csv file to read.
+            filter_col: The column of the csv file to filter on.
+            filter_val: The value of filter_col for the rows to keep.
+            chunk_size: Number of rows to read in each chunk (optional, default 100000).
+            **read_csv_kwargs: Further arguments for pd.read_csv (i.e. skiprows, usecols, dtype).
+
+        Returns:
+            Dataframe. The filtered rows of the csv file.
+        """
+        chunk_df_ls = []
+
+        with pd.read_csv(source_file, chunksize=chunk_size, **read_csv_kwargs) as chunk_reader:
+            for chunk_df in chunk_reader:
+                chunk_df_ls.append(chunk_df.loc[chunk_df[filter_col] == filter_val])
+
+        # concatenate the chunks with rows kept (the first chunk gives the columns if no rows are kept)
+        kept_df_ls = [chunk_df for chunk_df in chunk_df_ls if len(chunk_df) > 0]
+        if len(kept_df_ls) == 0:
+            return chunk_df_ls[0]
+
+        return pd.concat(kept_df_ls)
+
     @staticmethod
     def get_time_val(input_time_str: str, zero_hr: float = 0, unit: str = "hrs") -> float:
         """ Get elapsed time value from a time string.
@@ -131,6 +218,56 @@ class CDFfunc:
 
         return output_time
 
+    @staticmethod
+    def get_time_val_series(input_time_series: pd.Series, zero_hr: float = 0, unit: str = "hrs",
+                            drop_tenths: bool = False) -> np.ndarray:
+        """ Get elapsed time values for a whole Series of time strings.
+
+        Vectorised equivalent of get_time_val, the values returned are identical to calling get_time_val on each
+        time string in turn. Null values in the input Series return a null time value.
+
+        Args:
+            input_time_series: Series of time strings in format 'mm:ss', 'hh:mm:ss' or 'days:hh:mm:ss'.
+                Delimiter may be : or . or a mix.
+            zero_hr: hours from midnight on day 0 to calculate elapsed time from (optional, default 0).
+            unit: Unit for return elapsed time values: 'secs', 'mins' or 'hrs' (optional, default 'hrs').
+            drop_tenths: remove any trailing tenths (i.e. '.5' in 'hh:mm:ss.5') from the time strings before they are
+                converted (optional, default False).
+
+        Returns:
+            Numpy array (float64). Elapsed time values.
+        """
+        time_str_series = pd.Series(input_time_series, dtype=object).reset_index(drop=True)
+        null_mask = time_str_series.isna().to_numpy()
+
+        if drop_tenths:
+            time_str_series = time_str_series.str.replace(r"\.[^:]*$", "", regex=True)
+
+        components_df = time_str_series.str.replace(":", ".", regex=False).str.split(".", expand=True)
+        components_df = components_df.reindex(columns=range(max(4, len(components_df.columns))))
+        num_components = components_df.notna().sum(axis=1).to_numpy()
+        comp_0, comp_1, comp_2, comp_3 = [components_df[idx].to_numpy(dtype=float, na_value=np.nan)
+                                          for idx in range(4)]
+
+        # replicate the order of the operations in get_time_val so that the values returned are identical
+        with np.errstate(invalid='ignore'):
+            output_time = np.select(condlist=[num_components == 2, num_components == 3, num_components == 4],
+                                    choicelist=[comp_0 / 60 + comp_1 / 3600,
+                                                comp_0 + comp_1 / 60 + comp_2 / 3600,
+                                                comp_0 * 24 + (comp_1 + comp_2 / 60 + comp_3 / 3600)],
+                                    default=0.0)
+
+        output_time = output_time - zero_hr
+
+        if unit == "mins":
+            output_time = output_time * 60
+        elif unit == "secs":
+            output_time = output_time * 3600
+
+        output_time[null_mask] = np.nan
+
+        return output_time
+
     @staticmethod
     def row_per_event(input_df: pd.DataFrame, event_count_col: str, drop_zero: bool = True) -> pd.DataFrame:
         """ Convert a Dataframe to a row per event format.
@@ -390,6 +527,73 @@ class CDFfunc:
 
         return return_ls
 
+    @staticmethod
+    def encode_event_detail_cols(*detail_val_cols, detail_keys: list) -> list:
+        """ Encode a list of detail entries for a CDF event as key-value pairs in json string format, column by column
+
+        Vectorised equivalent of encode_event_detail_list, the entries returned are identical but the values for each
+        detail key are converted and have the reserved characters replaced for the whole column at once rather than
+        entry by entry.
+
+        Args:
+            detail_keys: list of detail keys
+            detail_val_cols: lists (or Series / arrays), each contains the values for the corresponding detail key
+
+        Returns:
+            list of detail entries each encoded as a json string
+        """
+        key_val_separator = ':'
+        pair_separator = ', '
+
+        chars_ls = [':', ',', '{', '}', '"', " "]
+        chars_pattern = r'[:,{}" ]'
+        replacement_char = "_"
+
+        # entries are only generated for rows with a value in every column (as zip in encode_event_detail_list)
+        if len(detail_val_cols) == 0:
+            return []
+        num_rows = min([len(detail_val_col) for detail_val_col in detail_val_cols])
+        if num_rows == 0:
+            return []
+
+        # pad the keys if there are more columns than keys
+        detail_keys = list(detail_keys)
+        while len(detail_keys) < len(detail_val_cols):
+            detail_keys.append('no_key')
+
+        # build a format template for the entries with the keys in place and a placeholder for each column's values
+        pair_template_ls = []
+        detail_val_ls_ls = []
+
+        for idx, detail_key in enumerate(detail_keys):
+            for char in chars_ls:
+                detail_key = str(detail_key).replace(char, replacement_char)
+
+            if idx < len(detail_val_cols):
+                if isinstance(detail_val_cols[idx], pd.Series):
+                    detail_val_series = detail_val_cols[idx].iloc[:num_rows]
+                else:
+                    # no type inference for other inputs so that values are converted to strings as they are
+                    detail_val_series = pd.Series(list(detail_val_cols[idx][:num_rows]), dtype=object)
+
+                detail_val_ls = list(map(str, detail_val_series.tolist()))
+                # numeric values cannot contain any of the reserved characters
+                if not pd.api.types.is_numeric_dtype(detail_val_series):
+                    detail_val_ls = pd.Series(detail_val_ls, dtype=object).str.replace(
+                        chars_pattern, replacement_char, regex=True).tolist()
+
+                detail_val_ls_ls.append(detail_val_ls)
+                detail_val = '%s'
+            else:
+                # pad the values if there are more keys than columns
+                detail_val = 'no_val'
+
+            pair_template_ls.append(f'"{detail_key.replace("%", "%%")}"{key_val_separator}"{detail_val}"')
+
+        entry_template = '{' + pair_separator.join(pair_template_ls) + '}'
+
+        return [entry_template % detail_vals for detail_vals in zip(*detail_val_ls_ls)]
+
     @staticmethod
     def encode_event_detail(detail_key_ls: list, detail_val_ls: list) -> str:
         """ encode detail for CDF event as json string
@@ -1,8 +1,12 @@
 import yaml
+from collections import deque
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from .CDF_Func import CDFfunc
-from .Entity import Entity
+from .Entity import Entity, CompactEntity
+from .EventStore import EventStore, EventColumn
+from .LocationIndex import LocationIndex
 from os import path, makedirs, listdir
 
 
@@ -19,7 +23,7 @@ class DataSet:
     Attributes:
         instance count: Count of Dataset class instances created.
     """
-    version: str = "1.6.2"
+    version: str = "1.6.3"
 
     def __init__(self, dataset_config: dict, log_file: bool = True, log_stream: bool = True) -> None:
         """ Dataset class init method.
@@ -49,6 +53,12 @@ class DataSet:
                 - drop_seen_events: (option) drop seen by secondary events from CDF events output
                 - drop_spot_events: (option) drop spotted by secondary events from CDF events output
                 - drop_shot_events: (option) drop shot events from CDF events output
+                - columnar_event_store: (option) hold entity event data in a columnar event store (see EventStore)
+                - lazy_event_detail: (option) keep raw event detail values from load_event_maps and only encode the
+                  event detail strings on export
+                - event_location_mode: (option) previous, nearest or interpolated - how entity locations at events
+                  between location updates are set (see LocationIndex)
+                - compact_entities: (option) hold entities as CompactEntity instances (see Entity)
             log_file: generate a dataset log file (default True)
             log_stream: print dataset log entries (default True)
         """
@@ -76,6 +86,10 @@ class DataSet:
         self.drop_spot_events = False
         self.drop_seen_events = False
         self.drop_shot_events = False
+        self.columnar_event_store = False
+        self.lazy_event_detail = False
+        self.event_location_mode = 'previous'
+        self.compact_entities = False
 
         location_param_ls = ['input_location', 'output_location']
 
@@ -159,6 +173,9 @@ class DataSet:
         # set a default name for dataset save files
         self.save_file_name = "dataset_save.yaml"
 
+        # maximum number of log events for each individual CDF output check (further issues are counted but not logged)
+        self.check_log_limit = 1000
+
         # labels for case and rep columns
         self.case_col_lbl = "case"
         self.rep_col_lbl = "rep"
@@ -242,6 +259,8 @@ class DataSet:
                               self.seen_event_lbl: self.seen_event_short_lbl,
                               self.stop_event_lbl: self.stop_event_short_lbl,
                               self.status_event_lbl: self.status_event_short_lbl}
+        # map short labels back to their labels, used to parse event ids
+        self.event_short_lbl_map = {short_lbl: lbl for lbl, short_lbl in self.event_lbl_map.items()}
 
         # set up variables with the last event number for each event type
         self.loc_event_last_ser = 0
@@ -253,6 +272,16 @@ class DataSet:
         self.stop_event_last_ser = 0
         self.status_event_last_ser = 0
 
+        # map labels to the variable with the last event number for that event type
+        self.event_last_ser_map = {self.loc_event_lbl: 'loc_event_last_ser',
+                                   self.shot_event_lbl: 'shot_event_last_ser',
+                                   self.kill_event_lbl: 'kill_event_last_ser',
+                                   self.loss_event_lbl: 'loss_event_last_ser',
+                                   self.spot_event_lbl: 'spot_event_last_ser',
+                                   self.seen_event_lbl: 'seen_event_last_ser',
+                                   self.stop_event_lbl: 'stop_event_last_ser',
+                                   self.status_event_lbl: 'status_event_last_ser'}
+
         # labels for CDF combat power columns
         self.cbt_tbl_time_col_lbl = "time"
         self.cbt_tbl_item_col_lbl = "item"
@@ -322,6 +351,68 @@ class DataSet:
 
         # array of instances of the Entity class
         self.entities = []
+        # dict of entity uid to index position of the Entity instance in the entities array
+        self.entity_idx_dict = {}
+        # uid interning - each uid is held once and mapped to a dense int32 uid code (see intern_uids / get_uid_codes).
+        # The entity data lists and event_id_dicts hold the interned uids, the uid codes are only used for the events
+        # dataframe (sorting, locating events and mapping entity details in generate_cdf_events_df)
+        self.uid_code_dict = {}
+        self.code_uid_ls = []
+        # event id index of (event type, serial) to (primary entity uid, data_idx) for each event, built on first use
+        # by find_event and then maintained as events are added and removed (None until built)
+        self.event_id_index = None
+
+        # map of Entity event data lists to the event type and column of the event store table holding the data
+        self.event_list_map = {'location_time': (self.loc_event_lbl, 'time'),
+                               'location_x': (self.loc_event_lbl, 'x'),
+                               'location_y': (self.loc_event_lbl, 'y'),
+                               'location_detail': (self.loc_event_lbl, 'detail'),
+                               'shots_time': (self.shot_event_lbl, 'time'),
+                               'shots_detail': (self.shot_event_lbl, 'detail'),
+                               'kills_time': (self.kill_event_lbl, 'time'),
+                               'kills_victim': (self.kill_event_lbl, 'sec_uid'),
+                               'kills_detail': (self.kill_event_lbl, 'detail'),
+                               'losses_time': (self.loss_event_lbl, 'time'),
+                               'losses_killer': (self.loss_event_lbl, 'sec_uid'),
+                               'losses_detail': (self.loss_event_lbl, 'detail'),
+                               'spot_time': (self.spot_event_lbl, 'time'),
+                               'spot_entity': (self.spot_event_lbl, 'sec_uid'),
+                               'spot_detail': (self.spot_event_lbl, 'detail'),
+                               'seen_time': (self.seen_event_lbl, 'time'),
+                               'seen_entity': (self.seen_event_lbl, 'sec_uid'),
+                               'seen_detail': (self.seen_event_lbl, 'detail'),
+                               'stop_time': (self.stop_event_lbl, 'time'),
+                               'stop_entity': (self.stop_event_lbl, 'sec_uid'),
+                               'stop_detail': (self.stop_event_lbl, 'detail'),
+                               'state_time': (self.status_event_lbl, 'time'),
+                               'state_detail': (self.status_event_lbl, 'detail')}
+        # columns of the event store tables holding data for each event type (the event data list columns and the
+        # event serials)
+        self.event_type_col_dict = {}
+        for event_type, col in self.event_list_map.values():
+            self.event_type_col_dict.setdefault(event_type, []).append(col)
+        for col_ls in self.event_type_col_dict.values():
+            col_ls.append('evn_ser')
+        # entity event data lists holding secondary entity uids (interned as they are added)
+        self.sec_uid_list_ls = [list_name for list_name, (event_type, col) in self.event_list_map.items()
+                                if col == 'sec_uid']
+        # order of the event types for each entity in the CDF events output (before sorting)
+        self.event_type_order_ls = [self.loc_event_lbl, self.shot_event_lbl, self.kill_event_lbl,
+                                    self.loss_event_lbl, self.spot_event_lbl, self.seen_event_lbl,
+                                    self.stop_event_lbl, self.status_event_lbl]
+        # raw event detail held for encoding on export (only used if lazy_event_detail option set), list of dicts
+        # with the event type, detail keys, event serials and a Dataframe of the detail values for the events
+        self.lazy_detail_ls = []
+        # (event type, serial) to (lazy_detail_ls index, row in its detail_df) for the events with raw event detail,
+        # built on first use by get_lazy_event_detail and reset when raw event detail is added
+        self.lazy_detail_idx_dict = None
+        # columnar event store (only used if columnar_event_store option set)
+        self.event_store = None
+        if self.columnar_event_store:
+            self.logger.info("Using columnar event store for entity event data")
+            self.event_store = EventStore(self.event_type_order_ls)
+        # paths of the files written by the last call of export_data
+        self.exported_file_ls = []
 
         # if reading entity data from table use generate_entities_from_table to populate entities list
         if self.entity_data_from_table:
@@ -379,8 +470,15 @@ class DataSet:
         Args:
             uid: Sets the uid of the new Entity instance
         """
-        if uid not in self.get_uid_ls():
-            self.entities.append(Entity(uid))
+        if uid not in self.entity_idx_dict:
+            uid = self.intern_uids([uid])[0]
+            if self.compact_entities:
+                self.entities.append(CompactEntity(uid))
+            else:
+                self.entities.append(Entity(uid))
+            self.entity_idx_dict[uid] = len(self.entities) - 1
+            if self.event_store is not None:
+                self.event_store.attach_entity(self.entities[-1], self.event_list_map)
             self.logger.debug(f"Entity added - entity uid {uid}")
         else:
             self.logger.error(f"entity with uid {uid} already in entities array")
@@ -394,16 +492,19 @@ class DataSet:
         Returns:
             int: The index number of the Entity instance if it is within the entities array, Otherwise None.
         """
-        ent_idx = None
-        for index, entity in enumerate(self.entities):
-            if entity.uid == search_id:
-                ent_idx = index
+        ent_idx = self.entity_idx_dict.get(search_id)
 
         if ent_idx is None:
             self.logger.error(f"Get entity index failed - uid: {search_id}")
 
         return ent_idx
 
+    def has_entity(self, uid: str) -> bool:
+        """
+        Return True if an Entity instance with uid is in the entities array, otherwise False
+        """
+        return uid in self.entity_idx_dict
+
     def get_num_entities(self) -> int:
         """
         Return the number of entity instances in the entities array
@@ -420,19 +521,98 @@ class DataSet:
 
         return uid_ls
 
+    def intern_uids(self, uid_ls: list) -> list:
+        """ Intern a list of uids.
+
+        Each uid is replaced by the single instance of that uid held by the Dataset, so that uids repeated in the
+        entity data lists (i.e. secondary entity uids read from every row of a model output file) are only held in
+        memory once. Uids not seen before are assigned the next uid code. Uids that compare equal share an instance
+        and uid code (as for the entity_idx_dict).
+
+        Args:
+            uid_ls: List of uids (null values are returned unchanged and are not assigned a uid code).
+
+        Returns:
+            List object. The interned uids.
+        """
+        interned_ls = []
+        for uid in uid_ls:
+            uid_code = self.uid_code_dict.get(uid)
+            if uid_code is None:
+                if pd.isna(uid):
+                    interned_ls.append(uid)
+                    continue
+                uid_code = len(self.code_uid_ls)
+                self.uid_code_dict[uid] = uid_code
+                self.code_uid_ls.append(uid)
+            interned_ls.append(self.code_uid_ls[uid_code])
+
+        return interned_ls
+
+    def get_uid_codes(self, uid_values) -> np.ndarray:
+        """
+        Return an int32 array of the uid codes for uid_values (list, array or Series of uids, uids not seen before are
+        interned), null values are given the code -1
+        """
+        uid_series = pd.Series(np.asarray(uid_values, dtype=object), dtype=object)
+        uid_code_series = uid_series.map(self.uid_code_dict)
+        new_uid_mask = uid_code_series.isna() & uid_series.notna()
+        if new_uid_mask.any():
+            self.intern_uids(uid_series.loc[new_uid_mask].unique())
+            uid_code_series = uid_series.map(self.uid_code_dict)
+
+        return uid_code_series.fillna(-1).to_numpy(dtype=np.int32)
+
+    def get_uids(self, uid_code_arr: np.ndarray) -> np.ndarray:
+        """
+        Return an object array of the uids for an array of uid codes (None for the code -1)
+        """
+        code_uid_arr = np.empty(len(self.code_uid_ls) + 1, dtype=object)
+        code_uid_arr[:-1] = self.code_uid_ls
+
+        return code_uid_arr[np.asarray(uid_code_arr, dtype=np.int64)]
+
     def remove_entity(self, uid: str) -> None:
         """ Remove an Entity instance from the entities array.
 
+        Removing an entity moves all later entities down one position in the entities array so entity_idx_dict is
+        renumbered from the removed entity on (O(n) for each removal), use remove_entities to remove several entities.
+
         Args:
             uid: The uid of the Entity instance to remove.
         """
-        ent_idx = self.get_entity_index(uid)
-        if ent_idx is not None:
-            del self.entities[ent_idx]
-            self.logger.debug(f"Entity removed - entity uid {uid}")
-        else:
-            self.logger.error(f"Removal of entity uid: {uid} failed - unknown uid")
-        pass
+        self.remove_entities([uid])
+
+    def remove_entities(self, uid_ls: list) -> None:
+        """ Remove a number of Entity instances from the entities array.
+
+        The entities array and entity_idx_dict are rebuilt once for all the entities removed.
+
+        Args:
+            uid_ls: The uids of the Entity instances to remove.
+        """
+        remove_idx_set = set()
+        for uid in uid_ls:
+            ent_idx = self.get_entity_index(uid)
+            if ent_idx is not None:
+                if ent_idx in remove_idx_set:
+                    continue
+                remove_idx_set.add(ent_idx)
+                # remove the entity's events from the event id index (if built)
+                if self.event_id_index is not None:
+                    ent_event_id_dict = self.get_entity_event_id_dict(self.entities[ent_idx])
+                    for event_key in zip(ent_event_id_dict['type'], ent_event_id_dict['evn_ser']):
+                        self.event_id_index.pop(event_key, None)
+                if self.event_store is not None:
+                    self.event_store.detach_entity(uid)
+                self.logger.debug(f"Entity removed - entity uid {uid}")
+            else:
+                self.logger.error(f"Removal of entity uid: {uid} failed - unknown uid")
+
+        if len(remove_idx_set) > 0:
+            # the remaining entities keep their order in the entities array, renumber them all once
+            self.entities[:] = [entity for idx, entity in enumerate(self.entities) if idx not in remove_idx_set]
+            self.entity_idx_dict = {entity.uid: idx for idx, entity in enumerate(self.entities)}
 
     def set_entity_data(self, uid: str, **input_data) -> None:
         """ Set the value of one or more parameters of an Entity instance.
@@ -458,7 +638,7 @@ class DataSet:
             settings = input_data.items()
 
             for setting in settings:
-                if setting[0] in vars(self.entities[ent_idx]).keys():
+                if setting[0] in self.entities[ent_idx].get_attribute_ls():
                     setattr(self.entities[ent_idx], setting[0], setting[1])
                     self.logger.debug(f"Entity {uid} - {setting[0]} set as  {setting[1]}")
                 else:
@@ -488,7 +668,7 @@ class DataSet:
         system_entity_ls = input_entity_table_df[self.ent_tbl_sys_entity_col_lbl].to_list()
         start_entity_ls = input_entity_table_df[self.ent_tbl_start_entity_col_lbl].to_list()
 
-        if len(CDFfunc.get_unique_list(id_ls)) < len(id_ls):
+        if CDFfunc.has_duplicates(id_ls):
             self.logger.error("Entities with same uid present in source entity table")
 
         for idx, uid in enumerate(id_ls):
@@ -526,10 +706,12 @@ class DataSet:
             self.logger.error(f"No data passed to append to list - entity uid {uid}, target list {target_list}")
 
         if ent_idx is not None and data_list is not None:
+            if target_list in self.sec_uid_list_ls:
+                data_list = self.intern_uids(data_list)
+
             if target_list == "location_time":
                 self.entities[ent_idx].location_time.extend(data_list)
-                for i in range(len(data_list)):
-                    self.add_event_id(prim_uid=uid, add_event_type=self.loc_event_lbl)
+                self.add_event_ids(prim_uid=uid, num_events=len(data_list), add_event_type=self.loc_event_lbl)
             elif target_list == "location_x":
                 self.entities[ent_idx].location_x.extend(data_list)
             elif target_list == "location_y":
@@ -539,8 +721,7 @@ class DataSet:
 
             elif target_list == "shots_time":
                 self.entities[ent_idx].shots_time.extend(data_list)
-                for i in range(len(data_list)):
-                    self.add_event_id(prim_uid=uid, add_event_type=self.shot_event_lbl)
+                self.add_event_ids(prim_uid=uid, num_events=len(data_list), add_event_type=self.shot_event_lbl)
             elif target_list == "shots_detail":
                 self.entities[ent_idx].shots_detail.extend(data_list)
 
@@ -548,8 +729,7 @@ class DataSet:
                 self.entities[ent_idx].kills_time.extend(data_list)
             elif target_list == "kills_victim":
                 self.entities[ent_idx].kills_victim.extend(data_list)
-                for sec_uid in data_list:
-                    self.add_event_id(prim_uid=uid, sec_uid=sec_uid, add_event_type=self.kill_event_lbl)
+                self.add_event_ids(prim_uid=uid, sec_uids=data_list, add_event_type=self.kill_event_lbl)
             elif target_list == "kills_detail":
                 self.entities[ent_idx].kills_detail.extend(data_list)
 
@@ -557,8 +737,7 @@ class DataSet:
                 self.entities[ent_idx].losses_time.extend(data_list)
             elif target_list == "losses_killer":
                 self.entities[ent_idx].losses_killer.extend(data_list)
-                for sec_uid in data_list:
-                    self.add_event_id(prim_uid=uid, sec_uid=sec_uid, add_event_type=self.loss_event_lbl)
+                self.add_event_ids(prim_uid=uid, sec_uids=data_list, add_event_type=self.loss_event_lbl)
             elif target_list == "losses_detail":
                 self.entities[ent_idx].losses_detail.extend(data_list)
 
@@ -566,8 +745,7 @@ class DataSet:
                 self.entities[ent_idx].spot_time.extend(data_list)
             elif target_list == "spot_entity":
                 self.entities[ent_idx].spot_entity.extend(data_list)
-                for sec_uid in data_list:
-                    self.add_event_id(prim_uid=uid, sec_uid=sec_uid, add_event_type=self.spot_event_lbl)
+                self.add_event_ids(prim_uid=uid, sec_uids=data_list, add_event_type=self.spot_event_lbl)
             elif target_list == "spot_detail":
                 self.entities[ent_idx].spot_detail.extend(data_list)
 
@@ -575,8 +753,7 @@ class DataSet:
                 self.entities[ent_idx].seen_time.extend(data_list)
             elif target_list == "seen_entity":
                 self.entities[ent_idx].seen_entity.extend(data_list)
-                for sec_uid in data_list:
-                    self.add_event_id(prim_uid=uid, sec_uid=sec_uid, add_event_type=self.seen_event_lbl)
+                self.add_event_ids(prim_uid=uid, sec_uids=data_list, add_event_type=self.seen_event_lbl)
             elif target_list == "seen_detail":
                 self.entities[ent_idx].seen_detail.extend(data_list)
 
@@ -584,15 +761,13 @@ class DataSet:
                 self.entities[ent_idx].stop_time.extend(data_list)
             elif target_list == "stop_entity":
                 self.entities[ent_idx].stop_entity.extend(data_list)
-                for sec_uid in data_list:
-                    self.add_event_id(prim_uid=uid, sec_uid=sec_uid, add_event_type=self.stop_event_lbl)
+                self.add_event_ids(prim_uid=uid, sec_uids=data_list, add_event_type=self.stop_event_lbl)
             elif target_list == "stop_detail":
                 self.entities[ent_idx].stop_detail.extend(data_list)
 
             elif target_list == "state_time":
                 self.entities[ent_idx].state_time.extend(data_list)
-                for i in range(len(data_list)):
-                    self.add_event_id(prim_uid=uid, add_event_type=self.status_event_lbl)
+                self.add_event_ids(prim_uid=uid, num_events=len(data_list), add_event_type=self.status_event_lbl)
             elif target_list == "state_detail":
                 self.entities[ent_idx].state_detail.extend(data_list)
 
@@ -605,6 +780,133 @@ class DataSet:
         else:
             self.logger.debug(f"Entity uid {uid} - data appended to {target_list}")
 
+    def load_event_maps(self, event_map_ls: list) -> None:
+        """ Add event data to all Entity instances from a list of event maps.
+
+        Each event map defines a Dataframe of event data, the column to mask on using the entity uid and how the
+        columns of the Dataframe map to the Entity data lists. The Dataframe for each event map is grouped by the mask
+        column once and the slice for each Entity instance is then sent to the append_to_list function in turn. The
+        event detail is encoded for the whole Dataframe at once using encode_event_detail_cols. This gives the same
+        result as slicing the Dataframe for each Entity instance separately.
+
+        Args:
+            event_map_ls: List of event map dicts, each with the following keys:
+                - df: the Dataframe to pull the data from
+                - df_name: name of the Dataframe for logging
+                - mask_col: column to mask on using the uid
+                - data_maps: [[data column in df, target list for append to list]]
+                - detail_keys: [keys for the detail key-value pairs]
+                - detail_cols: [columns in the df with the values for the detail key-value pairs]
+                - detail_list: detail target list for append to list
+        """
+        for event_map in event_map_ls:
+            event_df = event_map['df']
+            df_name = event_map['df_name']
+            mask_col = event_map['mask_col']
+            data_maps = event_map['data_maps']
+            detail_keys = event_map['detail_keys']
+            detail_cols = event_map['detail_cols']
+            detail_list = event_map['detail_list']
+
+            self.logger.info(f"loading event data from {df_name} into entities, masking on {mask_col}, "
+                             f"data maps: {data_maps}, detail keys: {detail_keys}, detail columns: {detail_cols}")
+
+            # group the event df by the mask column once to get the row positions for each uid
+            uid_row_idx_dict = event_df.groupby(by=mask_col, sort=False).indices
+            # with the columnar event store the data is sliced from arrays for each entity and added to the event
+            # store tables without building Python lists for each entity
+            col_data_dict = {}
+            for col in CDFfunc.get_unique_list([mapping[0] for mapping in data_maps]):
+                if self.event_store is not None:
+                    col_data_dict[col] = event_df[col].to_numpy()
+                else:
+                    col_data_dict[col] = event_df[col].tolist()
+            # lazy event detail - keep the raw detail values for the events and encode the detail on export
+            lazy_detail = self.lazy_event_detail and detail_list.lower() in self.event_list_map and len(detail_cols) > 0
+            lazy_event_type = None
+            lazy_row_idx_ls = []
+            lazy_evn_ser_ls = []
+            if lazy_detail:
+                lazy_event_type = self.event_list_map[detail_list.lower()][0]
+                detail_encoded_ls = []
+            else:
+                # encode the detail for all rows of the event df at once
+                detail_encoded_ls = CDFfunc.encode_event_detail_cols(*[event_df[col] for col in detail_cols],
+                                                                     detail_keys=detail_keys)
+                if self.event_store is not None:
+                    detail_encoded_arr = np.empty(len(detail_encoded_ls), dtype=object)
+                    detail_encoded_arr[:] = detail_encoded_ls
+                    detail_encoded_ls = detail_encoded_arr
+
+            for entity in self.entities:
+                uid = entity.uid
+                row_idx_ls = uid_row_idx_dict.get(uid, [])
+
+                self.logger.debug(f"reading event data from {df_name} for entity {uid}")
+                for mapping in data_maps:
+                    data_col = mapping[0]
+                    tgt_list = mapping[1]
+
+                    if self.event_store is not None:
+                        data_ls = col_data_dict[data_col][row_idx_ls]
+                    else:
+                        data_ls = [col_data_dict[data_col][row_idx] for row_idx in row_idx_ls]
+                    if len(data_ls) > 0:
+                        self.append_to_list(uid=uid, target_list=tgt_list, data_list=data_ls)
+                    else:
+                        self.logger.debug(f"no data for {tgt_list} from {df_name} for entity {uid}")
+
+                self.logger.debug(f"adding encoded event detail for entity {uid}")
+                num_rows = len(row_idx_ls)
+                if lazy_detail and num_rows > 0:
+                    lazy_evn_ser = self.get_last_event_sers(entity, lazy_event_type, num_rows)
+                    if lazy_evn_ser is not None:
+                        lazy_row_idx_ls.append(row_idx_ls)
+                        lazy_evn_ser_ls.extend(lazy_evn_ser)
+                        detail_data_encoded = [None] * num_rows
+                    else:
+                        self.logger.error(f"no event ids for {detail_list} from {df_name} for entity {uid}, "
+                                          f"event detail encoded on load")
+                        detail_data_encoded = CDFfunc.encode_event_detail_cols(
+                            *[event_df[col].iloc[row_idx_ls] for col in detail_cols], detail_keys=detail_keys)
+                elif len(detail_encoded_ls) > 0 and self.event_store is not None:
+                    detail_data_encoded = detail_encoded_ls[row_idx_ls]
+                elif len(detail_encoded_ls) > 0:
+                    detail_data_encoded = [detail_encoded_ls[row_idx] for row_idx in row_idx_ls]
+                else:
+                    detail_data_encoded = []
+                if len(detail_data_encoded) > 0:
+                    self.append_to_list(uid=uid, target_list=detail_list, data_list=detail_data_encoded)
+                else:
+                    self.logger.debug(f"no data for {detail_list} from {df_name} for entity {uid}")
+
+            if len(lazy_evn_ser_ls) > 0:
+                self.logger.debug(f"raw event detail for {len(lazy_evn_ser_ls)} {lazy_event_type} events from "
+                                  f"{df_name} held for encoding on export")
+                lazy_detail_df = event_df[detail_cols].iloc[np.concatenate(lazy_row_idx_ls)].reset_index(drop=True)
+                self.lazy_detail_ls.append({'event_type': lazy_event_type,
+                                            'detail_keys': list(detail_keys),
+                                            'evn_ser': np.array(lazy_evn_ser_ls, dtype=np.int64),
+                                            'detail_df': lazy_detail_df})
+                self.lazy_detail_idx_dict = None
+
+    def get_last_event_sers(self, entity, event_type: str, num_events: int):
+        """
+        Return the serials of the last num_events events added to an Entity instance if they are all of event_type
+        (the last entries in its entity_event_id_dict or, with the columnar event store, in the event store table for
+        event_type), otherwise return None
+        """
+        if self.event_store is not None and event_type in self.event_store.tables:
+            evn_ser_col = self.event_store.get_column(entity.uid, event_type, 'evn_ser')
+            if len(evn_ser_col) < num_events:
+                return None
+            return evn_ser_col.values()[len(evn_ser_col) - num_events:].tolist()
+
+        ent_event_id_dict = entity.entity_event_id_dict
+        if ent_event_id_dict['type'][-num_events:] != [event_type] * num_events:
+            return None
+        return ent_event_id_dict['evn_ser'][-num_events:]
+
     def add_location(self, uid: str, time: float, x: float, y: float, detail_keys: list, detail_vals: list) -> None:
         """
         Add a single location update event to an Entity instance.
@@ -665,6 +967,7 @@ class DataSet:
         """
         ent_idx = self.get_entity_index(uid)
         if ent_idx is not None:
+            victim = self.intern_uids([victim])[0]
             self.entities[ent_idx].kills_time.append(time)
             self.entities[ent_idx].kills_victim.append(victim)
             detail = CDFfunc.encode_event_detail(detail_key_ls=detail_keys, detail_val_ls=detail_vals)
@@ -689,6 +992,7 @@ class DataSet:
         """
         ent_idx = self.get_entity_index(uid)
         if ent_idx is not None:
+            killer = self.intern_uids([killer])[0]
             self.entities[ent_idx].losses_time.append(time)
             self.entities[ent_idx].losses_killer.append(killer)
             detail = CDFfunc.encode_event_detail(detail_key_ls=detail_keys, detail_val_ls=detail_vals)
@@ -714,6 +1018,7 @@ class DataSet:
         """
         ent_idx = self.get_entity_index(uid)
         if ent_idx is not None:
+            entity = self.intern_uids([entity])[0]
             self.entities[ent_idx].spot_time.append(time)
             self.entities[ent_idx].spot_entity.append(entity)
             detail = CDFfunc.encode_event_detail(detail_key_ls=detail_keys, detail_val_ls=detail_vals)
@@ -738,6 +1043,7 @@ class DataSet:
         """
         ent_idx = self.get_entity_index(uid)
         if ent_idx is not None:
+            entity = self.intern_uids([entity])[0]
             self.entities[ent_idx].seen_time.append(time)
             self.entities[ent_idx].seen_entity.append(entity)
             detail = CDFfunc.encode_event_detail(detail_key_ls=detail_keys, detail_val_ls=detail_vals)
@@ -762,6 +1068,7 @@ class DataSet:
         """
         ent_idx = self.get_entity_index(uid)
         if ent_idx is not None:
+            entity = self.intern_uids([entity])[0]
             self.entities[ent_idx].stop_time.append(time)
             self.entities[ent_idx].stop_entity.append(entity)
             detail = CDFfunc.encode_event_detail(detail_key_ls=detail_keys, detail_val_ls=detail_vals)
@@ -800,74 +1107,117 @@ class DataSet:
         Args:
             remove_id: event id of the event to remove
         """
-        event_id_dict = self.get_event_id_dict()
+        self.remove_events([remove_id])
 
-        ent_uid = self.search_event_id_dict(search_id=remove_id, data_key='prim_uid', event_id_dict=event_id_dict)
-        ent_idx = self.get_entity_index(ent_uid)
-        data_idx = self.search_event_id_dict(search_id=remove_id, data_key='data_idx', event_id_dict=event_id_dict)
-        event_type = self.search_event_id_dict(search_id=remove_id, data_key='type', event_id_dict=event_id_dict)
-        removed = False
+    def remove_events(self, remove_ids: list) -> None:
+        """
+        Remove a number of events from the Dataset instance.
 
-        if ent_idx is None or data_idx is None or event_type is None:
-            self.logger.error(f"remove_event - bad remove_id {remove_id} (no event removed)")
-        else:
-            if event_type == self.loc_event_lbl:
-                del self.entities[ent_idx].location_time[data_idx]
-                del self.entities[ent_idx].location_x[data_idx]
-                del self.entities[ent_idx].location_y[data_idx]
-                del self.entities[ent_idx].location_detail[data_idx]
-                removed = True
-            elif event_type == self.shot_event_lbl:
-                del self.entities[ent_idx].shots_time[data_idx]
-                del self.entities[ent_idx].shots_detail[data_idx]
-                removed = True
-            elif event_type == self.spot_event_lbl:
-                del self.entities[ent_idx].spot_time[data_idx]
-                del self.entities[ent_idx].spot_entity[data_idx]
-                del self.entities[ent_idx].spot_detail[data_idx]
-                removed = True
-            elif event_type == self.seen_event_lbl:
-                del self.entities[ent_idx].seen_time[data_idx]
-                del self.entities[ent_idx].seen_entity[data_idx]
-                del self.entities[ent_idx].seen_detail[data_idx]
-                removed = True
-            elif event_type == self.kill_event_lbl:
-                del self.entities[ent_idx].kills_time[data_idx]
-                del self.entities[ent_idx].kills_victim[data_idx]
-                del self.entities[ent_idx].kills_detail[data_idx]
-                removed = True
-            elif event_type == self.loss_event_lbl:
-                del self.entities[ent_idx].losses_time[data_idx]
-                del self.entities[ent_idx].losses_killer[data_idx]
-                del self.entities[ent_idx].losses_detail[data_idx]
-                removed = True
-            elif event_type == self.stop_event_lbl:
-                del self.entities[ent_idx].stop_time[data_idx]
-                del self.entities[ent_idx].stop_entity[data_idx]
-                del self.entities[ent_idx].stop_detail[data_idx]
-                removed = True
-            elif event_type == self.status_event_lbl:
-                del self.entities[ent_idx].state_time[data_idx]
-                del self.entities[ent_idx].state_detail[data_idx]
-                removed = True
-            else:
+        The events are found using the event id index and removed entity by entity, the data lists and
+        entity_event_id_dict (or event store evn_ser columns) of each entity are rebuilt once for all the events
+        removed from it.
+        Args:
+            remove_ids: list of the event ids of the events to remove
+        """
+        # data_idx values of the events to remove by primary entity uid and event type
+        remove_dict = {}
+        for remove_id in remove_ids:
+            ent_idx, event_type, data_idx = self.find_event(remove_id)
+            if ent_idx is None:
+                self.logger.error(f"remove_event - bad remove_id {remove_id} (no event removed)")
+            elif event_type not in self.event_type_order_ls:
                 self.logger.error(f"remove_event called with remove_id {remove_id} that has an unrecognised "
                                   f"event type {event_type} (event not removed)")
+            else:
+                ent_uid = self.entities[ent_idx].uid
+                remove_dict.setdefault(ent_uid, {}).setdefault(event_type, {})[data_idx] = remove_id
+
+        for ent_uid, type_remove_dict in remove_dict.items():
+            entity = self.entities[self.get_entity_index(ent_uid)]
+
+            # remove the data items for the events from the entity's data lists
+            for event_type, idx_id_dict in type_remove_dict.items():
+                for list_name, (list_event_type, col) in self.event_list_map.items():
+                    if list_event_type == event_type:
+                        self.remove_list_items(entity.get_data_list(list_name), idx_id_dict)
+                if self.event_store is not None:
+                    self.remove_list_items(self.event_store.get_column(ent_uid, event_type, 'evn_ser'), idx_id_dict)
+                entity.event_type_count_dict[event_type] -= len(idx_id_dict)
+
+            if self.event_store is not None:
+                # the serials are held in the event store tables, the data_idx of each event is its position in the
+                # entity's rows for the event type
+                ent_event_id_dict = self.event_store.get_entity_event_id_dict(ent_uid, list(type_remove_dict))
+            else:
+                # remove the entries for the events from the entity's event_id_dict and renumber the data_idx values
+                ent_event_id_dict = entity.entity_event_id_dict
+                keep_idx_ls = [idx for idx, (id_type, data_idx) in
+                               enumerate(zip(ent_event_id_dict['type'], ent_event_id_dict['data_idx']))
+                               if data_idx not in type_remove_dict.get(id_type, {})]
+                for key in ent_event_id_dict:
+                    ent_event_id_dict[key][:] = [ent_event_id_dict[key][idx] for idx in keep_idx_ls]
+                type_count_dict = {}
+                for idx, id_type in enumerate(ent_event_id_dict['type']):
+                    ent_event_id_dict['data_idx'][idx] = type_count_dict.get(id_type, 0)
+                    type_count_dict[id_type] = ent_event_id_dict['data_idx'][idx] + 1
+
+            # update the event id index for the events removed and the remaining events of the entity
+            for event_type, idx_id_dict in type_remove_dict.items():
+                for remove_id in idx_id_dict.values():
+                    self.event_id_index.pop(self.parse_event_id(remove_id), None)
+                    # add a debug event to the log
+                    self.logger.debug(f"event {remove_id} removed from entity {ent_uid}")
+            self.event_id_index.update(zip(zip(ent_event_id_dict['type'], ent_event_id_dict['evn_ser']),
+                                           zip([ent_uid] * len(ent_event_id_dict['type']),
+                                               ent_event_id_dict['data_idx'])))
+
+    def remove_list_items(self, data_ls, idx_dict: dict) -> None:
+        """
+        Remove the items at the index positions in idx_dict from an entity data list (or typed array or EventColumn)
+        """
+        if len(data_ls) == 0:
+            return
+        if isinstance(data_ls, EventColumn):
+            bad_idx_ls = [idx for idx in idx_dict if idx >= len(data_ls)]
+            if len(bad_idx_ls) > 0:
+                # the data list is shorter than the event ids for its event type
+                self.logger.error(f"remove_event - mismatched list lengths, no {data_ls.col} data for events "
+                                  f"{[idx_dict[idx] for idx in bad_idx_ls]}")
+            data_ls.delete_positions([idx for idx in idx_dict if idx < len(data_ls)])
+        else:
+            keep_ls = [item for idx, item in enumerate(data_ls) if idx not in idx_dict]
+            del data_ls[:]
+            data_ls.extend(keep_ls)
+
+    def get_entity_event_id_dict(self, entity) -> dict:
+        """
+        Return the entity_event_id_dict for an entity, with the columnar event store the event ids held in the event
+        store tables (type by type) followed by any held by the entity (event types with no event store table)
+        """
+        if self.event_store is None:
+            return entity.entity_event_id_dict
+
+        ent_event_id_dict = self.event_store.get_entity_event_id_dict(entity.uid, self.event_type_order_ls)
+        entity_event_id_dict = entity.get_data_list('entity_event_id_dict')
+        if len(entity_event_id_dict) > 0 and len(entity_event_id_dict['evn_ser']) > 0:
+            for key, event_id_data_ls in ent_event_id_dict.items():
+                event_id_data_ls.extend(entity.entity_event_id_dict[key])
+
+        return ent_event_id_dict
+
+    def get_entity_event_count(self, entity) -> int:
+        """
+        Return the number of events held for an entity (in its entity_event_id_dict and any event store tables)
+        """
+        num_events = 0
+        entity_event_id_dict = entity.get_data_list('entity_event_id_dict')
+        if len(entity_event_id_dict) > 0:
+            num_events += len(entity_event_id_dict['evn_ser'])
+        if self.event_store is not None:
+            num_events += sum([self.event_store.get_col_length(entity.uid, event_type, 'evn_ser')
+                               for event_type in self.event_store.tables])
 
-        if removed:
-            event_id_dict_idx = None
-            # remove the entry for the event from the entity's event_id_dict
-            for idx, event_id in enumerate(self.entities[ent_idx].entity_event_id_dict['evn_id']):
-                if event_id == remove_id:
-                    event_id_dict_idx = idx
-            for key in self.entities[ent_idx].entity_event_id_dict.keys():
-                del self.entities[ent_idx].entity_event_id_dict[key][event_id_dict_idx]
-            # adjust data_idx for all events of the same type with a later event_id
-            for idx in range(event_id_dict_idx, len(self.entities[ent_idx].entity_event_id_dict['evn_id'])):
-                if self.entities[ent_idx].entity_event_id_dict['type'][idx] == event_type:
-                    self.entities[ent_idx].entity_event_id_dict['data_idx'][idx] -= 1
-            # add a debug event to the log
-            self.logger.debug(f"event {remove_id} removed from entity {ent_uid}")
+        return num_events
 
     def get_event_id_dict(self) -> dict:
         """
@@ -881,8 +1231,11 @@ class DataSet:
                       'data_idx': []}
 
         for entity in self.entities:
+            ent_event_id_dict = self.get_entity_event_id_dict(entity)
             for key in event_dict:
-                event_dict[key].extend(entity.entity_event_id_dict[key])
+                if key != 'evn_id':
+                    event_dict[key].extend(ent_event_id_dict[key])
+        event_dict['evn_id'] = self.format_event_ids(event_dict['type'], event_dict['evn_ser']).to_list()
 
         return event_dict
 
@@ -893,12 +1246,16 @@ class DataSet:
         Args:
             sort_list: return a list sorted by values (default True)
         """
-        event_ls = []
+        event_type_ls = []
+        evn_ser_ls = []
 
         for entity in self.entities:
-            event_ls.extend(entity.entity_event_id_dict['evn_id'])
+            ent_event_id_dict = self.get_entity_event_id_dict(entity)
+            event_type_ls.extend(ent_event_id_dict['type'])
+            evn_ser_ls.extend(ent_event_id_dict['evn_ser'])
+        event_ls = self.format_event_ids(event_type_ls, evn_ser_ls).to_list()
 
-        if len(CDFfunc.get_unique_list(event_ls)) != len(event_ls):
+        if CDFfunc.has_duplicates(event_ls):
             self.logger.error("duplicate event ids present")
 
         if sort_list:
@@ -906,6 +1263,64 @@ class DataSet:
 
         return event_ls
 
+    def format_event_ids(self, event_types, evn_sers) -> pd.Series:
+        """
+        Return a Series of event ids formatted from the event types and serials (e.g. 'loc-123'), event types with no
+        short label mapped use the event type as the event id prefix
+        Args:
+            event_types: the event type of each event
+            evn_sers: the serial of each event
+        """
+        event_type_series = pd.Series(np.asarray(event_types, dtype=object))
+        evn_id_prefix_series = event_type_series.map(self.event_lbl_map).fillna(event_type_series)
+
+        return evn_id_prefix_series.astype(str) + '-' + pd.Series(np.asarray(evn_sers)).astype(str)
+
+    def parse_event_id(self, event_id: str) -> tuple:
+        """
+        Parse an event id (e.g. 'loc-123') and return a tuple of the event type and serial, (None, None) if the event
+        id is not in the event id format
+        Args:
+            event_id: the event id to parse
+        """
+        evn_id_prefix, _, evn_ser = str(event_id).rpartition('-')
+        if evn_id_prefix == '' or not evn_ser.isdigit():
+            return None, None
+
+        return self.event_short_lbl_map.get(evn_id_prefix, evn_id_prefix), int(evn_ser)
+
+    def build_event_id_index(self) -> None:
+        """
+        Build the event id index of (event type, serial) to (primary entity uid, data_idx) for all events, the index is
+        then maintained by add_event_ids and remove_events
+        """
+        self.event_id_index = {}
+        for entity in self.entities:
+            ent_event_id_dict = self.get_entity_event_id_dict(entity)
+            self.event_id_index.update(zip(zip(ent_event_id_dict['type'], ent_event_id_dict['evn_ser']),
+                                           zip([entity.uid] * len(ent_event_id_dict['type']),
+                                               ent_event_id_dict['data_idx'])))
+
+    def find_event(self, event_id: str) -> tuple:
+        """
+        Find an event by event id using the event id index (built on first use) and return a tuple of the index of the
+        primary entity in the entities array, the event type and the data_idx of the event, (None, None, None) if the
+        event id is not found
+        Args:
+            event_id: the event id of the event to find
+        """
+        if self.event_id_index is None:
+            self.build_event_id_index()
+
+        event_type, evn_ser = self.parse_event_id(event_id)
+        index_entry = self.event_id_index.get((event_type, evn_ser))
+        if index_entry is None:
+            return None, None, None
+
+        ent_uid, data_idx = index_entry
+
+        return self.get_entity_index(ent_uid), event_type, data_idx
+
     def search_event_id_dict(self, search_id: str, data_key: str,
                              event_id_dict: dict, evn_id_key='evn_id') -> int or str:
         """
@@ -940,16 +1355,12 @@ class DataSet:
             search_id: the event_id to return the data items for
         """
         return_dict = {}
-        event_id_dict = self.get_event_id_dict()
+        ent_idx, event_type, data_idx = self.find_event(search_id)
 
-        ent_uid = self.search_event_id_dict(search_id=search_id, data_key='prim_uid', event_id_dict=event_id_dict)
-        ent_idx = self.get_entity_index(ent_uid)
-        data_idx = self.search_event_id_dict(search_id=search_id, data_key='data_idx', event_id_dict=event_id_dict)
-        event_type = self.search_event_id_dict(search_id=search_id, data_key='type', event_id_dict=event_id_dict)
-
-        if ent_idx is None or data_idx is None or event_type is None:
+        if ent_idx is None:
             self.logger.error(f"get_event_data_dict - bad search_id {search_id}")
         else:
+            ent_uid = self.entities[ent_idx].uid
             time = None
             detail = None
             sec_uid = None
@@ -993,6 +1404,10 @@ class DataSet:
                                   f" that has an unrecognised event type {event_type}")
                 retrieved = False
 
+            # encode the event detail if it is held as raw values
+            if detail is None and len(self.lazy_detail_ls) > 0:
+                detail = self.get_lazy_event_detail(search_id)
+
             return_dict = dict(event_id=search_id, event_type=event_type, prim_uid=ent_uid,
                                time=time, sec_uid=sec_uid, detail=detail)
             if retrieved:
@@ -1004,63 +1419,140 @@ class DataSet:
 
         return return_dict
 
+    def encode_lazy_event_detail(self, event_id_ls: list = None) -> pd.Series:
+        """
+        Encode the event detail held as raw values (lazy_event_detail option) and return as a Series indexed by
+        event id
+        Args:
+            event_id_ls: only encode the event detail for these event ids (default None, encode for all events)
+        """
+        encoded_series_ls = []
+        for lazy_detail in self.lazy_detail_ls:
+            evn_id_prefix = self.event_lbl_map[lazy_detail['event_type']] + '-'
+            lazy_event_id_series = evn_id_prefix + pd.Series(lazy_detail['evn_ser']).astype(str)
+            detail_df = lazy_detail['detail_df']
+
+            if event_id_ls is not None:
+                event_keep_mask = lazy_event_id_series.isin(event_id_ls).to_numpy()
+                lazy_event_id_series = lazy_event_id_series.loc[event_keep_mask]
+                detail_df = detail_df.loc[event_keep_mask]
+
+            encoded_ls = CDFfunc.encode_event_detail_cols(*[detail_df.iloc[:, idx]
+                                                            for idx in range(len(detail_df.columns))],
+                                                          detail_keys=lazy_detail['detail_keys'])
+            encoded_series_ls.append(pd.Series(encoded_ls, index=lazy_event_id_series.to_list(), dtype=object))
+
+        if len(encoded_series_ls) > 0:
+            return pd.concat(encoded_series_ls)
+        else:
+            return pd.Series(dtype=object)
+
+    def build_lazy_detail_idx_dict(self) -> None:
+        """
+        Build the dict of (event type, serial) to (lazy_detail_ls index, detail_df row) for the events with event
+        detail held as raw values
+        """
+        self.lazy_detail_idx_dict = {}
+        for lazy_idx, lazy_detail in enumerate(self.lazy_detail_ls):
+            num_rows = len(lazy_detail['evn_ser'])
+            self.lazy_detail_idx_dict.update(zip(zip([lazy_detail['event_type']] * num_rows,
+                                                     lazy_detail['evn_ser'].tolist()),
+                                                 zip([lazy_idx] * num_rows, range(num_rows))))
+
+    def get_lazy_event_detail(self, event_id: str) -> str:
+        """
+        Return the encoded event detail for an event with detail held as raw values, None if not found
+        """
+        if self.lazy_detail_idx_dict is None:
+            self.build_lazy_detail_idx_dict()
+
+        lazy_detail_idx = self.lazy_detail_idx_dict.get(self.parse_event_id(event_id))
+        if lazy_detail_idx is None:
+            return None
+
+        # encode the detail for the event's row only
+        lazy_idx, row = lazy_detail_idx
+        lazy_detail = self.lazy_detail_ls[lazy_idx]
+        detail_df = lazy_detail['detail_df']
+        encoded_ls = CDFfunc.encode_event_detail_cols(*[detail_df.iloc[row:row + 1, idx]
+                                                        for idx in range(len(detail_df.columns))],
+                                                      detail_keys=lazy_detail['detail_keys'])
+
+        return encoded_ls[0]
+
     def add_event_id(self, add_event_type: str, prim_uid: str, sec_uid: str = None) -> None:
         """
         Determine the next available serial for the event type and add an entry to the primary entity's
-        entity_event_id_dict with the event type, serial, id, primary and secondary entity uids and the
-        index position of the data items in the entity's data lists.
+        entity_event_id_dict with the event type, serial, primary and secondary entity uids and the index
+        position of the data items in the entity's data lists. The event id string is not stored, it is
+        formatted from the event type and serial when needed (see format_event_ids).
         Args:
             add_event_type: the type of event to add an event id for
             prim_uid: the uid of the primary entity for the event
             sec_uid: the uid of the secondary entity for the event (optional, default None)
         """
+        self.add_event_ids(add_event_type=add_event_type, prim_uid=prim_uid, sec_uids=[sec_uid])
+
+    def add_event_ids(self, add_event_type: str, prim_uid: str, sec_uids: list = None, num_events: int = None) -> None:
+        """
+        Add event ids for a number of events of the same type with the same primary entity.
 
-        evn_ser = 0
-        if add_event_type == self.loc_event_lbl:
-            evn_ser = self.loc_event_last_ser + 1
-            self.update_config('loc_event_last_ser', evn_ser)
-        elif add_event_type == self.shot_event_lbl:
-            evn_ser = self.shot_event_last_ser + 1
-            self.update_config('shot_event_last_ser', evn_ser)
-        elif add_event_type == self.kill_event_lbl:
-            evn_ser = self.kill_event_last_ser + 1
-            self.update_config('kill_event_last_ser', evn_ser)
-        elif add_event_type == self.loss_event_lbl:
-            evn_ser = self.loss_event_last_ser + 1
-            self.update_config('loss_event_last_ser', evn_ser)
-        elif add_event_type == self.spot_event_lbl:
-            evn_ser = self.spot_event_last_ser + 1
-            self.update_config('spot_event_last_ser', evn_ser)
-        elif add_event_type == self.seen_event_lbl:
-            evn_ser = self.seen_event_last_ser + 1
-            self.update_config('seen_event_last_ser', evn_ser)
-        elif add_event_type == self.stop_event_lbl:
-            evn_ser = self.stop_event_last_ser + 1
-            self.update_config('stop_event_last_ser', evn_ser)
-        elif add_event_type == self.status_event_lbl:
-            evn_ser = self.status_event_last_ser + 1
-            self.update_config('status_event_last_ser', evn_ser)
+        Equivalent to calling add_event_id for each event in turn, the serials and data_idx values added are
+        identical, but the serials for the event type and the entity's count of events of that type are only
+        updated once.
+        Args:
+            add_event_type: the type of event to add event ids for
+            prim_uid: the uid of the primary entity for the events
+            sec_uids: list of the uids of the secondary entity for each event, interned by the caller (see intern_uids)
+                (optional, default None for all events)
+            num_events: the number of events to add event ids for (optional, default the length of sec_uids)
+        """
+        if sec_uids is None:
+            sec_uids = [None] * (num_events if num_events is not None else 0)
+        if num_events is not None and num_events != len(sec_uids):
+            self.logger.error(f"add_event_ids called with num_events {num_events} that does not match "
+                              f"{len(sec_uids)} secondary uids (no event ids added)")
+            return
+        num_events = len(sec_uids)
+
+        if num_events == 0:
+            return
+
+        if add_event_type in self.event_last_ser_map.keys():
+            last_ser_setting = self.event_last_ser_map[add_event_type]
+            first_ser = getattr(self, last_ser_setting) + 1
+            evn_ser_ls = list(range(first_ser, first_ser + num_events))
+            self.update_config(last_ser_setting, evn_ser_ls[-1])
         else:
+            evn_ser_ls = [0] * num_events
             self.logger.error(f'add_event_id called with unrecognised event type {add_event_type}')
 
-        if add_event_type in self.event_lbl_map.keys():
-            evn_id = self.event_lbl_map[add_event_type] + '-' + str(evn_ser)
-        else:
-            evn_id = add_event_type + '-' + str(evn_ser)
+        if add_event_type not in self.event_lbl_map.keys():
             self.logger.error(f"no short label mapped for {add_event_type}")
 
         ent_idx = self.get_entity_index(prim_uid)
         if ent_idx is not None:
-            # to get the data_idx count the number of that event type already in that entity's entity_event_id_dict
-            data_idx = self.entities[ent_idx].entity_event_id_dict['type'].count(add_event_type)
-
-            # add to the entity event dict
-            self.entities[ent_idx].entity_event_id_dict['evn_ser'].append(evn_ser)
-            self.entities[ent_idx].entity_event_id_dict['evn_id'].append(evn_id)
-            self.entities[ent_idx].entity_event_id_dict['type'].append(add_event_type)
-            self.entities[ent_idx].entity_event_id_dict['prim_uid'].append(prim_uid)
-            self.entities[ent_idx].entity_event_id_dict['sec_uid'].append(sec_uid)
-            self.entities[ent_idx].entity_event_id_dict['data_idx'].append(data_idx)
+            entity = self.entities[ent_idx]
+            # the data_idx values follow on from the number of that event type already in the entity_event_id_dict
+            first_data_idx = entity.event_type_count_dict.get(add_event_type, 0)
+            entity.event_type_count_dict[add_event_type] = first_data_idx + num_events
+
+            if self.event_store is not None and add_event_type in self.event_store.tables:
+                # record the serials in the event store table for the event type (the event store tables hold the
+                # event ids in place of the entity event dict, see get_entity_event_id_dict)
+                self.event_store.get_column(prim_uid, add_event_type, 'evn_ser').extend(evn_ser_ls)
+            else:
+                # add to the entity event dict
+                entity.entity_event_id_dict['evn_ser'].extend(evn_ser_ls)
+                entity.entity_event_id_dict['type'].extend([add_event_type] * num_events)
+                entity.entity_event_id_dict['prim_uid'].extend([prim_uid] * num_events)
+                entity.entity_event_id_dict['sec_uid'].extend(sec_uids)
+                entity.entity_event_id_dict['data_idx'].extend(range(first_data_idx, first_data_idx + num_events))
+            # add the events to the event id index (if built)
+            if self.event_id_index is not None:
+                self.event_id_index.update(zip(zip([add_event_type] * num_events, evn_ser_ls),
+                                               zip([prim_uid] * num_events,
+                                                   range(first_data_idx, first_data_idx + num_events))))
 
         else:
             self.logger.error(f"add_event_id called with unrecognised primary uid {prim_uid}")
@@ -1112,11 +1604,23 @@ class DataSet:
                     makedirs(subfolder_path)
         # refresh cdf filenames and paths
         self.generate_cdf_filenames_and_paths()
+        self.exported_file_ls = []
+
+        # encode any event detail held as raw values for the events in the CDF events df
+        if len(self.lazy_detail_ls) > 0:
+            self.logger.info("Encoding event detail for CDF events")
+            lazy_detail_series = self.encode_lazy_event_detail(
+                event_id_ls=self.CDF_events_df[self.evn_tbl_event_id_col_lbl])
+            encoded_detail_series = self.CDF_events_df[self.evn_tbl_event_id_col_lbl].map(lazy_detail_series)
+            encoded_detail_series = encoded_detail_series.where(encoded_detail_series.notna(),
+                                                                self.CDF_events_df[self.evn_tbl_event_detail_col_lbl])
+            self.CDF_events_df = self.CDF_events_df.assign(**{self.evn_tbl_event_detail_col_lbl: encoded_detail_series})
 
         # write the metadata file
         with open(self.metadata_file_path, "w") as metadata_file:
             yaml.safe_dump(self.metadata_dict, metadata_file)
         self.logger.info(f"{self.metadata_file_path} exported")
+        self.exported_file_ls.append(self.metadata_file_path)
 
         if self.output_csv:
             self.logger.info("Exporting CDF files in .csv format:")
@@ -1128,6 +1632,7 @@ class DataSet:
             self.logger.info(f"{self.entity_file_path} exported")
             self.logger.info(f"{self.events_file_path} exported")
             self.logger.info(f"{self.cbt_pwr_file_path} exported")
+            self.exported_file_ls.extend([self.entity_file_path, self.events_file_path, self.cbt_pwr_file_path])
 
         if self.output_parquet:
             self.logger.info("Exporting CDF files in .parquet format:")
@@ -1143,6 +1648,7 @@ class DataSet:
                 self.logger.info(f"{pq_entity_file_path} exported")
                 self.logger.info(f"{pq_events_file_path} exported")
                 self.logger.info(f"{pq_cbt_pwr_file_path} exported")
+                self.exported_file_ls.extend([pq_entity_file_path, pq_events_file_path, pq_cbt_pwr_file_path])
             except ImportError:
                 self.logger.error("Parquet export failed - no parquet engine installed")
 
@@ -1168,9 +1674,10 @@ class DataSet:
         Attempt to discover and assign levels to Entity instances in the entities array.
 
         Attempt to discover and assign levels to Entity instances in the entities array. This function will identify
-        any level 1 entities (level already set as 1 or where an Entity instance is its own commander) and then iterate
-        through the entities array multiple times assigning Entity instance levels as commander Entity instance level
-        plus 1.
+        any level 1 entities (level already set as 1 or where an Entity instance is its own commander) and then
+        traverse the commander to subordinate graph from all Entity instances with a level, assigning Entity instance
+        levels as commander Entity instance level plus 1. Entities with unknown commanders are logged in a single
+        summary and any commander cycles (which prevent levels being assigned) are logged as warnings.
         """
         self.logger.info("Attempting to discover and assign entity levels")
 
@@ -1181,36 +1688,64 @@ class DataSet:
                 entity.level = 1
                 lvl1_ent_ls.append(entity.uid)
 
-        assigned_count = 0
-        lvl_complete = False
-        max_iter = 1000
-        iter_count = 0
-
-        known_uid_ls = []
-        for entity in self.entities:
-            known_uid_ls.append(entity.uid)
+        # build the subordinates of each commander for entities without a level (as entities array indices)
+        subordinate_dict = {}
+        unknown_cmdr_ls = []
+        for idx, entity in enumerate(self.entities):
+            if entity.level is None:
+                if self.has_entity(entity.commander):
+                    subordinate_dict.setdefault(self.get_entity_index(entity.commander), []).append(idx)
+                else:
+                    unknown_cmdr_ls.append(entity.uid)
 
-        while not lvl_complete and iter_count < max_iter:
-            lvl_complete = True
-            iter_count += 1
-            self.logger.debug(f"Pass {iter_count} of assigning levels (limit of {max_iter})")
-            for entity in self.entities:
-                if entity.level is None:
-                    self.logger.debug(f"{entity.uid} attempting level assign")
-                    if entity.commander in known_uid_ls:
-                        if self.entities[self.get_entity_index(entity.commander)].level is not None:
-                            lvl_complete = False
-                            ent_lvl = self.entities[self.get_entity_index(entity.commander)].level + 1
-                            entity.level = ent_lvl
-                            self.logger.debug(f"Entity {entity.uid} determined to be level {ent_lvl}")
-                            assigned_count += 1
-                        else:
-                            self.logger.debug(f"{entity.uid} level assign failed - commander level not determined")
-                    else:
-                        self.logger.debug(f"{entity.uid} level assign failed - unknown commander")
+        # traverse the graph from all entities with a level, each subordinate is assigned a level once
+        assigned_count = 0
+        entity_queue = deque(idx for idx, entity in enumerate(self.entities) if entity.level is not None)
+        while len(entity_queue) > 0:
+            cmdr_idx = entity_queue.popleft()
+            cmdr_lvl = self.entities[cmdr_idx].level
+            for idx in subordinate_dict.pop(cmdr_idx, []):
+                entity = self.entities[idx]
+                entity.level = cmdr_lvl + 1
+                self.logger.debug(f"Entity {entity.uid} determined to be level {entity.level}")
+                assigned_count += 1
+                entity_queue.append(idx)
+
+        if len(unknown_cmdr_ls) > 0:
+            self.logger.info(f"Level assign failed for {len(unknown_cmdr_ls)} entities with unknown commanders: "
+                             f"{unknown_cmdr_ls}")
+
+        # any remaining entities without a level have a commander cycle in their chain of command
+        self.log_commander_cycles()
 
         self.logger.info(f"Levels assigned to {assigned_count} out of {len(self.entities)} entities ")
 
+    def log_commander_cycles(self) -> None:
+        """
+        Find any cycles of commanders among the Entity instances without a level and add a Dataset log warning for each
+        """
+        cycle_state_dict = {}
+        for entity in self.entities:
+            if entity.level is not None or entity.uid in cycle_state_dict:
+                continue
+            # follow the chain of command until an entity with a level, an unknown commander or an entity already
+            # visited is reached, a cycle is found if the entity reached was visited on this chain
+            chain_ls = []
+            chain_uid = entity.uid
+            while chain_uid not in cycle_state_dict and self.has_entity(chain_uid):
+                chain_entity = self.entities[self.get_entity_index(chain_uid)]
+                if chain_entity.level is not None:
+                    break
+                cycle_state_dict[chain_uid] = 'on chain'
+                chain_ls.append(chain_uid)
+                chain_uid = chain_entity.commander
+            if cycle_state_dict.get(chain_uid) == 'on chain':
+                cycle_ls = chain_ls[chain_ls.index(chain_uid):]
+                self.logger.warning(f"Commander cycle found - levels not assigned for {len(cycle_ls)} entities "
+                                    f"in cycle {' -> '.join(cycle_ls + [chain_uid])} or their subordinates")
+            for chain_uid in chain_ls:
+                cycle_state_dict[chain_uid] = 'done'
+
     def check_entity_data(self) -> None:
         """
         Check data for Entity instances.
@@ -1263,7 +1798,7 @@ class DataSet:
 
         for entity in self.entities:
             ent_name = entity.unit_name.lower()
-            if ent_name in list(repeat_dict.keys()):
+            if ent_name in repeat_dict:
                 repeat_dict[ent_name] += 1
                 if not self.force_unique_unit_names:
                     self.logger.warning(f"Name for entity {entity.uid} ({entity.unit_name}) is not unique")
@@ -1335,7 +1870,7 @@ class DataSet:
             unit_commander_id_ls.append(entity.commander)
 
             # in some cases commander may not be a recognised entity
-            if unit_commander_id_ls[-1] in unit_id_ls:
+            if self.has_entity(unit_commander_id_ls[-1]):
                 commander_name = self.entities[self.get_entity_index(unit_commander_id_ls[-1])].unit_name
                 unit_commander_name_ls.append(commander_name)
             else:
@@ -1353,16 +1888,16 @@ class DataSet:
             system_entity_ls.append(entity.system_entity)
             start_entity_ls.append(entity.start_entity)
             add_time_ls.append(entity.add_time)
-            loc_events_ls.append(len(entity.location_time))
-            seen_events_ls.append(len(entity.seen_time))
-            spot_events_ls.append(len(entity.spot_time))
-            shot_events_ls.append(len(entity.shots_time))
-            kill_events_ls.append(len(entity.kills_time))
-            loss_events_ls.append(len(entity.losses_time))
-            stop_events_ls.append(len(entity.stop_time))
-            status_events_ls.append(len(entity.state_time))
+            loc_events_ls.append(len(entity.get_data_list('location_time')))
+            seen_events_ls.append(len(entity.get_data_list('seen_time')))
+            spot_events_ls.append(len(entity.get_data_list('spot_time')))
+            shot_events_ls.append(len(entity.get_data_list('shots_time')))
+            kill_events_ls.append(len(entity.get_data_list('kills_time')))
+            loss_events_ls.append(len(entity.get_data_list('losses_time')))
+            stop_events_ls.append(len(entity.get_data_list('stop_time')))
+            status_events_ls.append(len(entity.get_data_list('state_time')))
 
-            total_events_ls.append(len(entity.entity_event_id_dict['evn_id']))
+            total_events_ls.append(self.get_entity_event_count(entity))
 
         if not CDFfunc.compare_list_lengths(unit_id_ls, unit_name_ls, unit_type_ls,
                                             unit_commander_id_ls, unit_level_ls, affiliation_ls, force_ls,
@@ -1426,20 +1961,22 @@ class DataSet:
         entity_uid_list = self.CDF_entity_table_df[self.ent_tbl_id_col_lbl].tolist()
 
         # check that entity uids are unique
-        unique_uid_list = CDFfunc.get_unique_list(entity_uid_list)
-        if len(unique_uid_list) < len(entity_uid_list):
-            for uid in unique_uid_list:
-                if entity_uid_list.count(uid) > 1:
-                    self.logger.error(f"CDF entity table check - {entity_uid_list.count(uid)} instances "
+        if CDFfunc.has_duplicates(entity_uid_list):
+            for uid, uid_count in CDFfunc.get_item_counts(entity_uid_list).items():
+                if uid_count > 1:
+                    self.logger.error(f"CDF entity table check - {uid_count} instances "
                                       f"of uid {uid} in CDF entity table")
                     entity_table_issue_count += 1
 
         # check that affiliation to force is a many-to-one mapping
-        unique_affil_list = CDFfunc.get_unique_list(self.CDF_entity_table_df[self.ent_tbl_affil_col_lbl].tolist())
-        for affil in unique_affil_list:
-            test_mask = (self.CDF_entity_table_df[self.ent_tbl_affil_col_lbl] == affil)
-            force_list = CDFfunc.get_unique_list(
-                self.CDF_entity_table_df.loc[test_mask, self.ent_tbl_force_col_lbl].tolist())
+        # (forces for each affiliation collected in one pass, null affiliations never match so are not checked)
+        affil_force_dict = {}
+        for affil, force in zip(self.CDF_entity_table_df[self.ent_tbl_affil_col_lbl].tolist(),
+                                self.CDF_entity_table_df[self.ent_tbl_force_col_lbl].tolist()):
+            if not pd.isna(affil):
+                affil_force_dict.setdefault(affil, []).append(force)
+        for affil, affil_force_list in affil_force_dict.items():
+            force_list = CDFfunc.get_unique_list(affil_force_list)
             if len(force_list) > 1:
                 self.logger.error(f"CDF entity table check - {affil} maps to multiple forces: {force_list}")
                 entity_table_issue_count += 1
@@ -1459,105 +1996,112 @@ class DataSet:
         self.logger.info("Generating CDF events file")
         self.CDF_events_df = pd.DataFrame()
 
-        # set up empty lists to hold the key data
-        event_time_ls = []
-        event_primary_entity_ls = []
-        event_primary_entity_x_ls = []
-        event_primary_entity_y_ls = []
-        event_type_ls = []
-        event_detail_ls = []
-        event_secondary_entity_ls = []
-        event_id_ls = []
-
-        def extend_event_lists(ent_event_id_df, event_type,
-                               time_data_ls, detail_data_ls,
-                               primary_x_data_ls=None, primary_y_data_ls=None):
-            ent_event_type_id_df = ent_event_id_df.loc[ent_event_id_df['type'] == event_type].copy()
-
-            event_time_ls.extend(time_data_ls)
-            event_detail_ls.extend(detail_data_ls)
-            if primary_x_data_ls:
-                event_primary_entity_x_ls.extend(primary_x_data_ls)
-            if primary_y_data_ls:
-                event_primary_entity_y_ls.extend(primary_y_data_ls)
-
-            event_type_ls.extend(ent_event_type_id_df['type'].to_list())
-            event_id_ls.extend(ent_event_type_id_df['evn_id'].to_list())
-            event_primary_entity_ls.extend(ent_event_type_id_df['prim_uid'].to_list())
-            event_secondary_entity_ls.extend(ent_event_type_id_df['sec_uid'].to_list())
-
-            while len(event_primary_entity_x_ls) < len(event_time_ls):
-                event_primary_entity_x_ls.append(None)
-                event_primary_entity_y_ls.append(None)
-
-        # cycle through entities and extend event lists with data from that entity
-        for entity in self.entities:
-            # add location events
-            extend_event_lists(ent_event_id_df=pd.DataFrame(data=entity.entity_event_id_dict),
-                               time_data_ls=entity.location_time, detail_data_ls=entity.location_detail,
-                               primary_x_data_ls=entity.location_x, primary_y_data_ls=entity.location_y,
-                               event_type=self.loc_event_lbl)
-            # add shot events
-            extend_event_lists(ent_event_id_df=pd.DataFrame(data=entity.entity_event_id_dict),
-                               time_data_ls=entity.shots_time, detail_data_ls=entity.shots_detail,
-                               event_type=self.shot_event_lbl)
-            # add kill events
-            extend_event_lists(ent_event_id_df=pd.DataFrame(data=entity.entity_event_id_dict),
-                               time_data_ls=entity.kills_time, detail_data_ls=entity.kills_detail,
-                               event_type=self.kill_event_lbl)
-            # add loss events
-            extend_event_lists(ent_event_id_df=pd.DataFrame(data=entity.entity_event_id_dict),
-                               time_data_ls=entity.losses_time, detail_data_ls=entity.losses_detail,
-                               event_type=self.loss_event_lbl)
-            # add spot events
-            extend_event_lists(ent_event_id_df=pd.DataFrame(data=entity.entity_event_id_dict),
-                               time_data_ls=entity.spot_time, detail_data_ls=entity.spot_detail,
-                               event_type=self.spot_event_lbl)
-            # add seen events
-            extend_event_lists(ent_event_id_df=pd.DataFrame(data=entity.entity_event_id_dict),
-                               time_data_ls=entity.seen_time, detail_data_ls=entity.seen_detail,
-                               event_type=self.seen_event_lbl)
-            # add stop events
-            extend_event_lists(ent_event_id_df=pd.DataFrame(data=entity.entity_event_id_dict),
-                               time_data_ls=entity.stop_time, detail_data_ls=entity.stop_detail,
-                               event_type=self.stop_event_lbl)
-            # add status events
-            extend_event_lists(ent_event_id_df=pd.DataFrame(data=entity.entity_event_id_dict),
-                               time_data_ls=entity.state_time, detail_data_ls=entity.state_detail,
-                               event_type=self.status_event_lbl)
-
-        if not CDFfunc.compare_list_lengths(event_time_ls,
-                                            event_primary_entity_ls,
-                                            event_primary_entity_x_ls, event_primary_entity_y_ls,
-                                            event_id_ls,
-                                            event_type_ls,
-                                            event_detail_ls,
-                                            event_secondary_entity_ls):
-            self.logger.error("Generate_cdf_event_file function - mismatched list lengths")
-            self.logger.debug(f"list lengths: "
-                              f"\n\ttime - {len(event_time_ls)} "
-                              f"\n\tprimary entity - {len(event_primary_entity_ls)}"
-                              f"\n\tprimary x - {len(event_primary_entity_x_ls)}"
-                              f"\n\tprimary y - {len(event_primary_entity_y_ls)}"
-                              f"\n\tsecondary entity - {len(event_secondary_entity_ls)}"
-                              f"\n\tevent id - {len(event_id_ls)}"
-                              f"\n\tevent type - {len(event_type_ls)}"
-                              f"\n\tevent detail - {len(event_detail_ls)}")
-
-        self.CDF_events_df = pd.DataFrame(data=zip(event_time_ls,
-                                                   event_primary_entity_ls,
-                                                   event_primary_entity_x_ls, event_primary_entity_y_ls,
-                                                   event_id_ls,
-                                                   event_type_ls,
-                                                   event_detail_ls,
-                                                   event_secondary_entity_ls),
-                                          columns=[self.evn_tbl_time_col_lbl,
-                                                   self.evn_tbl_prim_id_col_lbl,
-                                                   self.evn_tbl_prim_x_col_lbl, self.evn_tbl_prim_y_col_lbl,
-                                                   self.evn_tbl_event_id_col_lbl,
-                                                   self.evn_tbl_event_type_col_lbl,
-                                                   self.evn_tbl_event_detail_col_lbl,
-                                                   self.evn_tbl_sec_id_col_lbl])
+        if self.event_store is not None:
+            # check the columns of each event type are the same length for each entity (only the events with data in
+            # all the columns are output)
+            mismatched_ls = self.event_store.get_mismatched_rows(uid_ls=self.get_uid_ls(),
+                                                                 type_col_dict=self.event_type_col_dict)
+            if len(mismatched_ls) > 0:
+                self.logger.error("Generate_cdf_event_file function - mismatched list lengths")
+                for uid, event_type, col_length_dict in mismatched_ls:
+                    self.logger.debug(f"list lengths for {event_type} events of entity {uid}: " +
+                                      "".join([f"\n\t{col} - {length}" for col, length in col_length_dict.items()]))
+
+            # get the events for all entities from the event store tables in a single Dataframe
+            store_events_df = self.event_store.get_events_df(uid_ls=self.get_uid_ls(),
+                                                             event_type_ls=self.event_type_order_ls,
+                                                             type_col_dict=self.event_type_col_dict)
+            event_id_ser = self.format_event_ids(store_events_df['event_type'], store_events_df['evn_ser'])
+
+            self.CDF_events_df = pd.DataFrame({self.evn_tbl_time_col_lbl: store_events_df['time'],
+                                               self.evn_tbl_prim_id_col_lbl: store_events_df['prim_uid'],
+                                               self.evn_tbl_prim_x_col_lbl: store_events_df['x'],
+                                               self.evn_tbl_prim_y_col_lbl: store_events_df['y'],
+                                               self.evn_tbl_event_id_col_lbl: event_id_ser,
+                                               self.evn_tbl_event_type_col_lbl: store_events_df['event_type'],
+                                               self.evn_tbl_event_detail_col_lbl: store_events_df['detail'],
+                                               self.evn_tbl_sec_id_col_lbl: store_events_df['sec_uid']})
+        else:
+            # entity event data list names for each event type and field (e.g. (loss, 'time') - 'losses_time')
+            list_name_dict = {type_field: list_name for list_name, type_field in self.event_list_map.items()}
+
+            # event serials, types and uids for all entities in entity order, with the position of each entity
+            event_id_dict = {key: [] for key in ['evn_ser', 'type', 'prim_uid', 'sec_uid']}
+            for entity in self.entities:
+                for key, event_id_data_ls in event_id_dict.items():
+                    event_id_data_ls.extend(entity.entity_event_id_dict[key])
+            event_id_df = pd.DataFrame(event_id_dict)
+            event_id_df['ent_pos'] = np.repeat(np.arange(len(self.entities), dtype=np.int64),
+                                               [len(entity.entity_event_id_dict['evn_ser']) for entity in self.entities])
+            event_id_type_grouped = event_id_df.groupby('type', sort=False)
+
+            # build a table of each event type for all entities from the entity event data lists
+            type_df_ls = []
+            for event_type in self.event_type_order_ls:
+                time_list_name = list_name_dict[(event_type, 'time')]
+                detail_list_name = list_name_dict[(event_type, 'detail')]
+                type_data_dict = {'time': [], 'detail': [], 'x': [], 'y': []}
+                for entity in self.entities:
+                    type_data_dict['time'].extend(entity.get_data_list(time_list_name))
+                    type_data_dict['detail'].extend(entity.get_data_list(detail_list_name))
+                    if (event_type, 'x') in list_name_dict:
+                        type_data_dict['x'].extend(entity.get_data_list(list_name_dict[(event_type, 'x')]))
+                        type_data_dict['y'].extend(entity.get_data_list(list_name_dict[(event_type, 'y')]))
+
+                if event_type in event_id_type_grouped.groups:
+                    type_id_df = event_id_type_grouped.get_group(event_type)
+                else:
+                    type_id_df = event_id_df.iloc[0:0]
+                num_events = len(type_data_dict['time'])
+                if not CDFfunc.compare_list_lengths(type_data_dict['time'], type_data_dict['detail'],
+                                                    type_id_df['evn_ser'].to_list()) or \
+                        (len(type_data_dict['x']) > 0 and
+                         not CDFfunc.compare_list_lengths(type_data_dict['time'], type_data_dict['x'],
+                                                          type_data_dict['y'])):
+                    self.logger.error("Generate_cdf_event_file function - mismatched list lengths")
+                    self.logger.debug(f"list lengths for {event_type} events: "
+                                      f"\n\ttime - {len(type_data_dict['time'])} "
+                                      f"\n\tprimary x - {len(type_data_dict['x'])}"
+                                      f"\n\tprimary y - {len(type_data_dict['y'])}"
+                                      f"\n\tevent id - {len(type_id_df)}"
+                                      f"\n\tevent detail - {len(type_data_dict['detail'])}")
+                    num_events = min(len(type_data_dict['time']), len(type_data_dict['detail']), len(type_id_df))
+                    if len(type_data_dict['x']) > 0:
+                        num_events = min(num_events, len(type_data_dict['x']), len(type_data_dict['y']))
+
+                type_df = type_id_df.iloc[:num_events].reset_index(drop=True)
+                type_df['time'] = pd.Series(type_data_dict['time'][:num_events],
+                                            dtype=float if num_events == 0 else None)
+                type_df['detail'] = pd.Series(type_data_dict['detail'][:num_events], dtype=object)
+                if len(type_data_dict['x']) > 0:
+                    type_df['x'] = pd.Series(type_data_dict['x'][:num_events], dtype=float)
+                    type_df['y'] = pd.Series(type_data_dict['y'][:num_events], dtype=float)
+                else:
+                    type_df['x'] = np.nan
+                    type_df['y'] = np.nan
+                type_df_ls.append(type_df)
+
+            # concatenate the tables type by type and stable sort by entity position to order entity by entity
+            events_df = pd.concat(type_df_ls, ignore_index=True)
+            events_df = events_df.iloc[np.argsort(events_df['ent_pos'].to_numpy(), kind='stable')]
+
+            # the event id strings are only formatted from the event types and serials here
+            event_id_arr = self.format_event_ids(events_df['type'], events_df['evn_ser']).to_numpy()
+            self.CDF_events_df = pd.DataFrame({self.evn_tbl_time_col_lbl: events_df['time'].to_numpy(),
+                                               self.evn_tbl_prim_id_col_lbl: events_df['prim_uid'].to_numpy(),
+                                               self.evn_tbl_prim_x_col_lbl: events_df['x'].to_numpy(),
+                                               self.evn_tbl_prim_y_col_lbl: events_df['y'].to_numpy(),
+                                               self.evn_tbl_event_id_col_lbl: event_id_arr,
+                                               self.evn_tbl_event_type_col_lbl: events_df['type'].to_numpy(),
+                                               self.evn_tbl_event_detail_col_lbl: events_df['detail'].to_numpy(),
+                                               self.evn_tbl_sec_id_col_lbl: events_df['sec_uid'].to_numpy()})
+
+        # hold the primary and secondary entity uids as int32 uid codes while the events are sorted, located and
+        # mapped to the entity details (converted back to uids below)
+        self.CDF_events_df[self.evn_tbl_prim_id_col_lbl] = \
+            self.get_uid_codes(self.CDF_events_df[self.evn_tbl_prim_id_col_lbl])
+        self.CDF_events_df[self.evn_tbl_sec_id_col_lbl] = \
+            self.get_uid_codes(self.CDF_events_df[self.evn_tbl_sec_id_col_lbl])
 
         # make the event type column categorical and set a sort order putting location updates as the first type
         self.CDF_events_df[self.evn_tbl_event_type_col_lbl] = \
@@ -1569,50 +2113,15 @@ class DataSet:
         self.CDF_events_df.sort_values(by=[self.evn_tbl_time_col_lbl, self.evn_tbl_event_type_col_lbl],
                                        inplace=True, ignore_index=True)
 
-        # fill in blanks in the primary location x / y cols by filling with the last location update values
-        # assuming that the entity remains at its last reported location for each event until the next location update
-        self.CDF_events_df[self.evn_tbl_prim_x_col_lbl] = \
-            self.CDF_events_df.groupby(by=self.evn_tbl_prim_id_col_lbl)[self.evn_tbl_prim_x_col_lbl].ffill()
-        self.CDF_events_df[self.evn_tbl_prim_y_col_lbl] = \
-            self.CDF_events_df.groupby(by=self.evn_tbl_prim_id_col_lbl)[self.evn_tbl_prim_y_col_lbl].ffill()
-
-        # attach secondary entity locations - get a df of locations by time
-        unit_locations_df = self.CDF_events_df[[self.evn_tbl_time_col_lbl, self.evn_tbl_prim_id_col_lbl,
-                                                self.evn_tbl_prim_x_col_lbl, self.evn_tbl_prim_y_col_lbl,
-                                                self.evn_tbl_event_type_col_lbl, self.evn_tbl_sec_id_col_lbl]].copy()
-
-        # mask event type is 'location update'
-        loc_event_mask = unit_locations_df[self.evn_tbl_event_type_col_lbl] == self.loc_event_lbl
-        # mask secondary entity id is blank
-        no_sec_id_mask = pd.isnull(unit_locations_df[self.evn_tbl_sec_id_col_lbl])
-
-        # where event type is location update and there is no secondary id copy the primary id to the sec id column
-        unit_locations_df.loc[loc_event_mask & no_sec_id_mask, self.evn_tbl_sec_id_col_lbl] = \
-            unit_locations_df[self.evn_tbl_prim_id_col_lbl]
-
-        # where event type is location update copy primary x / y to secondary x / y columns
-        unit_locations_df.loc[loc_event_mask, self.evn_tbl_sec_x_col_lbl] = \
-            unit_locations_df[self.evn_tbl_prim_x_col_lbl]
-        unit_locations_df.loc[loc_event_mask, self.evn_tbl_sec_y_col_lbl] = \
-            unit_locations_df[self.evn_tbl_prim_y_col_lbl]
-
-        # fill the secondary x / y columns down for each entity id
-        # i.e. assumption as for primary that the entity is still at the same position until the next location update
-        unit_locations_df[self.evn_tbl_sec_x_col_lbl] = \
-            unit_locations_df.groupby(by=self.evn_tbl_sec_id_col_lbl)[self.evn_tbl_sec_x_col_lbl].ffill()
-        unit_locations_df[self.evn_tbl_sec_y_col_lbl] = \
-            unit_locations_df.groupby(by=self.evn_tbl_sec_id_col_lbl)[self.evn_tbl_sec_y_col_lbl].ffill()
-
-        # remove the secondary x / y values for the location update events
-        unit_locations_df.loc[loc_event_mask, self.evn_tbl_sec_x_col_lbl] = None
-        unit_locations_df.loc[loc_event_mask, self.evn_tbl_sec_y_col_lbl] = None
-
-        # add the secondary x / y locations from unit_locations_df to the CDF events file
-        self.CDF_events_df[self.evn_tbl_sec_x_col_lbl] = unit_locations_df[self.evn_tbl_sec_x_col_lbl]
-        self.CDF_events_df[self.evn_tbl_sec_y_col_lbl] = unit_locations_df[self.evn_tbl_sec_y_col_lbl]
-
-        # get a dictionary with entity details keyed to unit id using the entity table
-        entity_dict = self.CDF_entity_table_df.set_index(self.ent_tbl_id_col_lbl).to_dict()
+        # attach primary and secondary entity locations to the events from the location update events
+        self.attach_event_locations()
+
+        # get a dataframe of entity details indexed by uid code using the entity table
+        # (the last row is used for any repeated uid, as for a dictionary of the entity table)
+        ent_uid_code_arr = self.get_uid_codes(self.CDF_entity_table_df[self.ent_tbl_id_col_lbl])
+        ent_uid_code_mask = (ent_uid_code_arr >= 0) & ~pd.Series(ent_uid_code_arr).duplicated(keep='last').to_numpy()
+        entity_code_df = self.CDF_entity_table_df.loc[ent_uid_code_mask].set_index(
+            pd.Index(ent_uid_code_arr[ent_uid_code_mask]))
 
         # dict for primary entity details (CDF column title - field in the entity dict to get the data from)
         cdf_primary_entity_cols_dict = dict({self.evn_tbl_prim_name_col_lbl: self.ent_tbl_name_col_lbl,
@@ -1623,7 +2132,7 @@ class DataSet:
                                              self.evn_tbl_prim_force_col_lbl: self.ent_tbl_force_col_lbl})
         # iterate the dictionary to add the columns to the CDF events dataframe
         for col in cdf_primary_entity_cols_dict.items():
-            self.CDF_events_df[col[0]] = self.CDF_events_df[self.evn_tbl_prim_id_col_lbl].map(entity_dict[col[1]])
+            self.CDF_events_df[col[0]] = self.CDF_events_df[self.evn_tbl_prim_id_col_lbl].map(entity_code_df[col[1]])
 
         # dict for secondary entity details (CDF column title - field in entity dict to get data from)
         cdf_secondary_entity_cols_dict = dict({self.evn_tbl_sec_name_col_lbl: self.ent_tbl_name_col_lbl,
@@ -1634,7 +2143,13 @@ class DataSet:
                                                self.evn_tbl_sec_force_col_lbl: self.ent_tbl_force_col_lbl})
         # iterate the dictionary to add the columns to the CDF events dataframe
         for col in cdf_secondary_entity_cols_dict.items():
-            self.CDF_events_df[col[0]] = self.CDF_events_df[self.evn_tbl_sec_id_col_lbl].map(entity_dict[col[1]])
+            self.CDF_events_df[col[0]] = self.CDF_events_df[self.evn_tbl_sec_id_col_lbl].map(entity_code_df[col[1]])
+
+        # convert the uid codes back to uids (no secondary entity uid for code -1)
+        self.CDF_events_df[self.evn_tbl_prim_id_col_lbl] = \
+            self.get_uids(self.CDF_events_df[self.evn_tbl_prim_id_col_lbl].to_numpy())
+        self.CDF_events_df[self.evn_tbl_sec_id_col_lbl] = \
+            self.get_uids(self.CDF_events_df[self.evn_tbl_sec_id_col_lbl].to_numpy())
 
         # replace any None values in secondary entity ID column and mapped columns with blank strings
         replace_none_vals_col_ls = [self.evn_tbl_sec_id_col_lbl,
@@ -1672,6 +2187,59 @@ class DataSet:
         except ValueError as error:
             self.logger.error(f"Unable to type cast for one or more columns in CDF events df: {str(error)}")
 
+    def attach_event_locations(self) -> None:
+        """
+        Attach primary and secondary entity locations to the events in the (time sorted) CDF events Dataframe using
+        location indexes of the location update events (see LocationIndex). Locations at events between location
+        updates are set by the event_location_mode setting (previous, nearest or interpolated). The primary and
+        secondary entity id columns of the CDF events Dataframe hold uid codes (see get_uid_codes) when called.
+        """
+        location_mode = self.event_location_mode
+        if location_mode not in LocationIndex.location_mode_ls:
+            self.logger.warning(f"Unrecognised event_location_mode {location_mode} - previous location mode used")
+            location_mode = 'previous'
+
+        loc_event_mask = (self.CDF_events_df[self.evn_tbl_event_type_col_lbl] == self.loc_event_lbl).to_numpy()
+        loc_pos_arr = np.flatnonzero(loc_event_mask)
+        other_pos_arr = np.flatnonzero(~loc_event_mask)
+        time_arr = self.CDF_events_df[self.evn_tbl_time_col_lbl].to_numpy()
+        prim_code_arr = self.CDF_events_df[self.evn_tbl_prim_id_col_lbl].to_numpy()
+        sec_code_arr = self.CDF_events_df[self.evn_tbl_sec_id_col_lbl].to_numpy()
+
+        # index the location updates by primary entity, location update events keep their own (reported) location
+        prim_loc_index = LocationIndex(uid_code_arr=prim_code_arr[loc_pos_arr], evn_pos_arr=loc_pos_arr,
+                                       time_arr=time_arr[loc_pos_arr],
+                                       x_arr=self.CDF_events_df[self.evn_tbl_prim_x_col_lbl].to_numpy()[loc_pos_arr],
+                                       y_arr=self.CDF_events_df[self.evn_tbl_prim_y_col_lbl].to_numpy()[loc_pos_arr])
+        prim_x_arr = np.full(len(self.CDF_events_df), np.nan)
+        prim_y_arr = np.full(len(self.CDF_events_df), np.nan)
+        prim_x_arr[loc_pos_arr], prim_y_arr[loc_pos_arr] = prim_loc_index.get_index_locations()
+        prim_x_arr[other_pos_arr], prim_y_arr[other_pos_arr] = prim_loc_index.get_locations(
+            uid_code_arr=prim_code_arr[other_pos_arr], evn_pos_arr=other_pos_arr, time_arr=time_arr[other_pos_arr],
+            location_mode=location_mode)
+
+        # location updates are indexed by secondary entity if they have one (i.e. a location reported by another
+        # entity), otherwise the primary entity index is used for the secondary entity locations
+        loc_sec_code_arr = sec_code_arr[loc_pos_arr]
+        if (loc_sec_code_arr >= 0).any():
+            sec_loc_index = LocationIndex(uid_code_arr=np.where(loc_sec_code_arr >= 0, loc_sec_code_arr,
+                                                                prim_code_arr[loc_pos_arr]),
+                                          evn_pos_arr=loc_pos_arr, time_arr=time_arr[loc_pos_arr],
+                                          x_arr=prim_x_arr[loc_pos_arr], y_arr=prim_y_arr[loc_pos_arr])
+        else:
+            sec_loc_index = prim_loc_index
+        # secondary locations are not set for the location update events
+        sec_x_arr = np.full(len(self.CDF_events_df), np.nan)
+        sec_y_arr = np.full(len(self.CDF_events_df), np.nan)
+        sec_x_arr[other_pos_arr], sec_y_arr[other_pos_arr] = sec_loc_index.get_locations(
+            uid_code_arr=sec_code_arr[other_pos_arr], evn_pos_arr=other_pos_arr,
+            time_arr=time_arr[other_pos_arr], location_mode=location_mode)
+
+        self.CDF_events_df[self.evn_tbl_prim_x_col_lbl] = prim_x_arr
+        self.CDF_events_df[self.evn_tbl_prim_y_col_lbl] = prim_y_arr
+        self.CDF_events_df[self.evn_tbl_sec_x_col_lbl] = sec_x_arr
+        self.CDF_events_df[self.evn_tbl_sec_y_col_lbl] = sec_y_arr
+
     def check_cdf_events_df(self) -> None:
         """
         Check CDF event Dataframe.
@@ -1684,44 +2252,64 @@ class DataSet:
         """
         self.logger.info("Checking CDF events file")
         cdf_events_file_issue_count = 0
-        event_id_ls = self.CDF_events_df[self.evn_tbl_event_id_col_lbl].to_list()
-        event_time_ls = self.CDF_events_df[self.evn_tbl_time_col_lbl].to_list()
-        primary_entity_id_ls = self.CDF_events_df[self.evn_tbl_prim_id_col_lbl].to_list()
-        secondary_ent_id_ls = self.CDF_events_df[self.evn_tbl_sec_id_col_lbl].to_list()
-        known_ent_id_ls = self.CDF_entity_table_df[self.ent_tbl_id_col_lbl].to_list()
+        event_id_series = self.CDF_events_df[self.evn_tbl_event_id_col_lbl]
+        event_time_series = self.CDF_events_df[self.evn_tbl_time_col_lbl]
+        primary_ent_id_series = self.CDF_events_df[self.evn_tbl_prim_id_col_lbl]
+        secondary_ent_id_series = self.CDF_events_df[self.evn_tbl_sec_id_col_lbl]
+        known_ent_id_series = self.CDF_entity_table_df[self.ent_tbl_id_col_lbl]
 
         # check for unknown secondary entity ids
-        for idx, ent_id in enumerate(secondary_ent_id_ls):
-            if ent_id != "" and ent_id != "no secondary entity" and ent_id is not None:
-                if ent_id not in known_ent_id_ls:
-                    self.logger.warning(f"CDF events check - unrecognised secondary entity id {ent_id} "
-                                        f"for event {event_id_ls[idx]}")
-                    cdf_events_file_issue_count += 1
+        # (element-wise comparison with None is intended - null values other than None are checked)
+        unknown_sec_id_mask = ((secondary_ent_id_series != "") & (secondary_ent_id_series != "no secondary entity") &
+                               (secondary_ent_id_series.to_numpy() != None) &
+                               ~secondary_ent_id_series.isin(known_ent_id_series))
+        unknown_sec_id_pos_arr = np.flatnonzero(unknown_sec_id_mask.to_numpy())
+        for pos in unknown_sec_id_pos_arr[:self.check_log_limit]:
+            self.logger.warning(f"CDF events check - unrecognised secondary entity id "
+                                f"{secondary_ent_id_series.iat[pos]} for event {event_id_series.iat[pos]}")
+        self.log_check_limit_reached(len(unknown_sec_id_pos_arr), "unrecognised secondary entity id")
+        cdf_events_file_issue_count += len(unknown_sec_id_pos_arr)
 
         # check for any negative event times and check for any non-numeric event time values
-        for idx, event_time in enumerate(event_time_ls):
-            try:
-                if event_time < 0:
-                    self.logger.error(f"CDF events check - Negative time value of {event_time} "
-                                      f"for event {event_id_ls[idx]}")
-                    cdf_events_file_issue_count += 1
-            except TypeError:
-                self.logger.error(f"CDF events check - Non-numeric time value {event_time} "
-                                  f"for event {event_id_ls[idx]}")
-                cdf_events_file_issue_count += 1
+        if pd.api.types.is_numeric_dtype(event_time_series):
+            negative_time_pos_arr = np.flatnonzero((event_time_series < 0).to_numpy())
+            for pos in negative_time_pos_arr[:self.check_log_limit]:
+                self.logger.error(f"CDF events check - Negative time value of {event_time_series.iat[pos]} "
+                                  f"for event {event_id_series.iat[pos]}")
+            self.log_check_limit_reached(len(negative_time_pos_arr), "negative time value")
+            cdf_events_file_issue_count += len(negative_time_pos_arr)
+        else:
+            # times are not all numeric - check each time value
+            time_log_count = 0
+            for event_id, event_time in zip(event_id_series.to_list(), event_time_series.to_list()):
+                try:
+                    if event_time < 0:
+                        if time_log_count < self.check_log_limit:
+                            self.logger.error(f"CDF events check - Negative time value of {event_time} "
+                                              f"for event {event_id}")
+                        time_log_count += 1
+                except TypeError:
+                    if time_log_count < self.check_log_limit:
+                        self.logger.error(f"CDF events check - Non-numeric time value {event_time} "
+                                          f"for event {event_id}")
+                    time_log_count += 1
+            self.log_check_limit_reached(time_log_count, "negative or non-numeric time value")
+            cdf_events_file_issue_count += time_log_count
 
         # check for any entities that have suffered more loss events than they have components
+        loss_evnts_mask = self.CDF_events_df[self.evn_tbl_event_type_col_lbl] == self.loss_event_lbl
+        loss_evnts_df = self.CDF_events_df.loc[loss_evnts_mask]
+        num_loss_evnts_dict = loss_evnts_df.groupby(self.evn_tbl_prim_id_col_lbl, sort=False).size().to_dict()
         for entity in self.entities:
-            loss_evnts_mask = (self.CDF_events_df[self.evn_tbl_prim_id_col_lbl] == entity.uid) & \
-                              (self.CDF_events_df[self.evn_tbl_event_type_col_lbl] == self.loss_event_lbl)
-            loss_evnts_ls = list(self.CDF_events_df.loc[loss_evnts_mask, self.evn_tbl_event_id_col_lbl])
-            num_loss_evnts = len(loss_evnts_ls)
+            num_loss_evnts = num_loss_evnts_dict.get(entity.uid, 0)
             num_comps = entity.init_comps
 
             if num_comps > 0:
                 if num_loss_evnts > num_comps:
                     self.logger.error(f"CDF events check - Entity {entity.uid} suffered {num_loss_evnts} loss events"
                                       f" but only had {num_comps} components")
+                    loss_evnts_ls = loss_evnts_df.loc[loss_evnts_df[self.evn_tbl_prim_id_col_lbl] == entity.uid,
+                                                      self.evn_tbl_event_id_col_lbl].to_list()
                     self.logger.debug(f"loss events for entity {entity.uid} - {loss_evnts_ls}")
                     cdf_events_file_issue_count += 1
             else:
@@ -1729,21 +2317,54 @@ class DataSet:
                                   f"Init comps vs. loss events check skipped for entity {entity.uid} (0 initial comps)")
 
         # check for entities not involved in any events
-        for entity in self.entities:
-            if entity.uid not in primary_entity_id_ls and entity.uid not in secondary_ent_id_ls:
-                self.logger.warning(f"CDF events check - Entity {entity.uid} not involved in any events")
-                cdf_events_file_issue_count += 1
+        entity_uid_series = pd.Series([entity.uid for entity in self.entities], dtype=object)
+        not_involved_mask = ~(entity_uid_series.isin(primary_ent_id_series) |
+                              entity_uid_series.isin(secondary_ent_id_series))
+        not_involved_uid_ls = entity_uid_series.loc[not_involved_mask].to_list()
+        for uid in not_involved_uid_ls[:self.check_log_limit]:
+            self.logger.warning(f"CDF events check - Entity {uid} not involved in any events")
+        self.log_check_limit_reached(len(not_involved_uid_ls), "entity not involved in any events")
+        cdf_events_file_issue_count += len(not_involved_uid_ls)
+
+        # event detail held as raw values will have no_key or no_val entries if the keys and values do not match
+        lazy_no_key_id_set = set()
+        lazy_no_val_id_set = set()
+        for lazy_detail in self.lazy_detail_ls:
+            num_keys = len(lazy_detail['detail_keys'])
+            num_vals = len(lazy_detail['detail_df'].columns)
+            if num_keys != num_vals:
+                evn_id_prefix = self.event_lbl_map[lazy_detail['event_type']] + '-'
+                lazy_event_id_set = set(evn_id_prefix + pd.Series(lazy_detail['evn_ser']).astype(str))
+                if num_vals > num_keys:
+                    lazy_no_key_id_set.update(lazy_event_id_set)
+                else:
+                    lazy_no_val_id_set.update(lazy_event_id_set)
 
         # check for no_key or no_val in event detail fields
-        for idx, event_detail_str in enumerate(self.CDF_events_df[self.evn_tbl_event_detail_col_lbl].to_list()):
-            if 'no_key' in event_detail_str:
-                self.logger.warning(f"event {event_id_ls[idx]} at time {event_time_ls[idx]} "
+        event_detail_series = self.CDF_events_df[self.evn_tbl_event_detail_col_lbl].astype(str)
+        no_key_arr = (event_detail_series.str.contains('no_key', regex=False, na=False) |
+                      event_id_series.isin(lazy_no_key_id_set)).to_numpy()
+        no_val_arr = (event_detail_series.str.contains('no_val', regex=False, na=False) |
+                      event_id_series.isin(lazy_no_val_id_set)).to_numpy()
+        num_no_key = int(no_key_arr.sum())
+        num_no_val = int(no_val_arr.sum())
+        no_key_log_count = 0
+        no_val_log_count = 0
+        for pos in np.flatnonzero(no_key_arr | no_val_arr):
+            if no_key_log_count == min(num_no_key, self.check_log_limit) and \
+                    no_val_log_count == min(num_no_val, self.check_log_limit):
+                break
+            if no_key_arr[pos] and no_key_log_count < self.check_log_limit:
+                self.logger.warning(f"event {event_id_series.iat[pos]} at time {event_time_series.iat[pos]} "
                                     f"had a detail value with no key")
-                cdf_events_file_issue_count += 1
-            if 'no_val' in event_detail_str:
-                self.logger.warning(f"event {event_id_ls[idx]} at time {event_time_ls[idx]} "
+                no_key_log_count += 1
+            if no_val_arr[pos] and no_val_log_count < self.check_log_limit:
+                self.logger.warning(f"event {event_id_series.iat[pos]} at time {event_time_series.iat[pos]} "
                                     f"had a detail key with no value")
-                cdf_events_file_issue_count += 1
+                no_val_log_count += 1
+        self.log_check_limit_reached(num_no_key, "detail value with no key")
+        self.log_check_limit_reached(num_no_val, "detail key with no value")
+        cdf_events_file_issue_count += num_no_key + num_no_val
 
         # add code for additional checks
 
@@ -1752,6 +2373,14 @@ class DataSet:
         else:
             self.logger.warning(f"{cdf_events_file_issue_count} potential issues found in CDF events file")
 
+    def log_check_limit_reached(self, num_issues: int, issue_desc: str) -> None:
+        """
+        Add a Dataset log warning if the number of issues found by a CDF output check exceeds the check log limit
+        """
+        if num_issues > self.check_log_limit:
+            self.logger.warning(f"CDF check - {num_issues} issues found for {issue_desc}, only the first "
+                                f"{self.check_log_limit} logged")
+
     def generate_cdf_cbt_pwr_df(self) -> None:
         """
         Generate CDF combat power output as a Dataframe.
@@ -1760,70 +2389,67 @@ class DataSet:
         # reset the dataframe
         self.CDF_combat_power_DF = pd.DataFrame()
 
-        # initialise lists to hold the data - need to get the time, affiliation / force affected and the cbt pwr loss
-        loss_time = []
-        loss_item = []
-        loss_comps = []
-        loss_pwr = []
-
-        # identify the affiliations and forces from the entity table and make lists to hold starting comps / pwr
+        # identify the affiliations and forces from the entity table
         affiliations = CDFfunc.get_unique_list(self.CDF_entity_table_df[self.ent_tbl_affil_col_lbl].tolist())
-        affiliations_start_comps = [0] * len(affiliations)
-        affiliations_start_pwr = [0] * len(affiliations)
         forces = CDFfunc.get_unique_list(self.CDF_entity_table_df[self.ent_tbl_force_col_lbl].tolist())
-        forces_start_comps = [0] * len(forces)
-        forces_start_pwr = [0] * len(forces)
-
-        # go through each entity and add its starting power and comps to the appropriate list
-        for entity in self.entities:
-            for idx, affiliation in enumerate(affiliations):
-                if entity.affiliation == affiliation:
-                    affiliations_start_comps[idx] = affiliations_start_comps[idx] + entity.init_comps
-                    affiliations_start_pwr[idx] = affiliations_start_pwr[idx] + (
-                            entity.init_comps * entity.cbt_per_comp)
-
-            for idx, force in enumerate(forces):
-                if entity.force == force:
-                    forces_start_comps[idx] = forces_start_comps[idx] + entity.init_comps
-                    forces_start_pwr[idx] = forces_start_pwr[idx] + (entity.init_comps * entity.cbt_per_comp)
-
-        # add the starting comps and power to the lists
-        for idx, affiliation in enumerate(affiliations):
-            loss_time.append(0)
-            loss_item.append(affiliation)
-            loss_comps.append(affiliations_start_comps[idx])
-            loss_pwr.append(affiliations_start_pwr[idx])
-
-        for idx, force in enumerate(forces):
-            loss_time.append(0)
-            loss_item.append(force)
-            loss_comps.append(forces_start_comps[idx])
-            loss_pwr.append(forces_start_pwr[idx])
-
-        # go through each entity and get the loss events and the affiliation / force affected
-        for entity in self.entities:
-            for time in entity.losses_time:
-                if entity.init_comps > 0:
-                    loss_time.append(time)
-                    loss_item.append(entity.affiliation)
-                    loss_comps.append(-1)
-                    loss_pwr.append(-entity.cbt_per_comp)
-
-                    loss_time.append(time)
-                    loss_item.append(entity.force)
-                    loss_comps.append(-1)
-                    loss_pwr.append(-entity.cbt_per_comp)
-                else:
+        start_items = affiliations + forces
+
+        # entity arrays of comps and pwr, and index of each entity's affiliation and force in the start items
+        # (-1 if not in the entity table, null values are never matched)
+        ent_init_comps_arr = np.array([entity.init_comps for entity in self.entities])
+        ent_cbt_per_comp_arr = np.array([entity.cbt_per_comp for entity in self.entities])
+        ent_init_pwr_arr = ent_init_comps_arr * ent_cbt_per_comp_arr
+        affil_idx_dict = {affiliation: idx for idx, affiliation in enumerate(affiliations)
+                          if not pd.isna(affiliation)}
+        force_idx_dict = {force: idx + len(affiliations) for idx, force in enumerate(forces) if not pd.isna(force)}
+        ent_affil_idx_arr = np.array([affil_idx_dict.get(entity.affiliation, -1) if not pd.isna(entity.affiliation)
+                                      else -1 for entity in self.entities], dtype=np.int64)
+        ent_force_idx_arr = np.array([force_idx_dict.get(entity.force, -1) if not pd.isna(entity.force)
+                                      else -1 for entity in self.entities], dtype=np.int64)
+
+        # sum the starting comps and power of the entities for each affiliation and force
+        # (np.add.at sums in entity order so the power totals are identical to summing entity by entity)
+        start_comps_arr = np.zeros(len(start_items), dtype=np.result_type(ent_init_comps_arr, np.int64))
+        start_pwr_arr = np.zeros(len(start_items), dtype=np.result_type(ent_init_pwr_arr, np.int64))
+        for ent_item_idx_arr in [ent_affil_idx_arr, ent_force_idx_arr]:
+            matched_mask = ent_item_idx_arr >= 0
+            np.add.at(start_comps_arr, ent_item_idx_arr[matched_mask], ent_init_comps_arr[matched_mask])
+            np.add.at(start_pwr_arr, ent_item_idx_arr[matched_mask], ent_init_pwr_arr[matched_mask])
+
+        # loss events of entities with initial components, each giving a drop for the affiliation and the force
+        loss_ent_idx_ls = []
+        loss_time_ls = []
+        for ent_idx, entity in enumerate(self.entities):
+            if entity.init_comps > 0:
+                loss_ent_idx_ls.append(ent_idx)
+                loss_time_ls.extend(entity.get_data_list('losses_time'))
+            else:
+                for time in entity.get_data_list('losses_time'):
                     self.logger.debug(f"Loss event for entity {entity.uid} at time {time} ignored in generation"
                                       f" of cbt_pwr file as entity had {entity.init_comps} initial components")
-
-        # construct into a dataframe and sort by time
-        if not CDFfunc.compare_list_lengths(loss_time, loss_item, loss_comps, loss_pwr):
-            self.logger.error("Generate_cdf_cbt_pwr_file function - mismatched list lengths")
-
-        self.CDF_combat_power_DF = pd.DataFrame(data=zip(loss_time, loss_item, loss_comps, loss_pwr),
-                                                columns=[self.cbt_tbl_time_col_lbl, self.cbt_tbl_item_col_lbl,
-                                                         'comp loss', 'pwr loss'])
+        loss_ent_idx_arr = np.repeat(np.array(loss_ent_idx_ls, dtype=np.int64),
+                                     [len(self.entities[ent_idx].get_data_list('losses_time'))
+                                      for ent_idx in loss_ent_idx_ls])
+        ent_affil_arr = np.array([entity.affiliation for entity in self.entities], dtype=object)
+        ent_force_arr = np.array([entity.force for entity in self.entities], dtype=object)
+        # interleave the affiliation and force drop for each loss event
+        loss_item_arr = np.empty(2 * len(loss_ent_idx_arr), dtype=object)
+        loss_item_arr[0::2] = ent_affil_arr[loss_ent_idx_arr]
+        loss_item_arr[1::2] = ent_force_arr[loss_ent_idx_arr]
+        loss_pwr_arr = -np.repeat(ent_cbt_per_comp_arr[loss_ent_idx_arr], 2)
+
+        # construct into a dataframe (starting levels at time 0 then the drops) and sort by time
+        time_arr = np.zeros(len(start_items), dtype=np.int64)
+        if len(loss_time_ls) > 0:
+            time_arr = np.concatenate([time_arr, np.repeat(np.array(loss_time_ls), 2)])
+        item_arr = np.concatenate([np.array(start_items, dtype=object), loss_item_arr])
+        comps_arr = np.concatenate([start_comps_arr, np.full(len(loss_item_arr), -1, dtype=np.int64)])
+        pwr_arr = np.concatenate([start_pwr_arr, loss_pwr_arr]) if len(loss_pwr_arr) > 0 else start_pwr_arr
+
+        self.CDF_combat_power_DF = pd.DataFrame({self.cbt_tbl_time_col_lbl: time_arr,
+                                                 self.cbt_tbl_item_col_lbl: item_arr,
+                                                 'comp loss': comps_arr,
+                                                 'pwr loss': pwr_arr})
         self.CDF_combat_power_DF[self.cbt_tbl_time_col_lbl] = \
             pd.to_numeric(self.CDF_combat_power_DF[self.cbt_tbl_time_col_lbl])
         self.CDF_combat_power_DF.sort_values(by=[self.cbt_tbl_time_col_lbl, self.cbt_tbl_item_col_lbl],
@@ -1867,33 +2493,53 @@ class DataSet:
         del time_ls[:num_items]
         del item_ls[:num_items]
 
-        # cut a dataframe from CDF events with just the losses and extract lists
+        # cut a dataframe from CDF events with just the losses (of entities with components) and extract lists
+        # (losses of uids that are not in the entities array are logged by get_entity_index and ignored)
         losses_df = self.CDF_events_df.loc[self.CDF_events_df[self.evn_tbl_event_type_col_lbl] == self.loss_event_lbl]
+        loss_init_comps_dict = {}
+        for uid in losses_df[self.evn_tbl_prim_id_col_lbl].unique():
+            ent_idx = self.get_entity_index(uid)
+            if ent_idx is not None:
+                loss_init_comps_dict[uid] = self.entities[ent_idx].init_comps
+        losses_df = losses_df.loc[losses_df[self.evn_tbl_prim_id_col_lbl].map(loss_init_comps_dict) > 0]
         loss_time_ls = losses_df[self.evn_tbl_time_col_lbl].to_list()
         loss_affil_ls = losses_df[self.evn_tbl_prim_affil_col_lbl].to_list()
         loss_force_ls = losses_df[self.evn_tbl_prim_force_col_lbl].to_list()
         loss_eventid_ls = losses_df[self.evn_tbl_event_id_col_lbl].to_list()
-        loss_entity_ls = losses_df[self.evn_tbl_prim_id_col_lbl].to_list()
-
-        # go through the lists from the combat power file and try to find the associated loss event from CDF event lists
-        for time_idx, time in enumerate(time_ls):
-            event_identified = False
-            for loss_idx, loss_time in enumerate(loss_time_ls):
-                if not event_identified:
-                    if self.entities[self.get_entity_index(loss_entity_ls[loss_idx])].init_comps > 0:
-                        if time == loss_time and loss_affil_ls[loss_idx] == item_ls[time_idx]:
-                            eventid_ls.append(loss_eventid_ls[loss_idx])
-                            loss_affil_ls[loss_idx] = None
-                            event_identified = True
-                        if time == loss_time and loss_force_ls[loss_idx] == item_ls[time_idx]:
-                            eventid_ls.append(loss_eventid_ls[loss_idx])
-                            loss_force_ls[loss_idx] = None
-                            event_identified = True
-
-            # if the event has not been identified after going through all CDF loss events warn and append placeholder
-            if not event_identified:
+
+        # key the loss events by (time, affiliation) and (time, force), each key holding a queue of the loss indexes
+        # in event order so that the first unused loss event for a key is at the head of its queue
+        # (null times and items are not keyed as they never compare equal)
+        affil_loss_idx_dict = {}
+        force_loss_idx_dict = {}
+        for loss_idx, loss_time in enumerate(loss_time_ls):
+            if pd.isna(loss_time):
+                continue
+            if not pd.isna(loss_affil_ls[loss_idx]):
+                affil_loss_idx_dict.setdefault((loss_time, loss_affil_ls[loss_idx]), deque()).append(loss_idx)
+            if not pd.isna(loss_force_ls[loss_idx]):
+                force_loss_idx_dict.setdefault((loss_time, loss_force_ls[loss_idx]), deque()).append(loss_idx)
+
+        # go through the lists from the combat power file and match each drop to the first unused loss event with the
+        # same time and affiliation or force (a loss event matching on both affiliation and force is used for both)
+        for time, item in zip(time_ls, item_ls):
+            affil_loss_idx_q = affil_loss_idx_dict.get((time, item))
+            force_loss_idx_q = force_loss_idx_dict.get((time, item))
+            affil_loss_idx = affil_loss_idx_q[0] if affil_loss_idx_q else None
+            force_loss_idx = force_loss_idx_q[0] if force_loss_idx_q else None
+
+            if affil_loss_idx is None and force_loss_idx is None:
+                # if no loss event has been identified warn and append placeholder
                 self.logger.warning(f"No loss event identified for component drop at time {time}")
                 eventid_ls.append("event not found")
+                continue
+
+            if affil_loss_idx is not None and (force_loss_idx is None or affil_loss_idx <= force_loss_idx):
+                eventid_ls.append(loss_eventid_ls[affil_loss_idx])
+                affil_loss_idx_q.popleft()
+            if force_loss_idx is not None and (affil_loss_idx is None or force_loss_idx <= affil_loss_idx):
+                eventid_ls.append(loss_eventid_ls[force_loss_idx])
+                force_loss_idx_q.popleft()
 
         # final list length check and add the column to the cbt pwr file
         if CDFfunc.compare_list_lengths(eventid_ls, self.CDF_combat_power_DF[self.cbt_tbl_time_col_lbl].to_list()):
@@ -2056,9 +2702,23 @@ class DataSet:
 
         for entity in self.entities:
             dataset_dict['ent_dict_ls'].append(entity.export_entity_dict())
+            if self.event_store is not None:
+                # the event ids are held in the event store tables
+                dataset_dict['ent_dict_ls'][-1]['entity_event_id_dict'] = self.get_entity_event_id_dict(entity)
 
         dataset_dict['metadata_dict'] = self.metadata_dict.copy()
 
+        # event detail held as raw values (lazy_event_detail option)
+        if len(self.lazy_detail_ls) > 0:
+            dataset_dict['lazy_detail_ls'] = []
+            for lazy_detail in self.lazy_detail_ls:
+                detail_df = lazy_detail['detail_df']
+                dataset_dict['lazy_detail_ls'].append({'event_type': lazy_detail['event_type'],
+                                                       'detail_keys': lazy_detail['detail_keys'],
+                                                       'evn_ser': lazy_detail['evn_ser'].tolist(),
+                                                       'detail_cols': [detail_df.iloc[:, idx].to_list()
+                                                                       for idx in range(len(detail_df.columns))]})
+
         return dataset_dict
 
     def save_dataset(self, save_location=None, save_file=None):
@@ -2093,19 +2753,72 @@ class DataSet:
 
         # empty the entities array
         self.entities = []
+        self.entity_idx_dict = {}
+        self.lazy_detail_ls = []
+        self.lazy_detail_idx_dict = None
+        self.event_id_index = None
+        if self.event_store is not None:
+            self.event_store = EventStore(self.event_type_order_ls)
         # create entities and load data from the dataset_dict
         for ent_dict in dataset_dict['ent_dict_ls']:
             self.add_entity(uid=ent_dict['uid'])
             ent_idx = self.get_entity_index(ent_dict['uid'])
-            self.entities[ent_idx].import_entity_dict(ent_dict)
+            entity = self.entities[ent_idx]
+            if self.event_store is not None:
+                # the event ids for the event types with an event store table are moved into the event store, the
+                # entity only keeps any others in its entity_event_id_dict
+                ent_dict = ent_dict.copy()
+                import_event_id_dict = ent_dict.pop('entity_event_id_dict', {})
+            else:
+                import_event_id_dict = None
+            entity.import_entity_dict(ent_dict)
+            if import_event_id_dict is None:
+                import_event_id_dict = entity.get_data_list('entity_event_id_dict')
+            # entities without events keep the empty event_id_dict and event type counts of a new entity
+            if len(import_event_id_dict) > 0 and len(import_event_id_dict.get('evn_ser', [])) > 0:
+                for uid_key in ['prim_uid', 'sec_uid']:
+                    import_event_id_dict[uid_key] = self.intern_uids(import_event_id_dict[uid_key])
+                # event id strings held by datasets exported by earlier versions are not used (formatted when needed)
+                import_event_id_dict.pop('evn_id', None)
+                # rebuild the count of each event type from the imported event_id_dict
+                entity.event_type_count_dict = CDFfunc.get_item_counts(import_event_id_dict['type'])
+            # move the imported event data into the event store
+            if self.event_store is not None:
+                self.event_store.attach_entity(entity, self.event_list_map)
+                if len(import_event_id_dict) > 0 and len(import_event_id_dict.get('evn_ser', [])) > 0:
+                    for event_type in self.event_store.tables:
+                        evn_ser_ls = [import_event_id_dict['evn_ser'][idx]
+                                      for idx, id_type in enumerate(import_event_id_dict['type'])
+                                      if id_type == event_type]
+                        self.event_store.get_column(entity.uid, event_type, 'evn_ser').extend(evn_ser_ls)
+                    # event ids for event types without an event store table
+                    other_idx_ls = [idx for idx, id_type in enumerate(import_event_id_dict['type'])
+                                    if id_type not in self.event_store.tables]
+                    if len(other_idx_ls) > 0:
+                        for key, event_id_data_ls in import_event_id_dict.items():
+                            entity.entity_event_id_dict[key].extend([event_id_data_ls[idx] for idx in other_idx_ls])
+
+        # load any event detail held as raw values
+        for lazy_detail in dataset_dict.get('lazy_detail_ls', []):
+            self.lazy_detail_ls.append({'event_type': lazy_detail['event_type'],
+                                        'detail_keys': lazy_detail['detail_keys'],
+                                        'evn_ser': np.array(lazy_detail['evn_ser'], dtype=np.int64),
+                                        'detail_df': pd.DataFrame({idx: pd.Series(detail_col, dtype=object)
+                                                                   for idx, detail_col
+                                                                   in enumerate(lazy_detail['detail_cols'])})})
+        self.lazy_detail_idx_dict = None
 
         # reset the metadata_dict preserving the init_date_time_str of this instance
         self.metadata_dict = dict(init_date_time_str=self.init_date_time_str)
         # copy the metadata_dict from the dataset_dict
         import_metadata_dict = dataset_dict['metadata_dict'].copy()
+        # keep the columnar_event_store and compact_entities settings of this instance as the entity data has already
+        # been imported
+        self.metadata_dict['columnar_event_store'] = self.columnar_event_store
+        self.metadata_dict['compact_entities'] = self.compact_entities
         # go through metadata_dict and update settings or add as metadata item (ignore init_date-time_str)
         for key in dataset_dict['metadata_dict']:
-            if key != 'init_date_time_str':
+            if key not in ['init_date_time_str', 'columnar_event_store', 'compact_entities']:
                 if key in vars(self):
                     self.update_config(key, import_metadata_dict[key])
                 else:
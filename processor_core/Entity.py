@@ -1,3 +1,5 @@
+from array import array
+from .EventStore import EventColumn
 
 
 class Entity:
@@ -43,13 +45,14 @@ class Entity:
         self.start_entity = start_entity
         self.add_time = add_time
 
-        # dictionary to keep track of event ids for this entity
+        # dictionary to keep track of event ids for this entity (event ids are formatted from the type and serial)
         self.entity_event_id_dict = {'evn_ser': [],
-                                     'evn_id': [],
                                      'type': [],
                                      'prim_uid': [],
                                      'sec_uid': [],
                                      'data_idx': []}
+        # count of events of each type in entity_event_id_dict (used to set data_idx for new events)
+        self.event_type_count_dict = {}
 
         # lists to hold event data for this entity
         self.location_time = []
@@ -89,13 +92,228 @@ class Entity:
         """
         return_dict = {}
         for key in vars(self):
-            return_dict[key] = vars(self)[key]
+            if isinstance(vars(self)[key], EventColumn):
+                # event data held in a columnar event store is exported as a list
+                return_dict[key] = vars(self)[key].tolist()
+            else:
+                return_dict[key] = vars(self)[key]
 
         return return_dict
 
+    def get_attribute_ls(self) -> list:
+        """
+        Return a list of the names of the entities parameters and data lists
+        """
+        return list(vars(self))
+
+    def get_data_list(self, list_name: str):
+        """
+        Return an event data list of the entity by name
+        """
+        return getattr(self, list_name)
+
     def import_entity_dict(self, load_vars_dict):
         """
         Set the entities parameters and add data from a dict exported from the get_data_dict function
         """
         for key in load_vars_dict:
             setattr(self, key, load_vars_dict[key])
+
+
+class EntityAttribute:
+    """ Entity attribute descriptor class.
+
+    Used by the CompactEntity class for each of the entity parameters and event data lists. The value is held in a
+    slot of the CompactEntity instance, event data lists are only created on first use (times and locations as typed
+    float arrays, other event data as lists) so that entities with few events carry no empty lists. Values set are
+    converted to the storage type, EventColumn objects from a columnar event store are held as they are.
+    """
+
+    def __init__(self, default_factory=None, typecode: str = None) -> None:
+        """ EntityAttribute class init method.
+
+        Args:
+            default_factory: function returning the initial value, called on first use (optional, default None - the
+                value must be set before use)
+            typecode: array typecode for values held as a typed array (optional, default None - values held as set)
+        """
+        self.default_factory = default_factory
+        self.typecode = typecode
+        self.name = None
+        self.slot = None
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+        self.slot = '_' + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return getattr(instance, self.slot)
+        except AttributeError:
+            if self.default_factory is None:
+                raise AttributeError(f"{owner.__name__} has no value set for {self.name}") from None
+            value = self.default_factory()
+            setattr(instance, self.slot, value)
+            return value
+
+    def __set__(self, instance, value) -> None:
+        if self.typecode is not None and not isinstance(value, (array, EventColumn)):
+            value = array(self.typecode, value)
+        setattr(instance, self.slot, value)
+
+
+def float_array() -> array:
+    """
+    Return an empty typed float array (used for event times and locations)
+    """
+    return array('d')
+
+
+def new_event_id_dict() -> dict:
+    """
+    Return an empty entity_event_id_dict
+    """
+    return {'evn_ser': [], 'type': [], 'prim_uid': [], 'sec_uid': [], 'data_idx': []}
+
+
+class CompactEntity:
+    """ Compact entity class.
+
+    Equivalent to the Entity class with a smaller memory footprint, used by the Dataset class when the compact_entities
+    option is set. Attributes are held in slots rather than an instance dict and the event data lists are only created
+    on first use, with event times and locations held as typed float arrays. Intended for datasets with large numbers
+    of entities with few events (e.g. weapon entities). The entity parameters, data lists and export / import of entity
+    dicts are the same as for the Entity class.
+    """
+
+    # entity parameters and event data lists (in the same order as the Entity class)
+    attribute_ls = ['uid', 'unit_name', 'unit_type', 'commander', 'level', 'affiliation', 'force', 'init_comps',
+                    'cbt_per_comp', 'system_entity', 'start_entity', 'add_time', 'entity_event_id_dict',
+                    'event_type_count_dict', 'location_time', 'location_x', 'location_y', 'location_detail',
+                    'shots_time', 'shots_detail', 'kills_time', 'kills_victim', 'kills_detail', 'losses_time',
+                    'losses_killer', 'losses_detail', 'spot_time', 'spot_entity', 'spot_detail', 'seen_time',
+                    'seen_entity', 'seen_detail', 'stop_time', 'stop_entity', 'stop_detail', 'state_time',
+                    'state_detail']
+    __slots__ = ['_' + attribute for attribute in attribute_ls]
+
+    uid = EntityAttribute()
+    unit_name = EntityAttribute()
+    unit_type = EntityAttribute()
+    commander = EntityAttribute()
+    level = EntityAttribute()
+    affiliation = EntityAttribute()
+    force = EntityAttribute()
+    init_comps = EntityAttribute()
+    cbt_per_comp = EntityAttribute()
+    system_entity = EntityAttribute()
+    start_entity = EntityAttribute()
+    add_time = EntityAttribute()
+
+    # dictionary to keep track of event ids for this entity (event ids are formatted from the type and serial)
+    entity_event_id_dict = EntityAttribute(new_event_id_dict)
+    # count of events of each type in entity_event_id_dict (used to set data_idx for new events)
+    event_type_count_dict = EntityAttribute(dict)
+
+    # event data for this entity
+    location_time = EntityAttribute(float_array, 'd')
+    location_x = EntityAttribute(float_array, 'd')
+    location_y = EntityAttribute(float_array, 'd')
+    location_detail = EntityAttribute(list)
+
+    shots_time = EntityAttribute(float_array, 'd')
+    shots_detail = EntityAttribute(list)
+
+    kills_time = EntityAttribute(float_array, 'd')
+    kills_victim = EntityAttribute(list)
+    kills_detail = EntityAttribute(list)
+
+    losses_time = EntityAttribute(float_array, 'd')
+    losses_killer = EntityAttribute(list)
+    losses_detail = EntityAttribute(list)
+
+    spot_time = EntityAttribute(float_array, 'd')
+    spot_entity = EntityAttribute(list)
+    spot_detail = EntityAttribute(list)
+
+    seen_time = EntityAttribute(float_array, 'd')
+    seen_entity = EntityAttribute(list)
+    seen_detail = EntityAttribute(list)
+
+    stop_time = EntityAttribute(float_array, 'd')
+    stop_entity = EntityAttribute(list)
+    stop_detail = EntityAttribute(list)
+
+    state_time = EntityAttribute(float_array, 'd')
+    state_detail = EntityAttribute(list)
+
+    def __init__(self, uid: str, unit_name: str = None, unit_type: str = None,
+                 commander: str = None, level: str = None,
+                 affiliation: str = None, force: str = None,
+                 init_comps: int = None, cbt_per_comp: int = None,
+                 system_entity: bool = False,
+                 start_entity: bool = True, add_time: float = 0.0) -> None:
+        """ CompactEntity class init method.
+
+        Args:
+            as for the Entity class init method
+        """
+        self.uid = uid
+        self.unit_name = unit_name
+        self.unit_type = unit_type
+        self.commander = commander
+        self.level = level
+        self.affiliation = affiliation
+        self.force = force
+        self.init_comps = init_comps
+        self.cbt_per_comp = cbt_per_comp
+        self.system_entity = system_entity
+        self.start_entity = start_entity
+        self.add_time = add_time
+
+    def get_attribute_ls(self) -> list:
+        """
+        Return a list of the names of the entities parameters and data lists
+        """
+        return list(self.attribute_ls)
+
+    def get_data_list(self, list_name: str):
+        """
+        Return an event data list of the entity by name, an empty tuple if the list has not been created (reading the
+        list attribute itself would create it)
+        """
+        return getattr(self, '_' + list_name, ())
+
+    def export_entity_dict(self) -> dict:
+        """
+        Export a dict with the entities parameters and any data added (in the same form as Entity.export_entity_dict)
+        """
+        return_dict = {}
+        for key in self.attribute_ls:
+            try:
+                value = getattr(self, '_' + key)
+            except AttributeError:
+                # event data lists not yet used are exported empty (without creating them for the entity)
+                value = getattr(type(self), key).default_factory()
+            if isinstance(value, (array, EventColumn)):
+                # event data held in typed arrays or a columnar event store is exported as a list
+                value = value.tolist()
+            return_dict[key] = value
+
+        return return_dict
+
+    def import_entity_dict(self, load_vars_dict):
+        """
+        Set the entities parameters and add data from a dict exported from the export_entity_dict function of an Entity
+        or CompactEntity instance (items that are not entity parameters or data lists are ignored)
+        """
+        for key in load_vars_dict:
+            if key in self.attribute_ls:
+                value = load_vars_dict[key]
+                # event data lists (and event id dicts) with no events are not set, they are created on first use as
+                # for a new entity
+                if getattr(type(self), key).default_factory is not None and \
+                        (len(value) == 0 or (key == 'entity_event_id_dict' and len(value.get('evn_ser', ())) == 0)):
+                    continue
+                setattr(self, key, value)
@@ -0,0 +1,398 @@
+import numpy as np
+import pandas as pd
+from array import array
+
+
+class EventStore:
+    """ Event store class.
+
+    Columnar storage for event data, used by the Dataset class when the columnar_event_store option is set.
+    The event store holds an EventTable for each CDF event type. Entity instances hold EventColumn objects in place of
+    their event data lists, these behave like the lists but each one is simply a set of row positions in the table for
+    that event type. The serial of each event is held in the evn_ser column of the tables in place of the entity
+    event id lists. This removes the per event Python object overhead of the lists and enables the CDF events output
+    to be generated from the tables with vectorised operations.
+    """
+
+    def __init__(self, event_type_ls: list) -> None:
+        """ EventStore class init method.
+
+        Args:
+            event_type_ls: list of the event types to set up an EventTable for
+        """
+        self.tables = {}
+        for event_type in event_type_ls:
+            self.tables[event_type] = EventTable(event_type)
+
+        # dictionary of (entity uid, event type) to the EventRows object holding the rows for that entity and type
+        self.entity_rows_dict = {}
+
+    def get_event_rows(self, uid: str, event_type: str):
+        """
+        Return the EventRows object for an entity uid and event type (set up a new one if not already present)
+        """
+        key = (uid, event_type)
+        if key not in self.entity_rows_dict:
+            self.entity_rows_dict[key] = EventRows(table=self.tables[event_type], prim_uid=uid)
+
+        return self.entity_rows_dict[key]
+
+    def get_column(self, uid: str, event_type: str, col: str):
+        """
+        Return an EventColumn for a column of the table for event_type holding the data for entity uid
+        """
+        return EventColumn(event_rows=self.get_event_rows(uid, event_type), col=col)
+
+    def attach_entity(self, entity, event_list_map: dict) -> None:
+        """ Replace the event data lists of an Entity instance with EventColumn objects.
+
+        Any data already in the event data lists of the Entity instance (i.e. following import of an entity dict)
+        is added to the event tables.
+
+        Args:
+            entity: the Entity instance
+            event_list_map: dict of entity event data list name to (event type, table column)
+        """
+        for list_name, (event_type, col) in event_list_map.items():
+            current_data = entity.get_data_list(list_name)
+            if not isinstance(current_data, EventColumn):
+                event_column = self.get_column(entity.uid, event_type, col)
+                setattr(entity, list_name, event_column)
+                if len(current_data) > 0:
+                    event_column.extend(current_data)
+
+    def detach_entity(self, uid: str) -> None:
+        """
+        Remove the rows for entity uid from the event store (the rows are left unused in the event tables)
+        """
+        for event_type in self.tables:
+            self.entity_rows_dict.pop((uid, event_type), None)
+
+    def get_col_length(self, uid: str, event_type: str, col: str) -> int:
+        """
+        Return the length of a column for entity uid and event_type (0 if there are no rows for the entity and type)
+        """
+        event_rows = self.entity_rows_dict.get((uid, event_type))
+        if event_rows is None:
+            return 0
+
+        return event_rows.col_lengths.get(col, 0)
+
+    def get_entity_event_id_dict(self, uid: str, event_type_ls: list) -> dict:
+        """ Get the event ids for an entity as an entity_event_id_dict.
+
+        The serial of each event is held in the evn_ser column of the table for the event type, with the secondary
+        entity uid in the sec_uid column and the data_idx of each event given by its position in the entity's rows.
+
+        Args:
+            uid: the uid of the entity
+            event_type_ls: the event types to get the event ids for (events are returned type by type in this order)
+
+        Returns:
+            Dict of lists. The serial, type, primary and secondary uids and data_idx of each event.
+        """
+        event_id_dict = {'evn_ser': [], 'type': [], 'prim_uid': [], 'sec_uid': [], 'data_idx': []}
+        for event_type in event_type_ls:
+            num_events = self.get_col_length(uid, event_type, 'evn_ser')
+            if num_events > 0:
+                rows = self.entity_rows_dict[(uid, event_type)].get_rows(0, num_events)
+                table = self.tables[event_type]
+                event_id_dict['evn_ser'].extend(table.columns['evn_ser'][rows].tolist())
+                event_id_dict['type'].extend([event_type] * num_events)
+                event_id_dict['prim_uid'].extend([uid] * num_events)
+                event_id_dict['sec_uid'].extend(table.columns['sec_uid'][rows].tolist())
+                event_id_dict['data_idx'].extend(range(num_events))
+
+        return event_id_dict
+
+    def get_mismatched_rows(self, uid_ls: list, type_col_dict: dict) -> list:
+        """
+        Return a list of (uid, event type, dict of column lengths) for each entity and event type where the lengths of
+        the columns in type_col_dict (event type to list of the columns holding data for that type) do not match
+        """
+        mismatched_ls = []
+        for event_type, col_ls in type_col_dict.items():
+            for uid in uid_ls:
+                event_rows = self.entity_rows_dict.get((uid, event_type))
+                if event_rows is not None:
+                    col_length_dict = {col: event_rows.col_lengths.get(col, 0) for col in col_ls}
+                    if len(set(col_length_dict.values())) > 1:
+                        mismatched_ls.append((uid, event_type, col_length_dict))
+
+        return mismatched_ls
+
+    def get_events_df(self, uid_ls: list, event_type_ls: list, type_col_dict: dict = None) -> pd.DataFrame:
+        """ Get the events for a list of entities as a Dataframe.
+
+        Events are returned entity by entity in the order of uid_ls and, for each entity, type by type in the order
+        of event_type_ls, with the events for each entity and type in the order they were added.
+
+        Args:
+            uid_ls: the uids of the entities to get the events for
+            event_type_ls: the event types to get the events for
+            type_col_dict: dict of event type to the columns holding data for that type, only the events with data in
+                all these columns are returned (optional, default None - all rows are returned, with blank values for
+                columns with no data)
+
+        Returns:
+            Dataframe. Table columns plus an 'event_type' column.
+        """
+        type_df_ls = []
+        ent_pos_arr_ls = []
+
+        for event_type in event_type_ls:
+            table = self.tables[event_type]
+            row_arr_ls = []
+            for ent_pos, uid in enumerate(uid_ls):
+                event_rows = self.entity_rows_dict.get((uid, event_type))
+                if event_rows is None:
+                    continue
+                if type_col_dict is not None:
+                    num_rows = min(event_rows.col_lengths.get(col, 0) for col in type_col_dict[event_type])
+                else:
+                    num_rows = len(event_rows.row_idx)
+                if num_rows > 0:
+                    row_arr_ls.append(event_rows.get_rows(0, num_rows))
+                    ent_pos_arr_ls.append(np.full(num_rows, ent_pos, dtype=np.int64))
+
+            if len(row_arr_ls) > 0:
+                rows = np.concatenate(row_arr_ls)
+            else:
+                rows = np.empty(0, dtype=np.int64)
+
+            type_df = pd.DataFrame({col: table.columns[col][rows] for col in table.col_dtypes})
+            type_df['event_type'] = event_type
+            type_df_ls.append(type_df)
+
+        events_df = pd.concat(type_df_ls, ignore_index=True)
+
+        # the tables are concatenated type by type - stable sort by entity position to order entity by entity
+        if len(ent_pos_arr_ls) > 0:
+            order = np.argsort(np.concatenate(ent_pos_arr_ls), kind='stable')
+            events_df = events_df.iloc[order].reset_index(drop=True)
+
+        return events_df
+
+
+class EventTable:
+    """ Event table class.
+
+    Holds the data for all events of a single CDF event type as a set of numpy array columns. Rows are added to the
+    table in blocks by EventRows objects and the arrays are grown as required.
+    """
+
+    # column names and data types for the columns of all event tables
+    col_dtypes = {'time': 'float64',
+                  'prim_uid': 'object',
+                  'sec_uid': 'object',
+                  'x': 'float64',
+                  'y': 'float64',
+                  'detail': 'object',
+                  'evn_ser': 'int64'}
+
+    def __init__(self, event_type: str, initial_capacity: int = 1024) -> None:
+        """ EventTable class init method.
+
+        Args:
+            event_type: the CDF event type for the events in this table
+            initial_capacity: number of rows to allocate initially (optional, default 1024)
+        """
+        self.event_type = event_type
+        self.num_rows = 0
+        self.columns = {}
+        for col in self.col_dtypes:
+            self.columns[col] = self.new_column(col, initial_capacity)
+
+    def new_column(self, col: str, length: int) -> np.ndarray:
+        """
+        Return an array of length filled with the blank value for column col
+        """
+        return np.full(length, self.blank_value(col), dtype=self.col_dtypes[col])
+
+    def blank_value(self, col: str):
+        """
+        Return the blank value for column col (nan for float, 0 for int and None for object columns)
+        """
+        dtype = self.col_dtypes[col]
+        if dtype == 'float64':
+            return np.nan
+        elif dtype == 'int64':
+            return 0
+        else:
+            return None
+
+    def add_rows(self, prim_uid: str, num_rows: int) -> int:
+        """
+        Add num_rows rows for primary entity prim_uid to the table and return the index of the first row added
+        """
+        first_row = self.num_rows
+        capacity = len(self.columns['time'])
+
+        if first_row + num_rows > capacity:
+            new_capacity = max(capacity * 2, first_row + num_rows)
+            for col in self.columns:
+                new_column = self.new_column(col, new_capacity)
+                new_column[:capacity] = self.columns[col]
+                self.columns[col] = new_column
+
+        self.columns['prim_uid'][first_row:first_row + num_rows] = prim_uid
+        self.num_rows += num_rows
+
+        return first_row
+
+
+class EventRows:
+    """ Event rows class.
+
+    The rows of an EventTable that hold the events of that type for a single entity. The columns of the table can be
+    filled independently (i.e. times added before details), the length of each column is tracked and rows are added
+    to the table as required.
+    """
+
+    def __init__(self, table: EventTable, prim_uid: str) -> None:
+        """ EventRows class init method.
+
+        Args:
+            table: the EventTable for the event type
+            prim_uid: uid of the entity (primary entity for the events)
+        """
+        self.table = table
+        self.prim_uid = prim_uid
+        self.row_idx = array('q')
+        self.col_lengths = {}
+
+    def get_rows(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """
+        Return the table row indices for positions start to stop as an array
+        """
+        return np.array(self.row_idx[start:stop], dtype=np.int64)
+
+    def ensure_rows(self, num_rows: int) -> None:
+        """
+        Add rows to the table as required so that there are at least num_rows rows for this entity
+        """
+        if len(self.row_idx) < num_rows:
+            num_new_rows = num_rows - len(self.row_idx)
+            first_row = self.table.add_rows(self.prim_uid, num_new_rows)
+            self.row_idx.extend(range(first_row, first_row + num_new_rows))
+
+    def trim_rows(self) -> None:
+        """
+        Release any rows beyond the length of the longest column (rows are left unused in the table)
+        """
+        num_rows = max(self.col_lengths.values(), default=0)
+        if len(self.row_idx) > num_rows:
+            del self.row_idx[num_rows:]
+
+
+class EventColumn:
+    """ Event column class.
+
+    List-like view of one column of an EventTable for a single entity. Supports the list operations used on the
+    Entity event data lists (len, iteration, indexing, append, extend and del).
+    """
+
+    def __init__(self, event_rows: EventRows, col: str) -> None:
+        """ EventColumn class init method.
+
+        Args:
+            event_rows: the EventRows object for the entity and event type
+            col: the table column
+        """
+        self.event_rows = event_rows
+        self.col = col
+        self.event_rows.col_lengths.setdefault(col, 0)
+
+    def __len__(self) -> int:
+        return self.event_rows.col_lengths[self.col]
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __repr__(self) -> str:
+        return repr(self.tolist())
+
+    def __eq__(self, other) -> bool:
+        return self.tolist() == list(other)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self.tolist()[idx]
+
+        idx = self.check_idx(idx)
+        value = self.event_rows.table.columns[self.col][self.event_rows.row_idx[idx]]
+        if isinstance(value, np.generic):
+            value = value.item()
+
+        return value
+
+    def __delitem__(self, idx: int) -> None:
+        idx = self.check_idx(idx)
+        length = len(self)
+        rows = self.event_rows.get_rows(idx, length)
+        column = self.event_rows.table.columns[self.col]
+
+        # shift the later values up one position and blank the last value
+        column[rows[:-1]] = column[rows[1:]]
+        column[rows[-1]] = self.event_rows.table.blank_value(self.col)
+
+        self.event_rows.col_lengths[self.col] = length - 1
+        self.event_rows.trim_rows()
+
+    def delete_positions(self, positions: list) -> None:
+        """
+        Delete the values at a number of positions, equivalent to del for each position in turn (highest first)
+        """
+        length = len(self)
+        rows = self.event_rows.get_rows(0, length)
+        keep_mask = np.ones(length, dtype=bool)
+        keep_mask[[self.check_idx(idx) for idx in positions]] = False
+        num_keep = int(keep_mask.sum())
+        column = self.event_rows.table.columns[self.col]
+
+        # move the kept values to the first positions and blank the rest
+        column[rows[:num_keep]] = column[rows[keep_mask]]
+        column[rows[num_keep:]] = self.event_rows.table.blank_value(self.col)
+
+        self.event_rows.col_lengths[self.col] = num_keep
+        self.event_rows.trim_rows()
+
+    def check_idx(self, idx: int) -> int:
+        """
+        Return idx as a positive position, raise IndexError if out of range
+        """
+        length = len(self)
+        if idx < 0:
+            idx += length
+        if idx < 0 or idx >= length:
+            raise IndexError("event column index out of range")
+
+        return idx
+
+    def values(self) -> np.ndarray:
+        """
+        Return the values of the column as an array
+        """
+        return self.event_rows.table.columns[self.col][self.event_rows.get_rows(0, len(self))]
+
+    def tolist(self) -> list:
+        """
+        Return the values of the column as a list
+        """
+        return self.values().tolist()
+
+    def append(self, value) -> None:
+        self.extend([value])
+
+    def extend(self, values) -> None:
+        if not isinstance(values, np.ndarray):
+            values = list(values)
+        start = len(self)
+        stop = start + len(values)
+
+        self.event_rows.ensure_rows(stop)
+        # get the column after adding rows as the table arrays may have been grown
+        column = self.event_rows.table.columns[self.col]
+        column[self.event_rows.get_rows(start, stop)] = values
+
+        self.event_rows.col_lengths[self.col] = stop
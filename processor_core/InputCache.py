@@ -0,0 +1,172 @@
+import hashlib
+import yaml
+import numpy as np
+import pandas as pd
+from os import path, makedirs, remove, stat
+
+
+class InputCache:
+    """ Input cache class.
+
+    Cache of the source dataframes read from model output files by a processor script, saved as parquet files.
+    Each cache entry is keyed by the path, size, modification time and content hash of the source file as well as the
+    way the file was read (read_spec, i.e. column mappings, data types and row filters). An entry is only loaded if
+    all of these match, otherwise the source file is read as normal and the entry is replaced. The content hash is
+    only computed when the size or modification time of the source file differ from the entry (or there is no entry),
+    an entry for a source file with a new modification time but the same contents is still loaded.
+    """
+
+    def __init__(self, cache_location: str, logger) -> None:
+        """ InputCache class init method.
+
+        Args:
+            cache_location: folder to save the cache entries in (created when the first entry is saved)
+            logger: logger to record cache hits, misses and failures in
+        """
+        self.cache_location = cache_location
+        self.logger = logger
+        # cache keys of source files by entry name (generated on load and used on save, so that a source file that
+        # changes while it is being read does not match the entry saved)
+        self.source_key_dict = {}
+
+    def get_entry_paths(self, entry_name: str) -> tuple:
+        """
+        Return the paths of the parquet and key files for a cache entry
+        """
+        return (path.join(self.cache_location, f"{entry_name}.parquet"),
+                path.join(self.cache_location, f"{entry_name}.yaml"))
+
+    @staticmethod
+    def get_content_hash(source_file: str, block_size: int = 1048576) -> str:
+        """
+        Return the sha256 hash of the contents of source_file
+        """
+        file_hash = hashlib.sha256()
+        with open(source_file, "rb") as hash_file:
+            for block in iter(lambda: hash_file.read(block_size), b""):
+                file_hash.update(block)
+
+        return file_hash.hexdigest()
+
+    def get_source_key(self, source_file: str, read_spec: dict, entry_key: dict = None) -> dict:
+        """
+        Return the cache key dictionary for source_file read using read_spec, the content hash is taken from
+        entry_key (the key of an existing cache entry) if the path, size and modification time of the source file match
+        """
+        source_stat = stat(source_file)
+        source_key = {'source_file': path.abspath(source_file),
+                      'size': source_stat.st_size,
+                      'mtime': source_stat.st_mtime_ns,
+                      'read_spec': repr(read_spec)}
+
+        if entry_key is not None and 'content_hash' in entry_key and \
+                all(entry_key.get(key) == source_key[key] for key in ['source_file', 'size', 'mtime']):
+            source_key['content_hash'] = entry_key['content_hash']
+        else:
+            source_key['content_hash'] = self.get_content_hash(source_file)
+
+        return source_key
+
+    def read_entry_key(self, key_file_path: str):
+        """
+        Return the key dictionary of a cache entry, or None if the key file cannot be read
+        """
+        try:
+            with open(key_file_path, "r") as key_file:
+                entry_key = yaml.safe_load(key_file)
+        except (OSError, yaml.YAMLError):
+            self.logger.warning(f"Unable to read input cache key file {key_file_path} - entry ignored")
+            return None
+
+        if not isinstance(entry_key, dict):
+            self.logger.warning(f"Unable to read input cache key file {key_file_path} - entry ignored")
+            return None
+
+        return entry_key
+
+    def load(self, entry_name: str, source_file: str, read_spec: dict):
+        """ Load a source dataframe from the cache.
+
+        Args:
+            entry_name: name of the cache entry (i.e. the df_name)
+            source_file: the source file the dataframe is read from
+            read_spec: dict of the parameters used to read the source file
+
+        Returns:
+            Dataframe, or None if there is no valid cache entry for the source file.
+        """
+        pq_file_path, key_file_path = self.get_entry_paths(entry_name)
+        entry_key = None
+        if not path.isfile(pq_file_path) or not path.isfile(key_file_path):
+            self.logger.info(f"No input cache entry for {entry_name}")
+        else:
+            entry_key = self.read_entry_key(key_file_path)
+
+        # the content hash of the source file is only computed if its size or modification time have changed
+        source_key = self.get_source_key(source_file, read_spec, entry_key=entry_key)
+        self.source_key_dict[entry_name] = source_key
+        if entry_key is None:
+            return None
+
+        mtime_changed = False
+        if entry_key != source_key:
+            if any(entry_key.get(key) != value for key, value in source_key.items() if key != 'mtime'):
+                self.logger.info(f"Input cache entry for {entry_name} out of date - {source_file} or read settings "
+                                 f"changed")
+                return None
+            mtime_changed = True
+
+        try:
+            cached_df = pd.read_parquet(pq_file_path)
+        except (ImportError, OSError, ValueError) as cache_error:
+            self.logger.warning(f"Unable to load input cache entry for {entry_name} ({cache_error}) - entry ignored")
+            return None
+
+        # null values in text columns are loaded as None - restore as nan to match the dataframe read from source
+        for col in cached_df.columns:
+            if cached_df[col].dtype == object:
+                cached_df[col] = cached_df[col].where(cached_df[col].notna(), np.nan)
+
+        # the source file modification time changed but not its contents - update the entry key so the content hash
+        # is not computed again on the next load
+        if mtime_changed:
+            self.logger.info(f"{source_file} modification time changed but contents unchanged - input cache entry "
+                             f"key for {entry_name} updated")
+            try:
+                with open(key_file_path, "w") as key_file:
+                    yaml.safe_dump(source_key, key_file)
+            except OSError as cache_error:
+                self.logger.warning(f"Unable to update input cache key file {key_file_path} ({cache_error})")
+
+        self.logger.info(f"{entry_name} loaded from input cache {pq_file_path}")
+
+        return cached_df
+
+    def save(self, entry_name: str, source_file: str, read_spec: dict, source_df: pd.DataFrame) -> None:
+        """ Save a source dataframe to the cache, replacing any existing entry.
+
+        Args:
+            entry_name: name of the cache entry (i.e. the df_name)
+            source_file: the source file the dataframe was read from
+            read_spec: dict of the parameters used to read the source file
+            source_df: the dataframe read from the source file
+        """
+        pq_file_path, key_file_path = self.get_entry_paths(entry_name)
+        source_key = self.source_key_dict.pop(entry_name, None)
+        if source_key is None:
+            source_key = self.get_source_key(source_file, read_spec)
+
+        try:
+            if not path.isdir(self.cache_location):
+                makedirs(self.cache_location)
+            # remove the key file first so that a partly written entry is never loaded
+            if path.isfile(key_file_path):
+                remove(key_file_path)
+            source_df.to_parquet(pq_file_path)
+            with open(key_file_path, "w") as key_file:
+                yaml.safe_dump(source_key, key_file)
+        except (ImportError, OSError, ValueError, TypeError) as cache_error:
+            self.logger.warning(f"Unable to save input cache entry for {entry_name} ({cache_error})")
+            return
+
+        self.logger.info(f"{entry_name} saved to input cache {pq_file_path}")
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+
+class LocationIndex:
+    """ Location index class.
+
+    Per entity, time sorted index of the locations reported by the location update events in the CDF events Dataframe,
+    used by the Dataset class to attach primary and secondary entity locations to events. Each location update is
+    indexed by entity uid code (see DataSet.get_uid_codes) and its position in the (time sorted) CDF events Dataframe,
+    with missing x / y values carried forward from the last location reported for the entity. Locations are attached
+    to events with a grouped as-of join on either the event position or the event time depending on the location mode:
+        - previous: location from the last location update before the event
+        - nearest: location from the location update nearest in time to the event
+        - interpolated: location interpolated between the location updates before and after the event (the last
+          location is kept after the final location update, as for previous there is no location before the first)
+    """
+
+    location_mode_ls = ['previous', 'nearest', 'interpolated']
+
+    def __init__(self, uid_code_arr: np.ndarray, evn_pos_arr: np.ndarray, time_arr: np.ndarray, x_arr: np.ndarray,
+                 y_arr: np.ndarray) -> None:
+        """ LocationIndex class init method.
+
+        Args:
+            uid_code_arr: uid code of the entity for each location update
+            evn_pos_arr: position of each location update in the CDF events Dataframe
+            time_arr: time of each location update
+            x_arr: x location for each location update
+            y_arr: y location for each location update
+        """
+        index_df = pd.DataFrame({'uid_code': np.asarray(uid_code_arr, dtype=np.int32),
+                                 'evn_pos': np.asarray(evn_pos_arr, dtype=np.int64),
+                                 'time': np.asarray(time_arr, dtype=float),
+                                 'x': np.asarray(x_arr, dtype=float),
+                                 'y': np.asarray(y_arr, dtype=float)})
+        index_df = index_df.sort_values(by='evn_pos', kind='stable', ignore_index=True)
+
+        # carry the last location reported for each entity forward over missing x / y values
+        index_df[['x', 'y']] = index_df.groupby(by='uid_code', sort=False)[['x', 'y']].ffill()
+        self.index_df = index_df
+
+    def get_index_locations(self) -> tuple:
+        """
+        Return arrays of the x and y locations for each location update in the index (in event position order)
+        """
+        return self.index_df['x'].to_numpy(), self.index_df['y'].to_numpy()
+
+    def match_locations(self, query_df: pd.DataFrame, on: str, direction: str) -> pd.DataFrame:
+        """
+        Return the index entries matched to each row of query_df (uid code and on columns, sorted by the on column) by
+        an as-of join grouped by uid code, columns for the matched location time, x and y in query_df row order
+        """
+        index_df = self.index_df[['uid_code', on, 'x', 'y']].assign(loc_time=self.index_df['time'].to_numpy())
+        if on == 'time':
+            # location updates with no time are not used by the time based modes
+            index_df = index_df.loc[index_df['time'].notna()].sort_values(by='time', kind='stable')
+        matched_df = pd.merge_asof(query_df, index_df, on=on, by='uid_code', direction=direction)
+
+        return matched_df[['loc_time', 'x', 'y']]
+
+    def get_locations(self, uid_code_arr: np.ndarray, evn_pos_arr: np.ndarray, time_arr: np.ndarray,
+                      location_mode: str = 'previous') -> tuple:
+        """ Get the locations of entities at events.
+
+        Args:
+            uid_code_arr: uid code of the entity to get the location of for each event (-1 for no entity)
+            evn_pos_arr: position of each event in the CDF events Dataframe
+            time_arr: time of each event
+            location_mode: previous, nearest or interpolated (see class description)
+
+        Returns:
+            Tuple of arrays (x, y) with the location for each event, nan if there is no location for an event.
+        """
+        query_df = pd.DataFrame({'uid_code': np.asarray(uid_code_arr, dtype=np.int32),
+                                 'evn_pos': np.asarray(evn_pos_arr, dtype=np.int64),
+                                 'time': np.asarray(time_arr, dtype=float)})
+        x_arr = np.full(len(query_df), np.nan)
+        y_arr = np.full(len(query_df), np.nan)
+
+        # events with no entity (or no time for the time based modes) are not located
+        if location_mode == 'previous':
+            on = 'evn_pos'
+            query_mask = (query_df['uid_code'] >= 0).to_numpy()
+        else:
+            on = 'time'
+            query_mask = ((query_df['uid_code'] >= 0) & query_df['time'].notna()).to_numpy()
+        query_pos_arr = np.flatnonzero(query_mask)
+        query_pos_arr = query_pos_arr[np.argsort(query_df[on].to_numpy()[query_pos_arr], kind='stable')]
+        query_df = query_df.iloc[query_pos_arr].reset_index(drop=True)
+
+        if len(query_df) == 0 or len(self.index_df) == 0:
+            return x_arr, y_arr
+
+        if location_mode == 'previous':
+            matched_df = self.match_locations(query_df, on='evn_pos', direction='backward')
+            x_arr[query_pos_arr] = matched_df['x'].to_numpy()
+            y_arr[query_pos_arr] = matched_df['y'].to_numpy()
+        elif location_mode == 'nearest':
+            matched_df = self.match_locations(query_df, on='time', direction='nearest')
+            x_arr[query_pos_arr] = matched_df['x'].to_numpy()
+            y_arr[query_pos_arr] = matched_df['y'].to_numpy()
+        else:
+            prev_df = self.match_locations(query_df, on='time', direction='backward')
+            next_df = self.match_locations(query_df, on='time', direction='forward')
+            prev_time_arr = prev_df['loc_time'].to_numpy()
+            next_time_arr = next_df['loc_time'].to_numpy()
+            # fraction of the time between the location updates before and after each event (0 if there is no
+            # location update after the event or both updates are at the same time)
+            time_gap_arr = next_time_arr - prev_time_arr
+            interp_mask = ~np.isnan(time_gap_arr) & (time_gap_arr > 0)
+            frac_arr = np.zeros(len(query_df))
+            frac_arr[interp_mask] = ((query_df['time'].to_numpy()[interp_mask] - prev_time_arr[interp_mask]) /
+                                     time_gap_arr[interp_mask])
+            for col, loc_arr in [('x', x_arr), ('y', y_arr)]:
+                prev_loc_arr = prev_df[col].to_numpy()
+                next_loc_arr = next_df[col].to_numpy()
+                interp_loc_arr = prev_loc_arr.copy()
+                interp_loc_arr[interp_mask] = prev_loc_arr[interp_mask] + frac_arr[interp_mask] * (
+                        next_loc_arr[interp_mask] - prev_loc_arr[interp_mask])
+                loc_arr[query_pos_arr] = interp_loc_arr
+
+        return x_arr, y_arr
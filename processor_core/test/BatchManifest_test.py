@@ -0,0 +1,99 @@
+import os
+import pytest
+from processor_core.BatchManifest import BatchManifest
+from processor_core.InputCache import InputCache
+
+
+@pytest.fixture
+def batch_dir(tmp_path):
+    input_location = tmp_path / "input"
+    input_location.mkdir()
+    (input_location / "a.csv").write_text("time,id\n1,x\n")
+    (input_location / "b.csv").write_text("time,id\n2,y\n")
+
+    return tmp_path
+
+
+def get_configuration(batch_dir, serial=1, output_location="output", **config_fields) -> dict:
+    configuration = {'serial': serial, 'case': 'test', 'input_location': str(batch_dir / "input"),
+                     'output_location': str(batch_dir / output_location), 'file_a': 'a.csv', 'file_b': 'b.csv'}
+    configuration.update(config_fields)
+
+    return configuration
+
+
+def run_batch(batch_dir, configuration_ls: list, version_str: str = "v1") -> list:
+    """
+    Check each configuration against the manifest (as the batch code), record those that are not up to date (writing
+    a CDF file for each) and return the serials of the configurations run
+    """
+    batch_manifest = BatchManifest(input_file_fields=['file_a', 'file_b'], version_str=version_str)
+    up_to_date_ls = [batch_manifest.is_up_to_date(configuration) for configuration in configuration_ls]
+    run_serial_ls = []
+    for configuration, up_to_date in zip(configuration_ls, up_to_date_ls):
+        if not up_to_date:
+            output_file = os.path.join(configuration['output_location'], f"CDF_events_{configuration['serial']}.csv")
+            os.makedirs(configuration['output_location'], exist_ok=True)
+            with open(output_file, "w") as cdf_file:
+                cdf_file.write("event_id\n")
+            batch_manifest.record(configuration, [output_file])
+            run_serial_ls.append(configuration['serial'])
+
+    return run_serial_ls
+
+
+def set_mtime(file_path, mtime_ns: int) -> None:
+    os.utime(file_path, ns=(mtime_ns, mtime_ns))
+
+
+def test_batch_manifest_skips_unchanged(batch_dir, monkeypatch):
+    configuration_ls = [get_configuration(batch_dir, 1), get_configuration(batch_dir, 2, zero_hour=3)]
+    assert run_batch(batch_dir, configuration_ls) == [1, 2]
+
+    # the input files are not hashed again when their size and modification time are unchanged
+    def fail_get_content_hash(source_file, block_size=1048576):
+        raise AssertionError(f"{source_file} hashed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(InputCache, "get_content_hash", fail_get_content_hash)
+        assert run_batch(batch_dir, configuration_ls) == []
+
+
+def test_batch_manifest_reruns_changed(batch_dir):
+    configuration_ls = [get_configuration(batch_dir, 1), get_configuration(batch_dir, 2, zero_hour=3)]
+    run_batch(batch_dir, configuration_ls)
+
+    # configuration, processor version and output file changes
+    assert run_batch(batch_dir, [get_configuration(batch_dir, 1), get_configuration(batch_dir, 2, zero_hour=4)]) == [2]
+    assert run_batch(batch_dir, configuration_ls, version_str="v2") == [1, 2]
+    os.remove(batch_dir / "output" / "CDF_events_1.csv")
+    assert run_batch(batch_dir, configuration_ls, version_str="v2") == [1]
+
+
+def test_batch_manifest_input_file_changes(batch_dir):
+    configuration_ls = [get_configuration(batch_dir, 1)]
+    run_batch(batch_dir, configuration_ls)
+    input_file = batch_dir / "input" / "a.csv"
+    mtime_ns = os.stat(input_file).st_mtime_ns
+
+    # modification time changed, contents unchanged
+    set_mtime(input_file, mtime_ns + 10 ** 9)
+    assert run_batch(batch_dir, configuration_ls) == []
+
+    # contents changed with the same size
+    input_file.write_text("time,id\n1,z\n")
+    set_mtime(input_file, mtime_ns + 2 * 10 ** 9)
+    assert run_batch(batch_dir, configuration_ls) == [1]
+    assert run_batch(batch_dir, configuration_ls) == []
+
+    # input file removed
+    os.remove(batch_dir / "input" / "b.csv")
+    assert run_batch(batch_dir, configuration_ls) == [1]
+    assert run_batch(batch_dir, configuration_ls) == []
+
+
+def test_batch_manifest_same_serial_in_two_output_locations(batch_dir):
+    configuration_ls = [get_configuration(batch_dir, 1, output_location="output_1"),
+                        get_configuration(batch_dir, 1, output_location="output_2", zero_hour=3)]
+    assert run_batch(batch_dir, configuration_ls) == [1, 1]
+    assert run_batch(batch_dir, configuration_ls) == []
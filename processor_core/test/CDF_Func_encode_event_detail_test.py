@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from processor_core.CDF_Func import CDFfunc
+
+
+def get_detail_val_cols(seed: int, num_rows: int) -> list:
+    """
+    Return detail value columns of mixed types, including nulls and the characters replaced in the encoding
+    """
+    rand = np.random.default_rng(seed)
+    return [rand.choice(['OK', 'Dam aged', 'a:b', 'x,y', '{z}', '"q"', ''], size=num_rows).tolist(),
+            rand.integers(-5, 500, size=num_rows).tolist(),
+            rand.random(num_rows).tolist(),
+            pd.Series(rand.choice(['alpha', None], size=num_rows)),
+            [np.nan if val < 0.3 else val for val in rand.random(num_rows)],
+            rand.choice([True, False], size=num_rows)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("num_rows", [0, 1, 17])
+@pytest.mark.parametrize("detail_keys", [['status', 'course', 'speed', 'name', 'range', 'flag'],
+                                         ['weapon name', 'key:1', 'key,2'],
+                                         ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h'],
+                                         []])
+def test_encode_event_detail_cols_matches_encode_event_detail(seed, num_rows, detail_keys):
+    detail_val_cols = get_detail_val_cols(seed, num_rows)
+
+    detail_encoded_ls = CDFfunc.encode_event_detail_cols(*detail_val_cols, detail_keys=detail_keys)
+
+    expected_ls = [CDFfunc.encode_event_detail(detail_key_ls=detail_keys,
+                                               detail_val_ls=[list(detail_val_col)[idx]
+                                                              for detail_val_col in detail_val_cols])
+                   for idx in range(num_rows)]
+    assert detail_encoded_ls == expected_ls
+
+
+def test_encode_event_detail_cols_uneven_columns():
+    detail_val_cols = [['a', 'b', 'c'], [1, 2]]
+
+    detail_encoded_ls = CDFfunc.encode_event_detail_cols(*detail_val_cols, detail_keys=['k1', 'k2'])
+
+    assert detail_encoded_ls == CDFfunc.encode_event_detail_list(*detail_val_cols, detail_keys=['k1', 'k2'])
+    assert len(detail_encoded_ls) == 2
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+from processor_core.CDF_Func import CDFfunc
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    rand = np.random.default_rng(7)
+    num_rows = 1000
+    source_df = pd.DataFrame({'Time': [f"0:{idx // 60:02d}:{idx % 60:02d}" for idx in range(num_rows)],
+                              'Result': rand.choice(['SUCCESS', 'FAILURE', 'KILL', 'MISS'], size=num_rows),
+                              'Range': rand.random(num_rows),
+                              'Name': rand.choice(['alpha', 'bravo', None], size=num_rows)})
+    source_path = tmp_path / "source.csv"
+    with open(source_path, "w") as csv_file:
+        # units row below the header, as in the model output files
+        csv_file.write(",".join(source_df.columns) + "\n" + ",".join(["units"] * len(source_df.columns)) + "\n")
+        source_df.to_csv(csv_file, index=False, header=False)
+
+    return str(source_path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 999, 5000])
+@pytest.mark.parametrize("filter_val", ['SUCCESS', 'KILL', 'NOT_PRESENT'])
+def test_read_csv_filtered_matches_full_read(source_file, chunk_size, filter_val):
+    read_kwargs = {'skiprows': [1], 'usecols': ['Time', 'Result', 'Range', 'Name'], 'dtype': {'Range': float}}
+    filtered_df = CDFfunc.read_csv_filtered(source_file, filter_col='Result', filter_val=filter_val,
+                                            chunk_size=chunk_size, **read_kwargs)
+
+    full_df = pd.read_csv(source_file, **read_kwargs)
+    expected_df = full_df.loc[full_df['Result'] == filter_val]
+    pd.testing.assert_frame_equal(filtered_df, expected_df)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+from processor_core.CDF_Func import CDFfunc
+
+time_str_ls = ['00:00', '59:59', '01:30', '00:00:00', '12:34:56', '23:59:59', '1:02:03:04', '3:00:00:01',
+               '10.20.30', '1:02.03', '7', '0:10:20:30:40', '02:30:15', '00:00:01']
+
+
+@pytest.mark.parametrize("unit", ['secs', 'mins', 'hrs'])
+@pytest.mark.parametrize("zero_hr", [0, 1.5, 26])
+def test_get_time_val_series_matches_get_time_val(unit, zero_hr):
+    time_val_arr = CDFfunc.get_time_val_series(input_time_series=pd.Series(time_str_ls), zero_hr=zero_hr, unit=unit)
+
+    expected_ls = [CDFfunc.get_time_val(input_time_str=time_str, zero_hr=zero_hr, unit=unit)
+                   for time_str in time_str_ls]
+    assert time_val_arr.tolist() == expected_ls
+
+
+def test_get_time_val_series_drop_tenths():
+    tenths_str_ls = ['1:02:00:00.5', '12:34:56.9', '00:01.2', '23:59:59', '2:00:00:00.25']
+    time_val_arr = CDFfunc.get_time_val_series(input_time_series=pd.Series(tenths_str_ls), zero_hr=1, unit='secs',
+                                               drop_tenths=True)
+
+    # trailing tenths removed from the last component before calling get_time_val
+    expected_ls = []
+    for time_str in tenths_str_ls:
+        time_str_split = time_str.split(":")
+        time_str_split[-1] = time_str_split[-1].split(".")[0]
+        expected_ls.append(CDFfunc.get_time_val(input_time_str=":".join(time_str_split), zero_hr=1, unit='secs'))
+    assert time_val_arr.tolist() == expected_ls
+
+
+def test_get_time_val_series_nulls():
+    time_series = pd.Series(['12:00:00', None, np.nan, '00:30'], index=[5, 3, 9, 1])
+    time_val_arr = CDFfunc.get_time_val_series(input_time_series=time_series, unit='secs')
+
+    assert time_val_arr[0] == CDFfunc.get_time_val(input_time_str='12:00:00', unit='secs')
+    assert np.isnan(time_val_arr[1]) and np.isnan(time_val_arr[2])
+    assert time_val_arr[3] == CDFfunc.get_time_val(input_time_str='00:30', unit='secs')
@@ -0,0 +1,17 @@
+import logging
+import pytest
+from CommandPE_Processor import get_batch_workers
+
+
+@pytest.mark.parametrize("argv, environ, expected", [(['script'], {}, 1),
+                                                     (['script'], {'CDF_BATCH_WORKERS': ''}, 1),
+                                                     (['script'], {'CDF_BATCH_WORKERS': '3'}, 3),
+                                                     (['script', '4'], {}, 4),
+                                                     (['script', '4'], {'CDF_BATCH_WORKERS': '3'}, 4),
+                                                     (['script', 'many'], {'CDF_BATCH_WORKERS': '3'}, 1),
+                                                     (['script'], {'CDF_BATCH_WORKERS': '0'}, 1),
+                                                     (['script', '-2'], {}, 1)])
+def test_get_batch_workers(argv, environ, expected, caplog):
+    caplog.set_level(logging.INFO)
+    assert get_batch_workers(argv, environ, logging.getLogger("test")) == expected
+    assert f"batch workers set as {expected}" in caplog.text.lower()
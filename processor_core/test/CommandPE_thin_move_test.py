@@ -0,0 +1,43 @@
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from CommandPE_Processor import thin_move_df
+
+
+def build_move_df(seed: int) -> pd.DataFrame:
+    """
+    Return a random move_df with times in order for each unit, repeated times and repeated, null and -0.0 locations
+    """
+    rand = random.Random(seed)
+    time_step = rand.choice([1, 2])
+    row_ls = []
+    for time_idx in range(rand.randint(1, 80)):
+        for uid in rand.sample(['a', 'b', 'c', 'd'], rand.randint(1, 4)):
+            row_ls.append((uid, float(time_idx // time_step), rand.choice([0.0, -0.0, 1.5, np.nan, 2.0]),
+                           rand.choice([0.0, 1.0, np.nan])))
+
+    return pd.DataFrame(row_ls, columns=['id', 'time', 'x', 'y'])
+
+
+def new_thin_state() -> dict:
+    return {'last_time': pd.Series(dtype='float64'),
+            'unit_code_dict': {},
+            'seen_loc': set(),
+            'last_rounded_time': pd.Series(dtype='float64')}
+
+
+@pytest.mark.parametrize("ignore_same_location_updates", [False, True])
+@pytest.mark.parametrize("min_loc_update_interval", [0, 3])
+@pytest.mark.parametrize("seed", range(25))
+def test_thin_move_df_chunked_matches_whole(seed, ignore_same_location_updates, min_loc_update_interval):
+    move_df = build_move_df(seed)
+    whole_df = thin_move_df(move_df, ignore_same_location_updates, min_loc_update_interval)
+
+    chunk_size = random.Random(seed).randint(1, 30)
+    thin_state = new_thin_state()
+    chunk_df_ls = [thin_move_df(move_df.iloc[start:start + chunk_size], ignore_same_location_updates,
+                                min_loc_update_interval, thin_state=thin_state)
+                   for start in range(0, len(move_df), chunk_size)]
+
+    pd.testing.assert_frame_equal(pd.concat(chunk_df_ls), whole_df)
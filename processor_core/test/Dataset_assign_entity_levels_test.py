@@ -0,0 +1,83 @@
+import logging
+import random
+import pytest
+from processor_core.Dataset import DataSet
+
+
+def build_dataset(output_location: str, seed: int, compact_entities: int) -> DataSet:
+    """
+    Return a Dataset with a random command hierarchy, including pre-set levels, unknown commanders and commander cycles
+    """
+    dataset = DataSet(dataset_config={'output_location': output_location, 'compact_entities': compact_entities},
+                      log_file=False, log_stream=False)
+    rand = random.Random(seed)
+    uid_ls = [f"unit_{idx}" for idx in range(rand.randint(1, 40))]
+    rand.shuffle(uid_ls)
+    for uid in uid_ls:
+        dataset.add_entity(uid)
+
+    for uid in uid_ls:
+        commander_kind = rand.random()
+        if commander_kind < 0.1:
+            commander = uid
+        elif commander_kind < 0.15:
+            commander = 'unknown_unit'
+        elif commander_kind < 0.2:
+            commander = None
+        else:
+            commander = rand.choice(uid_ls)
+        dataset.set_entity_data(uid, commander=commander)
+        if rand.random() < 0.1:
+            dataset.set_entity_data(uid, level=rand.randint(1, 4))
+
+    return dataset
+
+
+def assign_entity_levels_by_pass(dataset: DataSet) -> None:
+    """
+    Assign levels by passing through the entities array until no more levels are assigned (the original
+    assign_entity_levels)
+    """
+    for entity in dataset.entities:
+        if entity.commander == entity.uid or entity.level == 1:
+            entity.level = 1
+
+    known_uid_ls = [entity.uid for entity in dataset.entities]
+    lvl_complete = False
+    max_iter = 1000
+    iter_count = 0
+    while not lvl_complete and iter_count < max_iter:
+        lvl_complete = True
+        iter_count += 1
+        for entity in dataset.entities:
+            if entity.level is None and entity.commander in known_uid_ls:
+                commander = dataset.entities[known_uid_ls.index(entity.commander)]
+                if commander.level is not None:
+                    lvl_complete = False
+                    entity.level = commander.level + 1
+
+
+@pytest.mark.parametrize("compact_entities", [0, 1])
+@pytest.mark.parametrize("seed", range(30))
+def test_assign_entity_levels_matches_passes(tmp_path, seed, compact_entities):
+    expected_dataset = build_dataset(str(tmp_path), seed, compact_entities)
+    assign_entity_levels_by_pass(expected_dataset)
+    dataset = build_dataset(str(tmp_path), seed, compact_entities)
+    dataset.assign_entity_levels()
+
+    assert [entity.level for entity in dataset.entities] == [entity.level for entity in expected_dataset.entities]
+
+
+def test_assign_entity_levels_logs_cycles(tmp_path, caplog):
+    dataset = DataSet(dataset_config={'output_location': str(tmp_path)}, log_file=False, log_stream=False)
+    for uid, commander in [('hq', 'hq'), ('a', 'hq'), ('b', 'c'), ('c', 'd'), ('d', 'b'), ('e', 'd'),
+                           ('f', 'unknown_unit')]:
+        dataset.add_entity(uid)
+        dataset.set_entity_data(uid, commander=commander)
+
+    caplog.set_level(logging.INFO)
+    dataset.assign_entity_levels()
+
+    assert [entity.level for entity in dataset.entities] == [1, 2, None, None, None, None, None]
+    assert "Commander cycle found - levels not assigned for 3 entities in cycle b -> c -> d -> b" in caplog.text
+    assert "Level assign failed for 1 entities with unknown commanders: ['f']" in caplog.text
@@ -0,0 +1,153 @@
+import logging
+import random
+import pandas as pd
+import pytest
+from processor_core.CDF_Func import CDFfunc
+from processor_core.Dataset import DataSet
+
+
+def build_dataset(output_location: str, seed: int, compact_entities: int) -> DataSet:
+    """
+    Return a Dataset with random affiliations, forces, components and loss events, with many losses at the same time
+    """
+    dataset = DataSet(dataset_config={'output_location': output_location, 'compact_entities': compact_entities},
+                      log_file=False, log_stream=False)
+    rand = random.Random(seed)
+    uid_ls = [f"unit_{idx}" for idx in range(rand.randint(1, 25))]
+    for uid in uid_ls:
+        dataset.add_entity(uid)
+        affiliation = rand.choice(['blue_1', 'blue_2', 'red_1', 'red_2'])
+        dataset.set_entity_data(uid, commander=uid, affiliation=affiliation, force=affiliation.split('_')[0],
+                                init_comps=rand.choice([0, 1, 2, 5]), cbt_per_comp=rand.choice([1, 2.5, 10]))
+
+    for _ in range(rand.randint(0, 40)):
+        dataset.add_loss(rand.choice(uid_ls), float(rand.randint(1, 6)), rand.choice(uid_ls), ['k'], ['v'])
+
+    return dataset
+
+
+def attach_loss_events_by_search(dataset: DataSet) -> list:
+    """
+    Return the loss event ids for the rows of the CDF combat power Dataframe found by searching all the loss events for
+    each component drop (the original attach_loss_events_to_cdf_cbt_pwr_df)
+    """
+    time_ls = dataset.CDF_combat_power_DF[dataset.cbt_tbl_time_col_lbl].to_list()
+    item_ls = dataset.CDF_combat_power_DF[dataset.cbt_tbl_item_col_lbl].to_list()
+    num_items = len(set(item_ls))
+    eventid_ls = ['none'] * num_items
+    del time_ls[:num_items]
+    del item_ls[:num_items]
+
+    events_df = dataset.CDF_events_df
+    losses_df = events_df.loc[events_df[dataset.evn_tbl_event_type_col_lbl] == dataset.loss_event_lbl]
+    loss_time_ls = losses_df[dataset.evn_tbl_time_col_lbl].to_list()
+    loss_affil_ls = losses_df[dataset.evn_tbl_prim_affil_col_lbl].to_list()
+    loss_force_ls = losses_df[dataset.evn_tbl_prim_force_col_lbl].to_list()
+    loss_eventid_ls = losses_df[dataset.evn_tbl_event_id_col_lbl].to_list()
+    loss_entity_ls = losses_df[dataset.evn_tbl_prim_id_col_lbl].to_list()
+
+    for time_idx, time in enumerate(time_ls):
+        event_identified = False
+        for loss_idx, loss_time in enumerate(loss_time_ls):
+            if not event_identified:
+                if dataset.entities[dataset.get_entity_index(loss_entity_ls[loss_idx])].init_comps > 0:
+                    if time == loss_time and loss_affil_ls[loss_idx] == item_ls[time_idx]:
+                        eventid_ls.append(loss_eventid_ls[loss_idx])
+                        loss_affil_ls[loss_idx] = None
+                        event_identified = True
+                    if time == loss_time and loss_force_ls[loss_idx] == item_ls[time_idx]:
+                        eventid_ls.append(loss_eventid_ls[loss_idx])
+                        loss_force_ls[loss_idx] = None
+                        event_identified = True
+        if not event_identified:
+            eventid_ls.append("event not found")
+
+    return eventid_ls
+
+
+@pytest.mark.parametrize("compact_entities", [0, 1])
+@pytest.mark.parametrize("seed", range(20))
+def test_attach_loss_events_matches_search(tmp_path, seed, compact_entities):
+    dataset = build_dataset(str(tmp_path), seed, compact_entities)
+    dataset.finalise_data()
+
+    assert dataset.CDF_combat_power_DF[dataset.cbt_tbl_event_col_lbl].to_list() == \
+           attach_loss_events_by_search(dataset)
+
+
+def test_attach_loss_events_unknown_uid(tmp_path, caplog):
+    dataset = build_dataset(str(tmp_path), 3, 0)
+    dataset.add_entity('removed_unit')
+    dataset.set_entity_data('removed_unit', commander='removed_unit', affiliation='blue_1', force='blue',
+                            init_comps=2, cbt_per_comp=1)
+    dataset.add_loss('removed_unit', 1.0, 'unit_0', ['k'], ['v'])
+    dataset.finalise_data()
+    expected_eventid_ls = dataset.CDF_combat_power_DF[dataset.cbt_tbl_event_col_lbl].to_list()
+    events_df = dataset.CDF_events_df
+    loss_id = events_df.loc[events_df[dataset.evn_tbl_prim_id_col_lbl] == 'removed_unit',
+                            dataset.evn_tbl_event_id_col_lbl].iloc[0]
+    # one drop for the affiliation and one for the force
+    assert expected_eventid_ls.count(loss_id) == 2
+
+    # the loss event of an entity removed after the CDF events are generated is ignored
+    dataset.remove_entity('removed_unit')
+    caplog.set_level(logging.ERROR)
+    dataset.generate_cdf_cbt_pwr_df()
+
+    assert "Get entity index failed - uid: removed_unit" in caplog.text
+    assert dataset.CDF_combat_power_DF[dataset.cbt_tbl_event_col_lbl].to_list() == \
+           [event_id for event_id in expected_eventid_ls if event_id != loss_id]
+
+
+def generate_cbt_pwr_by_entity(dataset: DataSet) -> pd.DataFrame:
+    """
+    Return the CDF combat power Dataframe (without event ids) built by summing the starting levels entity by entity
+    and adding the drops for each loss event in turn (the original generate_cdf_cbt_pwr_df)
+    """
+    loss_time, loss_item, loss_comps, loss_pwr = [], [], [], []
+    affiliations = CDFfunc.get_unique_list(dataset.CDF_entity_table_df[dataset.ent_tbl_affil_col_lbl].tolist())
+    forces = CDFfunc.get_unique_list(dataset.CDF_entity_table_df[dataset.ent_tbl_force_col_lbl].tolist())
+    for items, ent_attribute in [(affiliations, 'affiliation'), (forces, 'force')]:
+        for item in items:
+            start_comps = 0
+            start_pwr = 0
+            for entity in dataset.entities:
+                if getattr(entity, ent_attribute) == item:
+                    start_comps = start_comps + entity.init_comps
+                    start_pwr = start_pwr + (entity.init_comps * entity.cbt_per_comp)
+            loss_time.append(0)
+            loss_item.append(item)
+            loss_comps.append(start_comps)
+            loss_pwr.append(start_pwr)
+
+    for entity in dataset.entities:
+        for time in entity.get_data_list('losses_time'):
+            if entity.init_comps > 0:
+                for item in [entity.affiliation, entity.force]:
+                    loss_time.append(time)
+                    loss_item.append(item)
+                    loss_comps.append(-1)
+                    loss_pwr.append(-entity.cbt_per_comp)
+
+    cbt_pwr_df = pd.DataFrame(data=zip(loss_time, loss_item, loss_comps, loss_pwr),
+                              columns=[dataset.cbt_tbl_time_col_lbl, dataset.cbt_tbl_item_col_lbl,
+                                       'comp loss', 'pwr loss'])
+    cbt_pwr_df[dataset.cbt_tbl_time_col_lbl] = pd.to_numeric(cbt_pwr_df[dataset.cbt_tbl_time_col_lbl])
+    cbt_pwr_df.sort_values(by=[dataset.cbt_tbl_time_col_lbl, dataset.cbt_tbl_item_col_lbl], inplace=True,
+                           ignore_index=True)
+    cbt_pwr_df[dataset.cbt_tbl_comp_col_lbl] = cbt_pwr_df.groupby([dataset.cbt_tbl_item_col_lbl])['comp loss'].cumsum()
+    cbt_pwr_df[dataset.cbt_tbl_pwr_col_lbl] = cbt_pwr_df.groupby([dataset.cbt_tbl_item_col_lbl])['pwr loss'].cumsum()
+
+    return cbt_pwr_df.drop(labels=['comp loss', 'pwr loss'], axis=1)
+
+
+@pytest.mark.parametrize("compact_entities", [0, 1])
+@pytest.mark.parametrize("seed", range(20))
+def test_cbt_pwr_df_matches_entity_sums(tmp_path, seed, compact_entities):
+    dataset = build_dataset(str(tmp_path), seed, compact_entities)
+    dataset.finalise_data()
+
+    expected_df = generate_cbt_pwr_by_entity(dataset).astype(
+        {col: col_type for col, col_type in dataset.cbt_tbl_col_types_dict.items()
+         if col != dataset.cbt_tbl_event_col_lbl})
+    pd.testing.assert_frame_equal(dataset.CDF_combat_power_DF[expected_df.columns], expected_df)
@@ -0,0 +1,73 @@
+import random
+import numpy as np
+import pytest
+from processor_core.Dataset import DataSet
+
+
+def new_uid(uid: str) -> str:
+    """
+    Return a new str instance equal to uid
+    """
+    return "".join(list(uid))
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    return DataSet(dataset_config={'output_location': str(tmp_path)}, log_file=False, log_stream=False)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_intern_uids_round_trip(dataset, seed):
+    rand = random.Random(seed)
+    uid_ls = [rand.choice([f"unit_{rand.randint(0, 20)}", None, np.nan, rand.randint(0, 5)])
+              for _ in range(rand.randint(0, 60))]
+
+    interned_ls = dataset.intern_uids([new_uid(uid) if isinstance(uid, str) else uid for uid in uid_ls])
+
+    # the interned uids are equal to the uids (nulls unchanged) and equal uids share an instance
+    assert len(interned_ls) == len(uid_ls)
+    for uid, interned_uid in zip(uid_ls, interned_ls):
+        if isinstance(uid, (str, int)):
+            assert interned_uid == uid
+            assert interned_uid is dataset.intern_uids([new_uid(uid) if isinstance(uid, str) else uid])[0]
+        else:
+            assert interned_uid is uid
+
+    # uid codes map back to the uids, with nulls given code -1 and returned as None
+    uid_code_arr = dataset.get_uid_codes(uid_ls)
+    assert uid_code_arr.dtype == np.int32
+    expected_ls = [uid if isinstance(uid, (str, int)) else None for uid in uid_ls]
+    assert dataset.get_uids(uid_code_arr).tolist() == expected_ls
+    assert [uid_code == -1 for uid_code in uid_code_arr] == [uid is None for uid in expected_ls]
+    # each uid has a single code
+    uid_code_dict = {}
+    for uid, uid_code in zip(expected_ls, uid_code_arr):
+        assert uid_code_dict.setdefault(uid, uid_code) == uid_code
+
+
+def test_get_uid_codes_interns_new_uids(dataset):
+    uid_code_arr = dataset.get_uid_codes(['a', 'b', None, 'a'])
+    assert uid_code_arr.tolist() == [0, 1, -1, 0]
+    assert dataset.get_uid_codes(['c', 'b']).tolist() == [2, 1]
+    assert dataset.intern_uids(['c'])[0] is dataset.get_uids(np.array([2]))[0]
+
+
+@pytest.mark.parametrize("columnar_event_store", [0, 1])
+def test_entity_data_lists_hold_interned_uids(tmp_path, columnar_event_store):
+    dataset = DataSet(dataset_config={'output_location': str(tmp_path), 'columnar_event_store': columnar_event_store},
+                      log_file=False, log_stream=False)
+    for uid in ['unit_0', 'unit_1']:
+        dataset.add_entity(new_uid(uid))
+    spot_entity_ls = [new_uid(uid) for uid in ['unit_1', 'unit_1', 'other_unit', 'unit_0']]
+    dataset.append_to_list('unit_0', 'spot_time', [1.0, 2.0, 3.0, 4.0])
+    dataset.append_to_list('unit_0', 'spot_entity', spot_entity_ls)
+    dataset.add_kill('unit_1', 5.0, new_uid('other_unit'), ['k'], ['v'])
+
+    # the uids held are equal to the uids added, each held as a single instance
+    entity_0 = dataset.entities[dataset.get_entity_index('unit_0')]
+    entity_1 = dataset.entities[dataset.get_entity_index('unit_1')]
+    held_spot_entity_ls = list(entity_0.get_data_list('spot_entity'))
+    assert held_spot_entity_ls == spot_entity_ls
+    assert held_spot_entity_ls[0] is held_spot_entity_ls[1] is entity_1.uid
+    assert held_spot_entity_ls[2] is list(entity_1.get_data_list('kills_victim'))[0]
+    assert held_spot_entity_ls[3] is entity_0.uid
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import pytest
+from processor_core.CDF_Func import CDFfunc
+from processor_core.Dataset import DataSet
+
+
+def build_event_map_ls(seed: int) -> list:
+    """
+    Return a list of event maps (as built in CommandPE_Processor) with random event Dataframes for the seed
+    """
+    rand = np.random.default_rng(seed)
+    uid_ls = [f"unit_{idx}" for idx in range(6)]
+    # the event Dataframes can include uids that are not entities in the Dataset
+    df_uid_ls = uid_ls + ['not_an_entity']
+
+    num_rows = int(rand.integers(0, 60))
+    move_df = pd.DataFrame({'id': rand.choice(df_uid_ls, size=num_rows),
+                            'time': rand.random(num_rows),
+                            'x': rand.random(num_rows),
+                            'y': rand.random(num_rows),
+                            'status_detail': rand.choice(['OK', 'Dam aged', None], size=num_rows),
+                            'crs_detail': rand.integers(0, 360, size=num_rows),
+                            'spd_detail': rand.random(num_rows)})
+
+    num_rows = int(rand.integers(0, 40))
+    spots_df = pd.DataFrame({'spotter_id': rand.choice(df_uid_ls, size=num_rows),
+                             'spotted_id': rand.choice(df_uid_ls, size=num_rows),
+                             'time': rand.random(num_rows),
+                             'sensor_name_detail': rand.choice(['radar: "A"', 'eyes'], size=num_rows),
+                             'range_detail': rand.random(num_rows)})
+
+    num_rows = int(rand.integers(0, 20))
+    kills_df = pd.DataFrame({'killer_id': rand.choice(df_uid_ls, size=num_rows),
+                             'victim_id': rand.choice(df_uid_ls, size=num_rows),
+                             'time': rand.random(num_rows),
+                             'wpn_instance_detail': rand.choice(['gun{1}', 'missile'], size=num_rows),
+                             'range_detail': rand.random(num_rows)})
+
+    location_event_map = {'df': move_df,
+                          'df_name': 'unit_pos_df',
+                          'mask_col': 'id',
+                          'data_maps': [['time', 'location_time'],
+                                        ['x', 'location_x'],
+                                        ['y', 'location_y']],
+                          'detail_keys': ['status', 'course', 'speed'],
+                          'detail_cols': ['status_detail', 'crs_detail', 'spd_detail'],
+                          'detail_list': 'location_detail'}
+
+    spot_event_map = {'df': spots_df,
+                      'df_name': 'unit_spots_df',
+                      'mask_col': 'spotter_id',
+                      'data_maps': [['time', 'spot_time'],
+                                    ['spotted_id', 'spot_entity']],
+                      'detail_keys': ['sensor name', 'range'],
+                      'detail_cols': ['sensor_name_detail', 'range_detail'],
+                      'detail_list': 'spot_detail'}
+
+    seen_event_map = {'df': spots_df,
+                      'df_name': 'unit_spots_df',
+                      'mask_col': 'spotted_id',
+                      'data_maps': [['time', 'seen_time'],
+                                    ['spotter_id', 'seen_entity']],
+                      'detail_keys': ['sensor name', 'range'],
+                      'detail_cols': ['sensor_name_detail', 'range_detail'],
+                      'detail_list': 'seen_detail'}
+
+    kill_event_map = {'df': kills_df,
+                      'df_name': 'kills_df',
+                      'mask_col': 'killer_id',
+                      'data_maps': [['time', 'kills_time'],
+                                    ['victim_id', 'kills_victim']],
+                      'detail_keys': ['weapon instance', 'range'],
+                      'detail_cols': ['wpn_instance_detail', 'range_detail'],
+                      'detail_list': 'kills_detail'}
+
+    loss_event_map = {'df': kills_df,
+                      'df_name': 'kills_df',
+                      'mask_col': 'victim_id',
+                      'data_maps': [['time', 'losses_time'],
+                                    ['killer_id', 'losses_killer']],
+                      'detail_keys': ['loss cause'],
+                      'detail_cols': ['wpn_instance_detail'],
+                      'detail_list': 'losses_detail'}
+
+    return [location_event_map, spot_event_map, seen_event_map, kill_event_map, loss_event_map]
+
+
+def build_dataset(output_location: str, dataset_config: dict) -> DataSet:
+    dataset = DataSet(dataset_config={'output_location': output_location, **dataset_config},
+                      log_file=False, log_stream=False)
+    for idx in range(6):
+        dataset.add_entity(f"unit_{idx}")
+
+    return dataset
+
+
+def load_event_maps_per_entity(dataset: DataSet, event_map_ls: list) -> None:
+    """
+    Load the event maps by masking the event Dataframes for each entity in turn (the original loading loop)
+    """
+    for event_map in event_map_ls:
+        event_df = event_map['df']
+        mask_col = event_map['mask_col']
+        for entity in dataset.entities:
+            uid = entity.uid
+            for data_col, tgt_list in event_map['data_maps']:
+                data_ls = CDFfunc.get_col_slice(df=event_df, uid=uid, mask_col=mask_col, tgt_col=data_col)
+                if len(data_ls) > 0:
+                    dataset.append_to_list(uid=uid, target_list=tgt_list, data_list=data_ls)
+
+            detail_val_ls = []
+            for detail_col in event_map['detail_cols']:
+                detail_val_ls.append(CDFfunc.get_col_slice(df=event_df, uid=uid, mask_col=mask_col, tgt_col=detail_col))
+            detail_data_encoded = CDFfunc.encode_event_detail_list(*detail_val_ls, detail_keys=event_map['detail_keys'])
+            if len(detail_data_encoded) > 0:
+                dataset.append_to_list(uid=uid, target_list=event_map['detail_list'], data_list=detail_data_encoded)
+
+
+@pytest.mark.parametrize("columnar_event_store, compact_entities", [(0, 0), (1, 0), (0, 1), (1, 1)])
+@pytest.mark.parametrize("seed", range(6))
+def test_load_event_maps_matches_per_entity_loop(tmp_path, seed, columnar_event_store, compact_entities):
+    dataset_config = {'columnar_event_store': columnar_event_store, 'compact_entities': compact_entities}
+    expected_dataset = build_dataset(str(tmp_path), dataset_config)
+    load_event_maps_per_entity(expected_dataset, build_event_map_ls(seed))
+    dataset = build_dataset(str(tmp_path), dataset_config)
+    dataset.load_event_maps(build_event_map_ls(seed))
+
+    event_id_ls = expected_dataset.get_event_id_ls()
+    assert dataset.get_event_id_ls() == event_id_ls
+    for event_id in event_id_ls:
+        assert dataset.get_event_data(event_id) == expected_dataset.get_event_data(event_id)
+
+    for expected_entity, entity in zip(expected_dataset.entities, dataset.entities):
+        assert entity.uid == expected_entity.uid
+        for list_name in dataset.event_list_map:
+            assert list(entity.get_data_list(list_name)) == list(expected_entity.get_data_list(list_name))
+
+
+@pytest.mark.parametrize("columnar_event_store", [0, 1])
+@pytest.mark.parametrize("seed", range(6))
+def test_lazy_event_detail_matches_eager(tmp_path, seed, columnar_event_store):
+    eager_dataset = build_dataset(str(tmp_path), {'columnar_event_store': columnar_event_store})
+    eager_dataset.load_event_maps(build_event_map_ls(seed))
+    lazy_dataset = build_dataset(str(tmp_path), {'columnar_event_store': columnar_event_store,
+                                                 'lazy_event_detail': 1})
+    lazy_dataset.load_event_maps(build_event_map_ls(seed))
+    # raw detail held by a dataset imported from the lazy dataset
+    import_dataset = DataSet(dataset_config={'output_location': str(tmp_path),
+                                             'columnar_event_store': columnar_event_store},
+                             log_file=False, log_stream=False)
+    import_dataset.import_dataset_dict(lazy_dataset.export_dataset_dict())
+
+    event_id_ls = eager_dataset.get_event_id_ls()
+    assert lazy_dataset.get_event_id_ls() == event_id_ls
+    for event_id in event_id_ls:
+        assert lazy_dataset.get_event_data(event_id) == eager_dataset.get_event_data(event_id)
+        assert import_dataset.get_event_data(event_id) == eager_dataset.get_event_data(event_id)
+
+    eager_dataset.finalise_data()
+    lazy_dataset.finalise_data()
+    eager_dataset.export_data()
+    lazy_dataset.export_data()
+    pd.testing.assert_frame_equal(lazy_dataset.CDF_events_df, eager_dataset.CDF_events_df)
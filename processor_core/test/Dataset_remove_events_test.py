@@ -0,0 +1,153 @@
+import random
+import pytest
+from processor_core.Dataset import DataSet
+
+
+def build_dataset(output_location: str, seed: int, columnar_event_store: int, compact_entities: int) -> DataSet:
+    """
+    Return a Dataset with a random set of events (the same events for the same seed)
+    """
+    dataset = DataSet(dataset_config={'output_location': output_location,
+                                      'columnar_event_store': columnar_event_store,
+                                      'compact_entities': compact_entities},
+                      log_file=False, log_stream=False)
+    rand = random.Random(seed)
+    uid_ls = [f"unit_{idx}" for idx in range(rand.randint(1, 6))]
+    for uid in uid_ls:
+        dataset.add_entity(uid)
+
+    for _ in range(rand.randint(1, 80)):
+        uid = rand.choice(uid_ls)
+        event_kind = rand.randint(0, 4)
+        time = rand.random()
+        if event_kind == 0:
+            dataset.add_location(uid, time, rand.random(), rand.random(), ['k'], [rand.randint(0, 9)])
+        elif event_kind == 1:
+            dataset.add_kill(uid, time, rand.choice(uid_ls), ['k'], ['v'])
+        elif event_kind == 2:
+            dataset.add_spot(uid, time, rand.choice(uid_ls), ['k'], ['v'])
+        elif event_kind == 3:
+            dataset.add_status(uid, time, ['s'], [str(time)])
+        else:
+            dataset.add_shot(uid, time, ['k'], ['v'])
+
+    return dataset
+
+
+def get_type_time_dict(dataset: DataSet) -> dict:
+    """
+    Return the event times of each entity by event type in data_idx order (the order of the entity data lists)
+    """
+    type_time_dict = {}
+    for entity in dataset.entities:
+        for list_name, (event_type, col) in dataset.event_list_map.items():
+            if col == 'time':
+                type_time_dict[(entity.uid, event_type)] = list(entity.get_data_list(list_name))
+
+    return type_time_dict
+
+
+@pytest.mark.parametrize("columnar_event_store, compact_entities", [(0, 0), (1, 0), (0, 1), (1, 1)])
+@pytest.mark.parametrize("seed", range(8))
+def test_remove_events_keeps_other_events(tmp_path, seed, columnar_event_store, compact_entities):
+    dataset = build_dataset(str(tmp_path), seed, columnar_event_store, compact_entities)
+
+    # the events before removal, with the position of each event in its entity's data lists for the event type
+    event_id_ls = dataset.get_event_id_ls()
+    event_data_dict = {event_id: dataset.get_event_data(event_id) for event_id in event_id_ls}
+    event_pos_dict = {}
+    for entity in dataset.entities:
+        ent_event_id_dict = dataset.get_entity_event_id_dict(entity)
+        for event_type, evn_ser, data_idx in zip(ent_event_id_dict['type'], ent_event_id_dict['evn_ser'],
+                                                 ent_event_id_dict['data_idx']):
+            event_id = dataset.format_event_ids([event_type], [evn_ser])[0]
+            event_pos_dict[event_id] = (entity.uid, event_type, data_idx)
+    type_time_dict = get_type_time_dict(dataset)
+
+    rand = random.Random(seed)
+    remove_id_ls = rand.sample(event_id_ls, rand.randint(0, len(event_id_ls)))
+    # unknown ids are logged and ignored
+    dataset.remove_events(remove_id_ls + ['loc-99999', 'not_an_id'])
+
+    # the remaining events and their data are unchanged
+    kept_id_ls = sorted(set(event_id_ls) - set(remove_id_ls))
+    assert sorted(dataset.get_event_id_ls()) == kept_id_ls
+    for event_id in kept_id_ls:
+        assert dataset.get_event_data(event_id) == event_data_dict[event_id]
+    for remove_id in remove_id_ls:
+        assert dataset.find_event(remove_id) == (None, None, None)
+
+    # the entity data lists keep the remaining events in their original order and the event type counts match
+    removed_pos_set = {event_pos_dict[remove_id] for remove_id in remove_id_ls}
+    expected_count_dict = {}
+    for (uid, event_type), time_ls in type_time_dict.items():
+        kept_time_ls = [time for data_idx, time in enumerate(time_ls)
+                        if (uid, event_type, data_idx) not in removed_pos_set]
+        assert get_type_time_dict(dataset)[(uid, event_type)] == kept_time_ls
+        expected_count_dict[(uid, event_type)] = len(kept_time_ls)
+    for entity in dataset.entities:
+        for event_type in dataset.event_type_order_ls:
+            assert dict(entity.get_data_list('event_type_count_dict')).get(event_type, 0) == \
+                   expected_count_dict[(entity.uid, event_type)]
+
+
+@pytest.mark.parametrize("columnar_event_store", [0, 1])
+def test_events_added_after_remove_events(tmp_path, columnar_event_store):
+    dataset = build_dataset(str(tmp_path), 3, columnar_event_store, 0)
+    dataset.remove_events(dataset.get_event_id_ls()[::2])
+
+    uid = dataset.entities[0].uid
+    dataset.add_location(uid, 2.0, 1.0, 1.0, ['k'], ['v'])
+    dataset.add_kill(uid, 2.5, uid, ['k'], ['v'])
+    loc_id, kill_id = dataset.format_event_ids([dataset.loc_event_lbl, dataset.kill_event_lbl],
+                                               [dataset.loc_event_last_ser, dataset.kill_event_last_ser])
+
+    assert dataset.get_event_data(loc_id)['time'] == 2.0
+    assert dataset.get_event_data(kill_id)['time'] == 2.5
+    dataset.remove_events([loc_id])
+    assert dataset.find_event(loc_id) == (None, None, None)
+    assert dataset.get_event_data(kill_id)['sec_uid'] == uid
+
+
+@pytest.mark.parametrize("columnar_event_store", [0, 1])
+def test_remove_entity_removes_its_events_from_index(tmp_path, columnar_event_store, caplog):
+    dataset = build_dataset(str(tmp_path), 5, columnar_event_store, 0)
+    for uid in ['extra_a', 'extra_b']:
+        dataset.add_entity(uid)
+        dataset.add_location(uid, 1.0, 2.0, 3.0, ['k'], ['v'])
+    event_id_ls = dataset.get_event_id_ls()
+    removed_id_ls = [event_id for event_id in event_id_ls if dataset.get_event_data(event_id)['prim_uid'] == 'extra_a']
+
+    dataset.remove_entity('extra_a')
+
+    caplog.clear()
+    for removed_id in removed_id_ls:
+        assert dataset.find_event(removed_id) == (None, None, None)
+    assert "Get entity index failed" not in caplog.text
+    for event_id in set(event_id_ls) - set(removed_id_ls):
+        assert dataset.get_event_data(event_id) != {}
+
+
+@pytest.mark.parametrize("columnar_event_store, compact_entities", [(0, 0), (1, 0), (0, 1), (1, 1)])
+@pytest.mark.parametrize("seed", range(4))
+def test_remove_entities_matches_remove_entity(tmp_path, seed, columnar_event_store, compact_entities):
+    dataset = build_dataset(str(tmp_path), seed, columnar_event_store, compact_entities)
+    rand = random.Random(seed)
+    uid_ls = dataset.get_uid_ls()
+    remove_uid_ls = rand.sample(uid_ls, rand.randint(0, len(uid_ls)))
+    kept_uid_ls = [uid for uid in uid_ls if uid not in remove_uid_ls]
+    kept_id_ls = sorted(event_id for event_id in dataset.get_event_id_ls()
+                        if dataset.get_event_data(event_id)['prim_uid'] in kept_uid_ls)
+    kept_data_dict = {event_id: dataset.get_event_data(event_id) for event_id in kept_id_ls}
+
+    # unknown and repeated uids are logged and ignored
+    dataset.remove_entities(remove_uid_ls + remove_uid_ls[:1] + ['not_a_uid'])
+
+    assert dataset.get_uid_ls() == kept_uid_ls
+    for idx, uid in enumerate(kept_uid_ls):
+        assert dataset.get_entity_index(uid) == idx
+    for uid in remove_uid_ls:
+        assert not dataset.has_entity(uid)
+    assert sorted(dataset.get_event_id_ls()) == kept_id_ls
+    for event_id in kept_id_ls:
+        assert dataset.get_event_data(event_id) == kept_data_dict[event_id]
@@ -0,0 +1,68 @@
+import random
+import pytest
+from processor_core.Dataset import DataSet
+from processor_core.Entity import Entity, CompactEntity
+from Dataset_remove_events_test import build_dataset
+
+
+def set_random_entity_data(dataset: DataSet, seed: int) -> None:
+    rand = random.Random(seed)
+    uid_ls = dataset.get_uid_ls()
+    for uid in uid_ls:
+        dataset.set_entity_data(uid, unit_name=f"name {uid}", unit_type=rand.choice(['tank', None]),
+                                commander=rand.choice(uid_ls), affiliation=rand.choice(['blue', 'red']),
+                                force=rand.choice(['blue', 'red']), init_comps=rand.randint(0, 3),
+                                cbt_per_comp=rand.choice([1, 2.5]))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compact_entity_export_matches_entity(seed):
+    rand = random.Random(seed)
+    entity_args = {'uid': 'unit_1', 'unit_name': 'name', 'commander': 'unit_0', 'level': rand.choice([None, 2]),
+                   'init_comps': rand.randint(0, 5), 'cbt_per_comp': 1.5, 'add_time': rand.random()}
+    entity = Entity(**entity_args)
+    compact_entity = CompactEntity(**entity_args)
+    assert compact_entity.get_attribute_ls() == entity.get_attribute_ls()
+    assert compact_entity.export_entity_dict() == entity.export_entity_dict()
+
+    for list_name in ['location_time', 'location_x', 'kills_time', 'kills_victim', 'state_detail']:
+        data_ls = [rand.random() if list_name.endswith(('_time', '_x')) else f"val {idx}"
+                   for idx in range(rand.randint(0, 5))]
+        entity.get_data_list(list_name).extend(data_ls)
+        # the compact entity data lists are created on first use
+        getattr(compact_entity, list_name).extend(data_ls)
+    entity.entity_event_id_dict['evn_ser'].append(1)
+    compact_entity.entity_event_id_dict['evn_ser'].append(1)
+    assert compact_entity.export_entity_dict() == entity.export_entity_dict()
+
+    # entity dicts imported into either class export the same dict
+    for import_class in [Entity, CompactEntity]:
+        for export_entity in [entity, compact_entity]:
+            import_entity = import_class(uid='unit_1')
+            import_entity.import_entity_dict(export_entity.export_entity_dict())
+            assert import_entity.export_entity_dict() == entity.export_entity_dict()
+
+
+@pytest.mark.parametrize("columnar_event_store", [0, 1])
+@pytest.mark.parametrize("seed", range(6))
+def test_compact_entities_save_load_round_trip(tmp_path, seed, columnar_event_store):
+    dataset = build_dataset(str(tmp_path), seed, columnar_event_store, 0)
+    set_random_entity_data(dataset, seed)
+    compact_dataset = build_dataset(str(tmp_path), seed, columnar_event_store, 1)
+    set_random_entity_data(compact_dataset, seed)
+    dataset_dict = dataset.export_dataset_dict()
+    assert compact_dataset.export_dataset_dict()['ent_dict_ls'] == dataset_dict['ent_dict_ls']
+
+    # save with compact entities and load with and without
+    compact_dataset.save_dataset(save_location=str(tmp_path), save_file="compact_dataset.yaml")
+    event_data_dict = {event_id: dataset.get_event_data(event_id) for event_id in dataset.get_event_id_ls()}
+    for compact_entities in [0, 1]:
+        load_dataset = DataSet(dataset_config={'output_location': str(tmp_path),
+                                               'columnar_event_store': columnar_event_store,
+                                               'compact_entities': compact_entities},
+                               log_file=False, log_stream=False)
+        load_dataset.load_dataset(load_location=str(tmp_path), load_file="compact_dataset.yaml")
+
+        assert load_dataset.export_dataset_dict()['ent_dict_ls'] == dataset_dict['ent_dict_ls']
+        assert {event_id: load_dataset.get_event_data(event_id)
+                for event_id in load_dataset.get_event_id_ls()} == event_data_dict
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+from processor_core.Dataset import DataSet
+from Dataset_remove_events_test import build_dataset
+
+
+def get_event_data_dict(dataset: DataSet) -> dict:
+    return {event_id: dataset.get_event_data(event_id) for event_id in dataset.get_event_id_ls()}
+
+
+def get_event_id_set(ent_event_id_dict: dict) -> set:
+    return set(zip(*[ent_event_id_dict[key] for key in ['evn_ser', 'type', 'prim_uid', 'sec_uid', 'data_idx']]))
+
+
+@pytest.mark.parametrize("compact_entities", [0, 1])
+@pytest.mark.parametrize("seed", range(6))
+def test_columnar_event_store_matches_entity_lists(tmp_path, seed, compact_entities):
+    list_dataset = build_dataset(str(tmp_path), seed, 0, compact_entities)
+    store_dataset = build_dataset(str(tmp_path), seed, 1, compact_entities)
+
+    assert get_event_data_dict(store_dataset) == get_event_data_dict(list_dataset)
+    for list_entity, store_entity in zip(list_dataset.entities, store_dataset.entities):
+        # the event store returns the event ids type by type rather than in the order the events were added
+        assert get_event_id_set(store_dataset.get_entity_event_id_dict(store_entity)) == \
+               get_event_id_set(list_dataset.get_entity_event_id_dict(list_entity))
+        for list_name in list_dataset.event_list_map:
+            assert list(store_entity.get_data_list(list_name)) == list(list_entity.get_data_list(list_name))
+
+    list_dataset.finalise_data()
+    store_dataset.finalise_data()
+    pd.testing.assert_frame_equal(store_dataset.CDF_entity_table_df, list_dataset.CDF_entity_table_df)
+    pd.testing.assert_frame_equal(store_dataset.CDF_events_df, list_dataset.CDF_events_df)
+    pd.testing.assert_frame_equal(store_dataset.CDF_combat_power_DF, list_dataset.CDF_combat_power_DF)
+
+
+@pytest.mark.parametrize("export_columnar, import_columnar", [(0, 1), (1, 0), (1, 1)])
+@pytest.mark.parametrize("seed", range(4))
+def test_columnar_event_store_export_import(tmp_path, seed, export_columnar, import_columnar):
+    export_dataset = build_dataset(str(tmp_path), seed, export_columnar, 0)
+    import_dataset = DataSet(dataset_config={'output_location': str(tmp_path),
+                                             'columnar_event_store': import_columnar},
+                             log_file=False, log_stream=False)
+    import_dataset.import_dataset_dict(export_dataset.export_dataset_dict())
+
+    assert import_dataset.get_uid_ls() == export_dataset.get_uid_ls()
+    assert get_event_data_dict(import_dataset) == get_event_data_dict(export_dataset)
+
+    # events added after the import continue from the imported event serials
+    uid = import_dataset.entities[0].uid
+    import_dataset.add_location(uid, 2.0, 1.0, 1.0, ['k'], ['v'])
+    export_dataset.add_location(uid, 2.0, 1.0, 1.0, ['k'], ['v'])
+    assert get_event_data_dict(import_dataset) == get_event_data_dict(export_dataset)
@@ -0,0 +1,111 @@
+import logging
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from processor_core.InputCache import InputCache
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    source_path = tmp_path / "source.csv"
+    source_path.write_text("Time,Name,Range\n0:00:01,alpha,1.5\n0:00:02,,2.5\n0:00:03,bravo,3.5\n")
+
+    return str(source_path)
+
+
+@pytest.fixture
+def input_cache(tmp_path, monkeypatch):
+    input_cache = InputCache(cache_location=str(tmp_path / "CDF_input_cache"), logger=logging.getLogger("test"))
+    # count the source files hashed
+    input_cache.hash_count = 0
+    get_content_hash = InputCache.get_content_hash
+
+    def counted_get_content_hash(source_file, block_size=1048576):
+        input_cache.hash_count += 1
+        return get_content_hash(source_file, block_size)
+
+    monkeypatch.setattr(input_cache, "get_content_hash", counted_get_content_hash)
+
+    return input_cache
+
+
+def read_and_cache(input_cache: InputCache, source_file: str, read_spec: dict):
+    """
+    Load source_file from the cache, reading and saving it on a miss (as read_source_df), return the dataframe and
+    whether it was loaded from the cache
+    """
+    cached_df = input_cache.load("source_df", source_file, read_spec)
+    if cached_df is not None:
+        return cached_df, True
+
+    source_df = pd.read_csv(source_file, **read_spec)
+    input_cache.save("source_df", source_file, read_spec, source_df)
+
+    return source_df, False
+
+
+def set_mtime(source_file: str, mtime_ns: int) -> None:
+    os.utime(source_file, ns=(mtime_ns, mtime_ns))
+
+
+def test_input_cache_hit(input_cache, source_file):
+    read_spec = {'usecols': ['Time', 'Name', 'Range']}
+    source_df, cache_hit = read_and_cache(input_cache, source_file, read_spec)
+    assert not cache_hit
+
+    cached_df, cache_hit = read_and_cache(input_cache, source_file, read_spec)
+    assert cache_hit
+    pd.testing.assert_frame_equal(cached_df, source_df)
+    assert cached_df['Name'].isna().tolist() == [False, True, False]
+    # the source file is only hashed when the entry is first saved
+    assert input_cache.hash_count == 1
+
+
+def test_input_cache_mtime_change(input_cache, source_file):
+    read_spec = {'usecols': ['Time', 'Name', 'Range']}
+    source_df, _ = read_and_cache(input_cache, source_file, read_spec)
+    set_mtime(source_file, os.stat(source_file).st_mtime_ns + 10 ** 9)
+
+    # the contents are hashed again and match, the entry is loaded and its key updated
+    cached_df, cache_hit = read_and_cache(input_cache, source_file, read_spec)
+    assert cache_hit
+    pd.testing.assert_frame_equal(cached_df, source_df)
+    assert input_cache.hash_count == 2
+
+    _, cache_hit = read_and_cache(input_cache, source_file, read_spec)
+    assert cache_hit
+    assert input_cache.hash_count == 2
+
+
+@pytest.mark.parametrize("new_contents", ["Time,Name,Range\n0:00:01,alpha,1.5\n",
+                                          "Time,Name,Range\n0:00:01,alpha,1.5\n0:00:02,,2.5\n0:00:03,bravo,9.5\n"])
+def test_input_cache_content_change(input_cache, source_file, new_contents):
+    read_spec = {'usecols': ['Time', 'Name', 'Range']}
+    read_and_cache(input_cache, source_file, read_spec)
+    mtime_ns = os.stat(source_file).st_mtime_ns
+    with open(source_file, "w") as source:
+        source.write(new_contents)
+    set_mtime(source_file, mtime_ns + 10 ** 9)
+
+    # the entry is replaced with the dataframe read from the changed source file
+    source_df, cache_hit = read_and_cache(input_cache, source_file, read_spec)
+    assert not cache_hit
+    pd.testing.assert_frame_equal(source_df, pd.read_csv(source_file, **read_spec))
+
+    cached_df, cache_hit = read_and_cache(input_cache, source_file, read_spec)
+    assert cache_hit
+    pd.testing.assert_frame_equal(cached_df, source_df)
+
+
+def test_input_cache_read_spec_change(input_cache, source_file):
+    read_and_cache(input_cache, source_file, {'usecols': ['Time', 'Name', 'Range']})
+
+    read_spec = {'usecols': ['Time', 'Range'], 'dtype': {'Range': np.float32}}
+    source_df, cache_hit = read_and_cache(input_cache, source_file, read_spec)
+    assert not cache_hit
+    assert list(source_df.columns) == ['Time', 'Range']
+
+    cached_df, cache_hit = read_and_cache(input_cache, source_file, read_spec)
+    assert cache_hit
+    pd.testing.assert_frame_equal(cached_df, source_df)
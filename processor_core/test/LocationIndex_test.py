@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from processor_core.LocationIndex import LocationIndex
+
+
+@pytest.fixture
+def location_index():
+    # entity 0 - updates at positions 0, 2 and 5 (times 0, 10 and 20, x missing at position 5)
+    # entity 1 - single update at position 3 (time 5)
+    return LocationIndex(uid_code_arr=np.array([0, 0, 1, 0]),
+                         evn_pos_arr=np.array([0, 2, 3, 5]),
+                         time_arr=np.array([0.0, 10.0, 5.0, 20.0]),
+                         x_arr=np.array([0.0, 10.0, 100.0, np.nan]),
+                         y_arr=np.array([0.0, 20.0, 200.0, 40.0]))
+
+
+# events - entity 0 at positions 1 (time 4), 4 (time 16) and 6 (time 30), entity 1 at position 1 (time 1), no entity
+query_dict = {'uid_code_arr': np.array([0, 0, 0, 1, -1]),
+              'evn_pos_arr': np.array([1, 4, 6, 1, 4]),
+              'time_arr': np.array([4.0, 16.0, 30.0, 1.0, 16.0])}
+
+
+def test_missing_locations_carried_forward(location_index):
+    x_arr, y_arr = location_index.get_index_locations()
+
+    np.testing.assert_array_equal(x_arr, [0.0, 10.0, 100.0, 10.0])
+    np.testing.assert_array_equal(y_arr, [0.0, 20.0, 200.0, 40.0])
+
+
+def test_previous_mode(location_index):
+    x_arr, y_arr = location_index.get_locations(**query_dict, location_mode='previous')
+
+    # last location update before each event (none before the first update of entity 1)
+    np.testing.assert_array_equal(x_arr, [0.0, 10.0, 10.0, np.nan, np.nan])
+    np.testing.assert_array_equal(y_arr, [0.0, 20.0, 40.0, np.nan, np.nan])
+
+
+def test_nearest_mode(location_index):
+    x_arr, y_arr = location_index.get_locations(**query_dict, location_mode='nearest')
+
+    # location update nearest in time to each event (before or after)
+    np.testing.assert_array_equal(x_arr, [0.0, 10.0, 10.0, 100.0, np.nan])
+    np.testing.assert_array_equal(y_arr, [0.0, 40.0, 40.0, 200.0, np.nan])
+
+
+def test_interpolated_mode(location_index):
+    x_arr, y_arr = location_index.get_locations(**query_dict, location_mode='interpolated')
+
+    # interpolated between the updates before and after each event, last location kept after the final update and no
+    # location before the first update
+    np.testing.assert_allclose(x_arr, [4.0, 10.0, 10.0, np.nan, np.nan])
+    np.testing.assert_allclose(y_arr, [8.0, 32.0, 40.0, np.nan, np.nan])
+
+
+@pytest.mark.parametrize("location_mode", LocationIndex.location_mode_ls)
+def test_modes_match_at_location_updates(location_index, location_mode):
+    x_arr, y_arr = location_index.get_locations(uid_code_arr=np.array([0, 0, 1, 0]),
+                                                evn_pos_arr=np.array([0, 2, 3, 5]),
+                                                time_arr=np.array([0.0, 10.0, 5.0, 20.0]),
+                                                location_mode=location_mode)
+
+    index_x_arr, index_y_arr = location_index.get_index_locations()
+    np.testing.assert_array_equal(x_arr, index_x_arr)
+    np.testing.assert_array_equal(y_arr, index_y_arr)
@@ -0,0 +1,7 @@
+import sys
+from os import path
+
+# the tests import processor_core and the model processor script from the repository root
+repo_root = path.dirname(path.dirname(path.dirname(path.abspath(__file__))))
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)